@@ -0,0 +1,143 @@
+# ai/nillion_integration/insight_jobs.py
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from ai.nillion_integration.llm_cache import canonical_json
+from metrics import span
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class InsightJob:
+    """A single voting-pattern analysis request"""
+
+    def __init__(self, job_id, proposal_id, payload):
+        self.job_id = job_id
+        self.proposal_id = proposal_id
+        self.payload = payload
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.submitted_at = int(time.time() * 1000)
+        self.finished_at = None
+        self._done = threading.Event()
+        self._callbacks = []
+        self._callback_lock = threading.Lock()
+
+    def add_done_callback(self, callback: Callable[["InsightJob"], None]):
+        """Call `callback(job)` once the job succeeded, immediately if it already has"""
+        with self._callback_lock:
+            if not self._done.is_set():
+                self._callbacks.append(callback)
+                return
+        if self.status == DONE:
+            self._call(callback)
+
+    def _call(self, callback):
+        try:
+            callback(self)
+        except Exception as e:
+            print(f"Insight job {self.job_id} callback failed: {e}")
+
+    def _finish(self):
+        with self._callback_lock:
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        if self.status == DONE:
+            for callback in callbacks:
+                self._call(callback)
+
+    def wait(self, timeout=None) -> bool:
+        return self._done.wait(timeout)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "proposal_id": self.proposal_id,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "finished_at": self.finished_at
+        }
+
+
+def snapshot_job_id(proposal_id, payload) -> str:
+    """Deterministic job id for a proposal snapshot, so identical snapshots share a job"""
+    canonical = canonical_json({"proposal_id": proposal_id, "payload": payload})
+    return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+
+class InsightJobQueue:
+    """
+    Background queue running `llm.analyze_voting_patterns` on a bounded worker pool.
+
+    Jobs are keyed by a hash of the proposal snapshot: submitting the same
+    snapshot again returns the existing job unless it failed. Only the most
+    recent `max_jobs` jobs are retained.
+    """
+
+    def __init__(self, llm, max_workers=2, max_jobs=1000):
+        self.llm = llm
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="insights")
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, InsightJob]" = OrderedDict()
+        self._latest: Dict[Any, str] = {}
+
+    def submit(self, proposal_id, payload, on_done: Optional[Callable[[InsightJob], None]] = None) -> InsightJob:
+        job_id = snapshot_job_id(proposal_id, payload)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.status != FAILED:
+                self._jobs.move_to_end(job_id)
+                self._latest[proposal_id] = job_id
+                created = False
+            else:
+                job = InsightJob(job_id, proposal_id, payload)
+                self._jobs[job_id] = job
+                self._latest[proposal_id] = job_id
+                while len(self._jobs) > self.max_jobs:
+                    old_id, old_job = self._jobs.popitem(last=False)
+                    if self._latest.get(old_job.proposal_id) == old_id:
+                        del self._latest[old_job.proposal_id]
+                created = True
+
+        if on_done is not None:
+            job.add_done_callback(on_done)
+        if created:
+            self._executor.submit(self._run, job)
+        return job
+
+    def _run(self, job: InsightJob):
+        job.status = RUNNING
+        try:
+            with span("llm"):
+                job.result = self.llm.analyze_voting_patterns(job.payload)
+            job.status = DONE
+        except Exception as e:
+            print(f"Insight job {job.job_id} for proposal {job.proposal_id} failed: {e}")
+            job.error = str(e)
+            job.status = FAILED
+        job.finished_at = int(time.time() * 1000)
+        job._finish()
+
+    def get(self, job_id) -> Optional[InsightJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def latest_for(self, proposal_id) -> Optional[InsightJob]:
+        with self._lock:
+            job_id = self._latest.get(proposal_id)
+            return self._jobs.get(job_id) if job_id else None
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,179 @@
+# ai/nillion_integration/llm_cache.py
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+
+def _canonical(value):
+    """Stringify mapping keys so payloads with mixed key types can be sorted"""
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def canonical_json(value) -> str:
+    """Stable JSON encoding: sorted keys, no whitespace, non-JSON values stringified"""
+    return json.dumps(_canonical(value), sort_keys=True, separators=(",", ":"), default=str)
+
+
+def request_key(model, system_prompt, prompt_template, payload) -> str:
+    """Content address of a chat completion request"""
+    material = canonical_json({
+        "model": model,
+        "system": system_prompt,
+        "template": prompt_template,
+        "payload": payload
+    })
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Two-tier cache for LLM responses keyed by `request_key`.
+
+    An in-memory LRU sits in front of an optional on-disk tier (one JSON file
+    per key) that is evicted least-recently-used once it exceeds
+    `max_disk_entries`. Concurrent lookups of the same missing key are
+    coalesced so the completion is only requested once.
+    """
+
+    def __init__(self, max_memory_entries=256, disk_dir: Optional[str] = None, max_disk_entries=10000):
+        self.max_memory_entries = max_memory_entries
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        # key -> None, ordered from least to most recently used
+        self._disk_index: "OrderedDict[str, None]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._load_disk_index()
+
+    def _path(self, key) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _load_disk_index(self):
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            if name.endswith(".json"):
+                path = os.path.join(self.disk_dir, name)
+                entries.append((os.path.getmtime(path), name[:-5]))
+        for _, key in sorted(entries):
+            self._disk_index[key] = None
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, key):
+        if not self.disk_dir or key not in self._disk_index:
+            return None
+        try:
+            with open(self._path(key), "r") as f:
+                value = json.load(f)["response"]
+            os.utime(self._path(key))
+        except (OSError, ValueError, KeyError):
+            self._disk_index.pop(key, None)
+            return None
+        self._disk_index.move_to_end(key)
+        return value
+
+    def _write_disk(self, key, value):
+        if not self.disk_dir:
+            return
+        tmp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"key": key, "response": value}, f)
+        os.replace(tmp_path, self._path(key))
+        self._disk_index[key] = None
+        self._disk_index.move_to_end(key)
+        while len(self._disk_index) > self.max_disk_entries:
+            old_key, _ = self._disk_index.popitem(last=False)
+            try:
+                os.remove(self._path(old_key))
+            except OSError:
+                pass
+            self.evictions += 1
+
+    def get(self, key):
+        """Cached response for `key`, or None"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+            value = self._read_disk(key)
+            if value is not None:
+                self.disk_hits += 1
+                self._remember(key, value)
+                return value
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._remember(key, value)
+            self._write_disk(key, value)
+
+    def get_or_compute(self, key, compute: Callable[[], Any]):
+        """Return the cached response or compute it once, even under concurrent callers"""
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            if key in self._memory:
+                # Computed by another caller since our lookup
+                return self._memory[key]
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = compute()
+            self.put(key, value)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "disk_entries": len(self._disk_index),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "hit_rate": hits / lookups if lookups else 0.0
+            }
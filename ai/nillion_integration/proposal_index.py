@@ -0,0 +1,202 @@
+# ai/nillion_integration/proposal_index.py
+
+import re
+import threading
+import zlib
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# Hashed feature space; each indexed proposal costs 4 * DEFAULT_DIM bytes
+DEFAULT_DIM = 2048
+# IDF weights are refreshed (and stored vectors reweighted) once the corpus grew by this fraction
+DEFAULT_REWEIGHT_GROWTH = 0.25
+DEFAULT_CAPACITY = 256
+# Width of the dense sketch that shortlists candidates, and how many of them are scored exactly
+SKETCH_DIM = 128
+RERANK_CANDIDATES = 32
+# Near-duplicates reuse the cached analysis; similar proposals lend theirs as context
+REUSE_SIMILARITY = 0.9
+CONTEXT_SIMILARITY = 0.5
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def hashed_features(text: str, dim=DEFAULT_DIM) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sparse signed term counts of the word unigrams and bigrams of `text`,
+    hashed into `dim` buckets: (bucket indices, counts), indices unique.
+    """
+    words = _TOKEN.findall(text.lower())
+    terms = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    if not terms:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    hashes = np.fromiter((zlib.crc32(term.encode()) for term in terms), dtype=np.int64, count=len(terms))
+    # One hash bit picks the sign, so collisions tend to cancel rather than add up
+    signs = np.where(hashes & (1 << 31), -1.0, 1.0)
+    indices = hashes % dim
+    buckets = np.flatnonzero(np.bincount(indices, minlength=dim))
+    return buckets, np.bincount(indices, weights=signs, minlength=dim)[buckets].astype(np.float32)
+
+
+class Match(NamedTuple):
+    key: Any
+    similarity: float
+    analysis: Any
+
+
+class ProposalIndex:
+    """
+    Incremental TF-IDF index of proposal texts for near-duplicate lookup.
+
+    Texts are feature-hashed (word unigrams and bigrams), weighted by
+    sublinear term frequency times IDF and L2-normalized into one row of a
+    (proposals x features) float32 matrix. Each vector is also folded into
+    a SKETCH_DIM-wide count sketch (a random projection that preserves inner
+    products in expectation), stored row-major. A lookup scores every
+    proposal with one small matrix-vector product over the sketches, then
+    computes exact cosine similarities for the best RERANK_CANDIDATES only.
+
+    Document frequencies are updated on every `add`; the IDF weights used
+    for the stored vectors are a snapshot that is refreshed, reweighting
+    every proposal, once the corpus has grown by `reweight_growth`, i.e.
+    O(1) amortized per proposal.
+
+    Each proposal can carry its analysis, so callers can reuse the analysis
+    of a near-duplicate instead of producing a new one.
+    """
+
+    def __init__(self, dim=DEFAULT_DIM, reweight_growth=DEFAULT_REWEIGHT_GROWTH, capacity=DEFAULT_CAPACITY):
+        self.dim = dim
+        self.reweight_growth = reweight_growth
+        self._matrix = np.zeros((capacity, dim), dtype=np.float32)
+        self._sketches = np.zeros((capacity, SKETCH_DIM), dtype=np.float32)
+        rng = np.random.default_rng(0)
+        self._sketch_buckets = rng.integers(0, SKETCH_DIM, dim)
+        self._sketch_signs = rng.choice(np.array([-1.0, 1.0], dtype=np.float32), dim)
+        self._features: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._keys: List[Any] = []
+        self._analyses: List[Any] = []
+        self._slots: Dict[Any, int] = {}
+        self._df = np.zeros(dim)
+        self._idf = np.ones(dim)
+        self._weighted_at = 0
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.reweights = 0
+        self.reused = 0
+        self.analyzed = 0
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _weigh(self, features: Tuple[np.ndarray, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        buckets, counts = features
+        values = np.sign(counts) * (1 + np.log(np.maximum(np.abs(counts), 1))) * self._idf[buckets]
+        norm = np.sqrt(values @ values)
+        return buckets, (values / norm if norm else values).astype(np.float32)
+
+    def _sketch(self, buckets, values) -> np.ndarray:
+        return np.bincount(self._sketch_buckets[buckets], weights=self._sketch_signs[buckets] * values,
+                           minlength=SKETCH_DIM).astype(np.float32)
+
+    def _store(self, slot, features):
+        buckets, values = self._weigh(features)
+        self._matrix[slot] = 0
+        self._matrix[slot, buckets] = values
+        self._sketches[slot] = self._sketch(buckets, values)
+
+    def _reweight(self):
+        n = len(self._keys)
+        self._idf = np.log((1 + n) / (1 + self._df)) + 1
+        for slot, features in enumerate(self._features):
+            self._store(slot, features)
+        self._weighted_at = n
+        self.reweights += 1
+
+    def add(self, key, text: str, analysis=None) -> int:
+        """Index (or re-index) the proposal `key`; returns its slot"""
+        features = hashed_features(text, self.dim)
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = len(self._keys)
+                if slot == len(self._matrix):
+                    self._matrix = np.vstack([self._matrix, np.zeros_like(self._matrix)])
+                    self._sketches = np.vstack([self._sketches, np.zeros_like(self._sketches)])
+                self._slots[key] = slot
+                self._keys.append(key)
+                self._features.append(features)
+                self._analyses.append(analysis)
+            else:
+                self._df[self._features[slot][0]] -= 1
+                self._features[slot] = features
+                if analysis is not None:
+                    self._analyses[slot] = analysis
+            self._df[features[0]] += 1
+            if len(self._keys) >= max(2, self._weighted_at * (1 + self.reweight_growth)):
+                self._reweight()
+            else:
+                self._store(slot, features)
+            return slot
+
+    def set_analysis(self, key, analysis):
+        with self._lock:
+            self._analyses[self._slots[key]] = analysis
+
+    def analysis(self, key):
+        with self._lock:
+            slot = self._slots.get(key)
+            return self._analyses[slot] if slot is not None else None
+
+    def nearest(self, text: str, k=1, min_similarity=0.0, exclude=None) -> List[Match]:
+        """The `k` most similar indexed proposals (cosine similarity), best first"""
+        features = hashed_features(text, self.dim)
+        with self._lock:
+            self.lookups += 1
+            n = len(self._keys)
+            if not n or not len(features[0]):
+                return []
+            buckets, values = self._weigh(features)
+            estimates = self._sketches[:n] @ self._sketch(buckets, values)
+            if exclude is not None and exclude in self._slots:
+                estimates[self._slots[exclude]] = -np.inf
+            shortlist = min(n, max(k, RERANK_CANDIDATES))
+            candidates = np.argpartition(-estimates, shortlist - 1)[:shortlist]
+            candidates = candidates[np.isfinite(estimates[candidates])]
+            query = np.zeros(self.dim, dtype=np.float32)
+            query[buckets] = values
+            similarities = self._matrix[candidates] @ query
+            order = np.argsort(-similarities, kind="stable")[:k]
+            return [Match(self._keys[candidates[i]], float(similarities[i]), self._analyses[candidates[i]])
+                    for i in order if similarities[i] >= min_similarity]
+
+    def analyze(self, key, text: str, analyze: Callable[[Optional[Match]], Any],
+                reuse_similarity=REUSE_SIMILARITY, context_similarity=CONTEXT_SIMILARITY) -> Tuple[Any, Optional[Match]]:
+        """
+        Analysis of proposal `key`, reusing earlier ones where possible.
+
+        The closest indexed proposal with an analysis is looked up: at
+        `reuse_similarity` or above its analysis is returned as is; otherwise
+        `analyze(similar)` is called with that match if it reaches
+        `context_similarity` (None if not), so it can serve as context.
+        The proposal is indexed with the analysis either way. Returns
+        (analysis, match the analysis was reused from or None).
+        """
+        similar = next((match for match in self.nearest(text, k=3, min_similarity=context_similarity)
+                        if match.analysis is not None), None)
+        if similar is not None and similar.similarity >= reuse_similarity:
+            self.add(key, text, similar.analysis)
+            with self._lock:
+                self.reused += 1
+            return similar.analysis, similar
+        analysis = analyze(similar)
+        self.add(key, text, analysis)
+        with self._lock:
+            self.analyzed += 1
+        return analysis, None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"proposals": len(self._keys), "lookups": self.lookups, "reweights": self.reweights,
+                    "reused": self.reused, "analyzed": self.analyzed}
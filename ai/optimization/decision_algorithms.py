@@ -1,28 +1,104 @@
 # ai/optimization/decision_algorithms.py
 
-from integrations.nethermind.agentic_ai import NethermindAgent
+import asyncio
+import os
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from ai.optimization.stage_graph import BatchReport, GraphRun, StageGraph, DEFAULT_MAX_CONCURRENCY
+from integrations.nethermind.agentic_ai import AgenticAI
 from integrations.nethermind.eth_executor import NethermindExecutor
-from integrations.og_storage.key_value_storage import StorageManager
+from integrations.og_storage.storage_manager import StorageManager
+
+DEFAULT_PROVIDER_URL = "https://eth-mainnet.alchemyapi.io/v2/your-key"
+
+# Seconds; None disables the timeout of a stage
+DEFAULT_STAGE_TIMEOUTS = {
+    "ai_analysis": 120.0,
+    "store_analysis": 60.0,
+    "tee_tally": 120.0,
+    "execute": 180.0
+}
 
 class EnhancedDecisionAlgorithm:
-    def __init__(self):
-        self.nethermind_agent = NethermindAgent()
-        self.executor = NethermindExecutor(provider_url="https://eth-mainnet.alchemyapi.io/v2/your-key")
-        self.storage = StorageManager()
-        
-    def process_voting_decision(self, proposal_data, votes):
+    """
+    Proposal decision pipeline, run as a stage graph:
+
+        ai_analysis -> store_analysis --+
+             |                          +--> execute
+             +--------------------------+
+        tee_tally ----------------------+
+
+    The TEE tally only needs the votes, so it overlaps with the AI analysis
+    and the 0G metadata write; the on-chain execution waits for all of them.
+
+    The analysis agent (anything with `analyze_proposal(text, proposal_id)`,
+    an AgenticAI by default), the executor and the storage manager can be
+    injected; the default executor reads its provider from ETH_PROVIDER_URL.
+    """
+
+    def __init__(self, stage_timeouts: Optional[Dict[str, Optional[float]]] = None, agent=None,
+                 executor: Optional[NethermindExecutor] = None, storage: Optional[StorageManager] = None):
+        self.agent = agent if agent is not None else AgenticAI()
+        self.executor = executor or NethermindExecutor(provider_url=os.getenv("ETH_PROVIDER_URL", DEFAULT_PROVIDER_URL))
+        self.storage = storage or StorageManager()
+        timeouts = dict(DEFAULT_STAGE_TIMEOUTS, **(stage_timeouts or {}))
+
+        self.graph = StageGraph(metrics_prefix="decision_")
+        self.graph.add("ai_analysis", self._analyze, timeout=timeouts["ai_analysis"])
+        self.graph.add("store_analysis", self._store_analysis, deps=["ai_analysis"], timeout=timeouts["store_analysis"])
+        self.graph.add("tee_tally", self._tally, timeout=timeouts["tee_tally"])
+        self.graph.add("execute", self._execute, deps=["ai_analysis", "store_analysis", "tee_tally"],
+                       timeout=timeouts["execute"])
+
+    def _analyze(self, context):
         # Get AI analysis of the proposal
-        ai_insights = self.nethermind_agent.analyze_proposals(proposal_data)
-        
+        proposal_data = context["proposal_data"]
+        text = "\n".join(str(proposal_data[field]) for field in ("title", "description") if proposal_data.get(field))
+        return self.agent.analyze_proposal(text, proposal_id=proposal_data["id"])
+
+    def _store_analysis(self, context):
         # Store analysis securely using 0G storage
-        self.storage.store_metadata(f"proposal_{proposal_data['id']}_analysis", ai_insights)
-        
+        proposal_id = context["proposal_data"]["id"]
+        return self.storage.store_metadata(f"proposal_{proposal_id}_analysis", context["ai_analysis"])
+
+    def _tally(self, context):
+        return self.executor.verify_decision({
+            "proposal_id": context["proposal_data"]["id"],
+            "votes": context["votes"]
+        })
+
+    def _execute(self, context):
         # Create the decision package
         decision_package = {
-            "proposal_id": proposal_data["id"],
-            "votes": votes,
-            "ai_insights": ai_insights
+            "proposal_id": context["proposal_data"]["id"],
+            "votes": context["votes"],
+            "ai_insights": context["ai_analysis"]
         }
-        
-        # Execute the decision on-chain
-        return self.executor.execute_dao_decision(decision_package)
+
+        # Execute the decision on-chain, reusing the TEE tally
+        return self.executor.execute_dao_decision(decision_package, verified_data=context["tee_tally"])
+
+    async def run_voting_decision(self, proposal_data, votes) -> GraphRun:
+        """One pass through the graph, with the result, status and timing of every stage"""
+        return await self.graph.run({"proposal_data": proposal_data, "votes": votes})
+
+    def process_voting_decision(self, proposal_data, votes):
+        """
+        Decide on a proposal and return the on-chain execution result.
+        Raises StageFailed if a stage failed or timed out. From async code, use
+        `run_voting_decision` instead.
+        """
+        run = asyncio.run(self.run_voting_decision(proposal_data, votes))
+        run.raise_for_errors()
+        return run.results["execute"]
+
+    def process_voting_decisions(self, decisions: Iterable[Tuple[Dict[str, Any], Any]],
+                                 max_concurrency=DEFAULT_MAX_CONCURRENCY) -> BatchReport:
+        """
+        Push many (proposal_data, votes) pairs through the graph, at most
+        `max_concurrency` proposals at a time. Per-proposal failures are
+        reported in the runs rather than raised; `stage_timings()` summarizes
+        where the time went.
+        """
+        batch = [{"proposal_data": proposal_data, "votes": votes} for proposal_data, votes in decisions]
+        return asyncio.run(self.graph.run_batch(batch, max_concurrency))
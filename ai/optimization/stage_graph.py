@@ -0,0 +1,204 @@
+# ai/optimization/stage_graph.py
+
+import asyncio
+import functools
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Union
+
+from metrics import span
+
+DEFAULT_MAX_CONCURRENCY = 8
+
+DONE = "done"
+FAILED = "failed"
+TIMED_OUT = "timed_out"
+SKIPPED = "skipped"
+
+# A stage receives the graph inputs plus the results of its dependencies, keyed by stage name
+StageFn = Callable[[Dict[str, Any]], Union[Any, Awaitable[Any]]]
+
+
+class StageTimeout(Exception):
+    pass
+
+
+class StageSkipped(Exception):
+    """A dependency of the stage did not complete"""
+
+
+class StageFailed(Exception):
+    def __init__(self, stage, cause: BaseException):
+        super().__init__(f"Stage {stage} failed: {cause!r}")
+        self.stage = stage
+        self.cause = cause
+
+
+class Stage(NamedTuple):
+    name: str
+    fn: StageFn
+    deps: Sequence[str]
+    timeout: Optional[float]
+
+
+class GraphRun:
+    """Outcome of one pass through a StageGraph"""
+
+    def __init__(self, inputs: Dict[str, Any]):
+        self.inputs = inputs
+        self.results: Dict[str, Any] = {}
+        self.status: Dict[str, str] = {}
+        self.errors: Dict[str, BaseException] = {}
+        # Seconds from the moment a stage's dependencies were ready to its completion
+        self.timings: Dict[str, float] = {}
+        self.elapsed = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def raise_for_errors(self):
+        """Raise StageFailed for the first stage (in graph order) that failed or timed out"""
+        for stage, error in self.errors.items():
+            if not isinstance(error, StageSkipped):
+                raise StageFailed(stage, error)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": dict(self.status),
+            "timings": dict(self.timings),
+            "errors": {stage: str(error) for stage, error in self.errors.items()},
+            "elapsed": self.elapsed
+        }
+
+
+class BatchReport:
+    """Runs of a batch, in input order, with per-stage timing statistics"""
+
+    def __init__(self, runs: List[GraphRun], elapsed: float):
+        self.runs = runs
+        self.elapsed = elapsed
+
+    def stage_timings(self) -> Dict[str, Dict[str, Any]]:
+        stats: Dict[str, Dict[str, Any]] = {}
+        for run in self.runs:
+            for stage, status in run.status.items():
+                entry = stats.setdefault(stage, {"count": 0, "total_s": 0.0, "max_s": 0.0, "errors": 0})
+                if status != DONE:
+                    entry["errors"] += 1
+                seconds = run.timings.get(stage)
+                if seconds is not None:
+                    entry["count"] += 1
+                    entry["total_s"] += seconds
+                    entry["max_s"] = max(entry["max_s"], seconds)
+        for entry in stats.values():
+            entry["mean_s"] = entry["total_s"] / entry["count"] if entry["count"] else 0.0
+        return stats
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "runs": len(self.runs),
+            "failed": sum(1 for run in self.runs if not run.ok),
+            "elapsed": self.elapsed,
+            "stages": self.stage_timings()
+        }
+
+
+class StageGraph:
+    """
+    Small async executor for a DAG of processing stages.
+
+    Every stage starts as soon as all of its dependencies are done, so
+    independent stages overlap. Stages may be coroutine functions or plain
+    (blocking) callables, which run on `executor` (the loop's default thread
+    pool if None). Each stage can have its own timeout. A stage that fails or
+    times out does not stop the stages that do not depend on it; its
+    dependents are skipped.
+
+    Stages are added in dependency order (dependencies must already exist),
+    which keeps the graph acyclic by construction.
+    """
+
+    def __init__(self, executor=None, metrics_prefix: Optional[str] = None):
+        self.stages: Dict[str, Stage] = {}
+        self.executor = executor
+        self.metrics_prefix = metrics_prefix
+
+    def add(self, name, fn: StageFn, deps: Sequence[str] = (), timeout: Optional[float] = None) -> "StageGraph":
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage {name}")
+        missing = [dep for dep in deps if dep not in self.stages]
+        if missing:
+            raise ValueError(f"Stage {name} depends on unknown stages {missing}")
+        self.stages[name] = Stage(name, fn, tuple(deps), timeout)
+        return self
+
+    def stage(self, name, deps: Sequence[str] = (), timeout: Optional[float] = None):
+        """Decorator form of `add`"""
+        def register(fn):
+            self.add(name, fn, deps, timeout)
+            return fn
+        return register
+
+    async def _call(self, stage: Stage, context: Dict[str, Any]):
+        if asyncio.iscoroutinefunction(stage.fn):
+            return await stage.fn(context)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(stage.fn, context))
+
+    async def _run_stage(self, stage: Stage, run: GraphRun, tasks: Dict[str, asyncio.Future]):
+        context = dict(run.inputs)
+        for dep in stage.deps:
+            try:
+                context[dep] = await tasks[dep]
+            except Exception:
+                run.status[stage.name] = SKIPPED
+                run.errors[stage.name] = StageSkipped(f"{dep} did not complete")
+                raise run.errors[stage.name]
+
+        start = time.perf_counter()
+        try:
+            if self.metrics_prefix:
+                with span(f"{self.metrics_prefix}{stage.name}"):
+                    result = await asyncio.wait_for(self._call(stage, context), stage.timeout)
+            else:
+                result = await asyncio.wait_for(self._call(stage, context), stage.timeout)
+        except asyncio.TimeoutError:
+            # A blocking stage keeps running in its thread; only its result is given up on
+            run.status[stage.name] = TIMED_OUT
+            run.errors[stage.name] = StageTimeout(f"Stage {stage.name} timed out after {stage.timeout}s")
+            raise run.errors[stage.name]
+        except Exception as e:
+            run.status[stage.name] = FAILED
+            run.errors[stage.name] = e
+            raise
+        finally:
+            run.timings[stage.name] = time.perf_counter() - start
+        run.status[stage.name] = DONE
+        run.results[stage.name] = result
+        return result
+
+    async def run(self, inputs: Dict[str, Any]) -> GraphRun:
+        """Run every stage once for `inputs`; never raises for stage errors (see GraphRun.raise_for_errors)"""
+        run = GraphRun(inputs)
+        start = time.perf_counter()
+        tasks: Dict[str, asyncio.Future] = {}
+        for stage in self.stages.values():
+            tasks[stage.name] = asyncio.ensure_future(self._run_stage(stage, run, tasks))
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        run.elapsed = time.perf_counter() - start
+        # Report errors in graph order rather than completion order
+        run.errors = {name: run.errors[name] for name in self.stages if name in run.errors}
+        return run
+
+    async def run_batch(self, batch: Iterable[Dict[str, Any]],
+                        max_concurrency=DEFAULT_MAX_CONCURRENCY) -> BatchReport:
+        """Push many inputs through the graph, at most `max_concurrency` at a time"""
+        semaphore = asyncio.Semaphore(max_concurrency)
+        start = time.perf_counter()
+
+        async def bounded(inputs):
+            async with semaphore:
+                return await self.run(inputs)
+
+        runs = await asyncio.gather(*(bounded(inputs) for inputs in batch))
+        return BatchReport(list(runs), time.perf_counter() - start)
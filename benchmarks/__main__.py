@@ -0,0 +1,68 @@
+# benchmarks/__main__.py
+"""
+Run the microbenchmark suite.
+
+    python -m benchmarks                      # full suite, compared with benchmarks/baseline.json
+    python -m benchmarks --quick -k storage   # smallest cases of matching benchmarks
+    python -m benchmarks --output results.json --update-baseline
+
+Exits with status 1 when a case regresses against the baseline.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from benchmarks import harness, suite  # noqa: F401  (registers the benchmarks)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="AISecureFundDAO microbenchmarks")
+    parser.add_argument("-k", "--filter", default=None, help="Only run cases whose id contains this string")
+    parser.add_argument("--quick", action="store_true", help="Only run the small cases")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--alloc-repeat", type=int, default=3,
+                        help="Traced runs per case; the median peak allocation is reported")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline results to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="Merge these results into the baseline")
+    parser.add_argument("--time-tolerance", type=float, default=0.3, help="Allowed relative drop in ops/s")
+    parser.add_argument("--alloc-tolerance", type=float, default=0.2, help="Allowed relative growth of peak allocations")
+    args = parser.parse_args(argv)
+
+    cases = [
+        case for case in harness.REGISTRY
+        if (not args.quick or case.quick) and (not args.filter or args.filter in case.id)
+    ]
+    if not cases:
+        print("No benchmark cases selected")
+        return 2
+
+    results = harness.run(cases, repeat=args.repeat, log=lambda line: print(line, file=sys.stderr),
+                          alloc_repeat=args.alloc_repeat)
+    baseline = harness.load(args.baseline)
+    regressions = harness.compare(results, baseline, args.time_tolerance, args.alloc_tolerance) if baseline else []
+    results["regressions"] = regressions
+
+    if args.output:
+        harness.save(args.output, results)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.update_baseline:
+        merged = baseline or {"results": {}}
+        merged["environment"] = results["environment"]
+        merged["results"].update(results["results"])
+        harness.save(args.baseline, merged)
+
+    for regression in regressions:
+        print(f"REGRESSION {regression['case']}: {regression['metric']} {regression['baseline']:,.0f} -> "
+              f"{regression['current']:,.0f} ({regression['change']:+.0%})", file=sys.stderr)
+    return 1 if regressions and not args.update_baseline else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+# benchmarks/fakes.py
+"""Offline stand-ins for the chain, storage and LLM backends used by the benchmarks"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Set
+
+from integrations.chain.vote_fetcher import ENCRYPTED_VOTES_SELECTOR, EncryptedVoteFetcher
+
+CONTRACT = "0x32CB351c8562Cb896Ffbe7cc3bbc7cceBBcB2Afb"
+GENESIS_TIME = 1742428800
+
+
+def make_vote(project_id, index) -> bytes:
+    return bytes([index % 256]) + int(project_id).to_bytes(4, "big") + index.to_bytes(27, "big")
+
+
+class FakeChainRPC:
+    """
+    JSON-RPC server holding `PrivateVoting.encryptedVotes` for a few proposals.
+
+    Serves the calls made by EncryptedVoteFetcher and VoteIndexer
+    (eth_blockNumber, eth_getStorageAt, eth_call, eth_getBlockByNumber,
+    eth_getLogs) over HTTP/1.1 keep-alive, including batches.
+
+    It also accepts signed transactions like a local dev chain: raw
+    transactions are decoded and nonce-checked into a mempool, and the first
+    receipt request for a pending transaction mines the mempool, so the
+    receipt shows up on the next poll. Transactions whose nonce leaves a gap
+    stay pending until the gap is filled.
+
+    `latency` (seconds) delays every HTTP response, to stand in for the
+    round trip to a remote node. Calldata added to `reverts` fails gas
+    estimation with "execution reverted".
+    """
+
+    def __init__(self, votes_per_project: Dict[int, int], head=100, chain_id=31337, base_fee=10 ** 9, latency=0.0):
+        self.head = head
+        self.latency = latency
+        self.chain_id = chain_id
+        self.base_fee = base_fee
+        self.nonces: Dict[str, int] = {}
+        self.mempool: Dict[str, Dict] = {}
+        self.transactions: Dict[str, Dict] = {}
+        self.receipts: Dict[str, Dict] = {}
+        self.reverts: Set[bytes] = set()
+        self._lock = threading.Lock()
+        self.votes: Dict[int, List[bytes]] = {
+            pid: [make_vote(pid, i) for i in range(n)] for pid, n in votes_per_project.items()
+        }
+        fetcher = EncryptedVoteFetcher(None, CONTRACT)
+        self.slots = {fetcher._array_slot(pid): pid for pid in self.votes}
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def handle(self, method, params):
+        if method == "eth_blockNumber":
+            return {"result": hex(self.head)}
+        if method == "eth_getBlockByNumber":
+            number = self.head if params[0] == "latest" else int(params[0], 16)
+            return {"result": {"hash": "0x%064x" % number, "timestamp": hex(GENESIS_TIME + 12 * number),
+                               "baseFeePerGas": hex(self.base_fee)}}
+        if method == "eth_getLogs":
+            return {"result": []}
+        if method == "eth_getStorageAt":
+            pid = self.slots.get(int(params[1], 16))
+            return {"result": "0x%064x" % (len(self.votes[pid]) if pid is not None else 0)}
+        if method == "eth_call":
+            data = params[0]["data"][2:]
+            if data[:8] != ENCRYPTED_VOTES_SELECTOR:
+                return {"error": {"code": -32000, "message": "execution reverted"}}
+            pid, index = int(data[8:72], 16), int(data[72:136], 16)
+            return {"result": "0x" + self.votes[pid][index].hex()}
+        if method == "eth_chainId":
+            return {"result": hex(self.chain_id)}
+        if method == "eth_getTransactionCount":
+            return {"result": hex(self._next_nonce(params[0].lower(), pending=params[1] == "pending"))}
+        if method == "eth_estimateGas":
+            if bytes.fromhex(params[0].get("data", "0x")[2:]) in self.reverts:
+                return {"error": {"code": 3, "message": "execution reverted"}}
+            return {"result": hex(21000 + 16 * (len(params[0].get("data", "0x")) - 2) // 2)}
+        if method == "eth_maxPriorityFeePerGas":
+            return {"result": hex(10 ** 8)}
+        if method == "eth_gasPrice":
+            return {"result": hex(self.base_fee + 10 ** 8)}
+        if method == "eth_sendRawTransaction":
+            return self._send_raw(params[0])
+        if method == "eth_getTransactionReceipt":
+            with self._lock:
+                receipt = self.receipts.get(params[0])
+                if receipt is None and params[0] in self.mempool:
+                    self._mine()
+            return {"result": receipt}
+        return {"error": {"code": -32601, "message": "Method not found"}}
+
+    def _next_nonce(self, sender, pending) -> int:
+        with self._lock:
+            nonce = self.nonces.get(sender, 0)
+            if pending:
+                queued = {tx["nonce"] for tx in self.mempool.values() if tx["from"] == sender}
+                while nonce in queued:
+                    nonce += 1
+            return nonce
+
+    def _send_raw(self, raw):
+        from eth_account import Account
+        from eth_account.typed_transactions import TypedTransaction
+        from eth_hash.auto import keccak
+        from hexbytes import HexBytes
+
+        data = HexBytes(raw)
+        tx = dict(TypedTransaction.from_bytes(data).as_dict())
+        tx["from"] = Account.recover_transaction(raw).lower()
+        tx["to"], tx["data"] = "0x" + bytes(tx["to"]).hex(), bytes(tx["data"])
+        tx_hash = "0x" + keccak(data).hex()
+        with self._lock:
+            if tx["chainId"] != self.chain_id:
+                return {"error": {"code": -32000, "message": "invalid chain id"}}
+            if tx_hash in self.mempool or tx_hash in self.receipts:
+                return {"error": {"code": -32000, "message": "already known"}}
+            if tx["nonce"] < self.nonces.get(tx["from"], 0):
+                return {"error": {"code": -32000, "message": "nonce too low"}}
+            self.mempool[tx_hash] = tx
+        return {"result": tx_hash}
+
+    def mine(self):
+        """Include every pending transaction whose nonce is next in line, in one new block"""
+        with self._lock:
+            self._mine()
+
+    def _mine(self):
+        self.head += 1
+        included = True
+        while included:
+            included = False
+            for tx_hash, tx in list(self.mempool.items()):
+                if tx["nonce"] == self.nonces.get(tx["from"], 0):
+                    del self.mempool[tx_hash]
+                    self.nonces[tx["from"]] = tx["nonce"] + 1
+                    self.transactions[tx_hash] = tx
+                    self.receipts[tx_hash] = {
+                        "transactionHash": tx_hash,
+                        "blockNumber": hex(self.head),
+                        "from": tx["from"],
+                        "to": tx["to"],
+                        "gasUsed": hex(tx["gas"]),
+                        "status": "0x1"
+                    }
+                    included = True
+
+    def start(self):
+        chain = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if chain.latency:
+                    time.sleep(chain.latency)
+                requests = body if isinstance(body, list) else [body]
+                replies = [dict(jsonrpc="2.0", id=r["id"], **chain.handle(r["method"], r["params"])) for r in requests]
+                payload = json.dumps(replies if isinstance(body, list) else replies[0]).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class InMemoryStorageManager:
+    """StorageManager stand-in that keeps metadata in a dict"""
+
+    def __init__(self):
+        self.kv = {}
+
+    def store_metadata(self, key, value):
+        self.kv[key] = value
+        return {"success": True}
+
+    def retrieve_metadata(self, key):
+        return self.kv.get(key)
+
+    def retrieve_many(self, keys):
+        return {key: self.kv.get(key) for key in keys}
+
+    def flush(self):
+        return 0
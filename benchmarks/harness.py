@@ -0,0 +1,160 @@
+# benchmarks/harness.py
+
+import contextlib
+import gc
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+# A benchmark setup function returns (workload, ops, teardown or None)
+Setup = Callable[..., tuple]
+
+
+@dataclass
+class Case:
+    name: str
+    setup: Setup
+    params: Dict[str, Any] = field(default_factory=dict)
+    quick: bool = False
+
+    @property
+    def id(self) -> str:
+        if not self.params:
+            return self.name
+        return f"{self.name}[{','.join(f'{k}={v}' for k, v in self.params.items())}]"
+
+
+REGISTRY: List[Case] = []
+
+
+def benchmark(name, cases=({},), quick=({},)):
+    """
+    Register a benchmark.
+
+    The decorated setup function is called with each parameter dict in
+    `cases` and must return `(workload, ops, teardown)`: `workload()` is the
+    timed callable, `ops` the number of operations one call performs (used
+    for throughput) and `teardown` an optional cleanup callable. `quick`
+    lists the parameter dicts that also run in `--quick` mode.
+    """
+    def register(setup):
+        for params in cases:
+            REGISTRY.append(Case(name, setup, dict(params), quick=dict(params) in [dict(q) for q in quick]))
+        return setup
+    return register
+
+
+def measure(case: Case, repeat=5, warmup=1, alloc_repeat=3) -> Dict[str, Any]:
+    # The code under test logs progress; keep it out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        return _measure(case, repeat, warmup, alloc_repeat)
+
+
+def _measure(case: Case, repeat, warmup, alloc_repeat) -> Dict[str, Any]:
+    workload, ops, teardown = case.setup(**case.params)
+    try:
+        for _ in range(warmup):
+            workload()
+
+        timings = []
+        for _ in range(repeat):
+            gc.collect()
+            start = time.perf_counter()
+            workload()
+            timings.append(time.perf_counter() - start)
+
+        # Allocations are measured in separate, untimed runs. The peak of cases
+        # using thread pools depends on scheduling, so the median is reported
+        peaks = []
+        for _ in range(max(1, alloc_repeat)):
+            gc.collect()
+            tracemalloc.start()
+            try:
+                workload()
+                peaks.append(tracemalloc.get_traced_memory()[1])
+            finally:
+                tracemalloc.stop()
+    finally:
+        if teardown is not None:
+            teardown()
+
+    median = statistics.median(timings)
+    return {
+        "median_s": median,
+        "min_s": min(timings),
+        "ops": ops,
+        "ops_per_s": ops / median if median else float("inf"),
+        "peak_alloc_bytes": int(statistics.median(peaks)),
+        "repeat": repeat
+    }
+
+
+def run(cases: List[Case], repeat=5, warmup=1, log=print, alloc_repeat=3) -> Dict[str, Any]:
+    results = {}
+    for case in cases:
+        result = measure(case, repeat=repeat, warmup=warmup, alloc_repeat=alloc_repeat)
+        results[case.id] = result
+        log(f"{case.id:<55} {result['ops_per_s']:>14,.0f} ops/s  {result['peak_alloc_bytes'] / 1024:>10,.0f} KiB peak")
+    return {
+        "environment": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "machine": platform.machine()
+        },
+        "results": results
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], time_tolerance=0.3, alloc_tolerance=0.2,
+            alloc_floor=64 * 1024) -> List[Dict[str, Any]]:
+    """
+    Regressions of `current` against `baseline` results.
+
+    A case regresses when its throughput drops by more than `time_tolerance`
+    or its peak allocation grows by more than `alloc_tolerance` (and by more
+    than `alloc_floor` bytes, to ignore noise in tiny cases). Cases missing
+    from either side are skipped.
+    """
+    regressions = []
+    for case_id, result in current["results"].items():
+        base = baseline.get("results", {}).get(case_id)
+        if base is None:
+            continue
+        if result["ops_per_s"] < base["ops_per_s"] * (1 - time_tolerance):
+            regressions.append({
+                "case": case_id,
+                "metric": "ops_per_s",
+                "baseline": base["ops_per_s"],
+                "current": result["ops_per_s"],
+                "change": result["ops_per_s"] / base["ops_per_s"] - 1
+            })
+        growth = result["peak_alloc_bytes"] - base["peak_alloc_bytes"]
+        if growth > alloc_floor and result["peak_alloc_bytes"] > base["peak_alloc_bytes"] * (1 + alloc_tolerance):
+            regressions.append({
+                "case": case_id,
+                "metric": "peak_alloc_bytes",
+                "baseline": base["peak_alloc_bytes"],
+                "current": result["peak_alloc_bytes"],
+                "change": result["peak_alloc_bytes"] / max(base["peak_alloc_bytes"], 1) - 1
+            })
+    return regressions
+
+
+def load(path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
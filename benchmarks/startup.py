@@ -0,0 +1,79 @@
+# benchmarks/startup.py
+"""
+Startup-time benchmark for the vote processing service.
+
+Each run starts a fresh interpreter and measures how long it takes to import
+`tee.marlin_tee_integration.marlin_tee` and `fetch_proposals`, to run the
+FastAPI startup hooks, and to answer the first requests. Everything runs
+offline (fake SecretLLM, in-memory vote index, indexer disabled).
+
+    python -m benchmarks.startup --runs 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, time
+t0 = time.perf_counter()
+import tee.marlin_tee_integration.marlin_tee
+t1 = time.perf_counter()
+import fetch_proposals
+t2 = time.perf_counter()
+from fastapi.testclient import TestClient
+t3 = time.perf_counter()
+with TestClient(fetch_proposals.app) as client:
+    t4 = time.perf_counter()
+    client.get("/")
+    t5 = time.perf_counter()
+    client.get("/api/cache/stats")
+    t6 = time.perf_counter()
+print(json.dumps({
+    "import_marlin_tee_s": t1 - t0,
+    "import_fetch_proposals_s": t2 - t1,
+    "app_startup_s": t4 - t3,
+    "first_request_s": t5 - t4,
+    "second_request_s": t6 - t5,
+    "import_to_first_response_s": (t2 - t0) + (t5 - t3),
+}))
+"""
+
+OFFLINE_ENV = {
+    "SECRET_LLM_BACKEND": "fake",
+    "VOTE_INDEXER_ENABLED": "false",
+    "VOTE_INDEX_PATH": ":memory:",
+}
+
+
+def run_once() -> dict:
+    env = dict(os.environ, **OFFLINE_ENV)
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    # The service prints progress messages; the measurements are the last line
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(runs=5) -> dict:
+    samples = [run_once() for _ in range(runs)]
+    return {
+        metric: {
+            "median": statistics.median(s[metric] for s in samples),
+            "min": min(s[metric] for s in samples),
+            "max": max(s[metric] for s in samples),
+        }
+        for metric in samples[0]
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure import and first-request latency of the API")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to sample")
+    args = parser.parse_args()
+    print(json.dumps({"runs": args.runs, "metrics": run(args.runs)}, indent=2))
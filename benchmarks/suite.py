@@ -0,0 +1,352 @@
+# benchmarks/suite.py
+"""Benchmarks for the vote, auction, chain and storage hot paths"""
+
+import functools
+import json
+import random
+
+from benchmarks.fakes import CONTRACT, FakeChainRPC, InMemoryStorageManager
+from benchmarks.harness import benchmark
+
+NOW_MS = 1742461234567
+
+
+def make_votes(n, mix, seed=7):
+    """`n` votes in one of the formats process_votes_in_tee accepts"""
+    rng = random.Random(seed)
+    formats = {
+        "bytes32": lambda i: rng.randbytes(32),
+        "hex": lambda i: "0x" + rng.randbytes(32).hex(),
+        "json": lambda i: {"option": rng.choice(["inFavor", "against", "abstain"]),
+                           "timestamp": NOW_MS - rng.randrange(7 * 24 * 3600 * 1000)},
+        "json_str": lambda i: json.dumps({"option": rng.choice(["inFavor", "against", "abstain"]),
+                                          "timestamp": NOW_MS - rng.randrange(7 * 24 * 3600 * 1000)}),
+    }
+    if mix == "mixed":
+        order = list(formats)
+        return [formats[order[i % len(order)]](i) for i in range(n)]
+    return [formats[mix](i) for i in range(n)]
+
+
+def make_bids(n, seed=11):
+    rng = random.Random(seed)
+    return [{"bidder": "0x" + rng.randbytes(20).hex(), "amount": rng.randrange(1, 10 ** 6)} for _ in range(n)]
+
+
+@benchmark(
+    "tee.process_votes",
+    cases=[{"n": n, "mix": mix} for n in (1000, 10000, 100000) for mix in ("bytes32", "hex", "json", "mixed")],
+    quick=[{"n": 1000, "mix": mix} for mix in ("bytes32", "hex", "json", "mixed")]
+)
+def process_votes(n, mix):
+    from ai.nillion_integration.insight_jobs import InsightJobQueue
+    from ai.nillion_integration.secret_llm import FakeSecretLLM
+    from tee.marlin_tee_integration import marlin_tee
+
+    votes = make_votes(n, mix)
+    storage = InMemoryStorageManager()
+    queue = InsightJobQueue(FakeSecretLLM())
+    previous = marlin_tee.insight_queue
+    marlin_tee.configure(queue=queue)
+
+    def teardown():
+        marlin_tee.insight_queue = previous
+        queue.shutdown(wait=True)
+
+    # The tally path; the Merkle commitment is measured by tee.commit_votes
+    return (lambda: marlin_tee.process_votes_in_tee(votes, "BENCH", storage_manager=storage, attest=False)), n, teardown
+
+
+@benchmark(
+    "tee.commit_votes",
+    cases=[{"n": n} for n in (10000, 100000)],
+    quick=[{"n": 10000}]
+)
+def commit_votes(n):
+    """Tally plus Merkle commitment of bytes32 votes, as attested by process_votes_in_tee"""
+    from tee.marlin_tee_integration.vote_batch import TallyAccumulator, VoteBatch
+
+    batch = VoteBatch.from_votes(make_votes(n, "bytes32"))
+    return (lambda: TallyAccumulator().add(batch).merkle.root()), n, None
+
+
+@benchmark(
+    "tee.process_auction_bids",
+    cases=[{"n": 1000}, {"n": 100000}],
+    quick=[{"n": 1000}]
+)
+def process_auction_bids(n):
+    from tee.marlin_tee_integration import marlin_tee
+
+    bids = make_bids(n)
+    return (lambda: marlin_tee.process_auction_bids(bids, "BENCH")), n, None
+
+
+@benchmark(
+    "tee.process_auction_bids_stream",
+    cases=[{"n": 100000, "form": "sealed"}, {"n": 1000000, "form": "sealed"}, {"n": 1000000, "form": "json"}],
+    quick=[{"n": 100000, "form": "sealed"}]
+)
+def process_auction_bids_stream(n, form):
+    """Bids generated on the fly, as streamed from the chain, so peak memory is the engine's own"""
+    from tee.marlin_tee_integration import marlin_tee
+
+    def bids():
+        rng = random.Random(11)
+        for i in range(n):
+            amount = rng.randrange(1, 10 ** 6)
+            if form == "sealed":
+                yield f"0x{i:040x}", amount.to_bytes(32, "big")
+            else:
+                yield {"bidder": f"0x{i:040x}", "amount": amount}
+
+    return (lambda: marlin_tee.process_auction_bids(bids(), "BENCH")), n, None
+
+
+@functools.lru_cache(maxsize=None)
+def _encrypted_votes(n, key_bits):
+    from tee.marlin_tee_integration.homomorphic import HomomorphicTally, PaillierPrivateKey, encrypt_votes_fast
+
+    rng = random.Random(5)
+    context = HomomorphicTally(PaillierPrivateKey.generate(key_bits))
+    return context, encrypt_votes_fast(context, [rng.choice(context.option_names) for _ in range(n)])
+
+
+@benchmark(
+    "tee.homomorphic_tally",
+    cases=[{"n": 2000, "key_bits": 2048, "workers": 1}]
+    + [{"n": 100000, "key_bits": 2048, "workers": workers} for workers in (1, 2, 4, 8)],
+    quick=[{"n": 2000, "key_bits": 2048, "workers": 1}]
+)
+def homomorphic_tally(n, key_bits, workers):
+    """Paillier tally throughput by number of worker processes; compare the cases to see core scaling"""
+    from tee.marlin_tee_integration import marlin_tee
+
+    context, ciphertexts = _encrypted_votes(n, key_bits)
+    return (lambda: marlin_tee.tally_encrypted_votes(ciphertexts, "BENCH", context=context, workers=workers)), n, None
+
+
+@benchmark(
+    "chain.fetch_proposal_votes",
+    cases=[{"n": 2000}, {"n": 10000}],
+    quick=[{"n": 2000}]
+)
+def fetch_proposal_votes(n):
+    import fetch_proposals
+    from integrations.chain.vote_indexer import VoteIndexer, VoteIndexStore
+
+    chain = FakeChainRPC({1: n}).start()
+    components = fetch_proposals.Components(rpc_url=chain.url, contract_address=CONTRACT)
+    components.vote_indexer = VoteIndexer(
+        components.rpc_client, CONTRACT, VoteIndexStore(":memory:"), fetcher=components.vote_fetcher
+    )
+    previous = fetch_proposals.components
+    fetch_proposals.components = components
+
+    def workload():
+        votes = fetch_proposals.fetch_proposal_votes(1)
+        assert len(votes) == n
+
+    def teardown():
+        fetch_proposals.components = previous
+        components.close()
+        chain.stop()
+
+    return workload, n, teardown
+
+
+@benchmark(
+    "chain.execute_decisions",
+    cases=[{"n": n, "mode": mode} for n in (10, 50) for mode in ("sequential", "batched")],
+    quick=[{"n": 10, "mode": mode} for mode in ("sequential", "batched")]
+)
+def execute_decisions(n, mode):
+    """
+    finalizeProposal + verifyTeeResult per decision, one at a time or through
+    one queue flush, against a node 20 ms away. What remains of the batched
+    time is mostly ECDSA signing and (in the fake node) sender recovery.
+    """
+    from integrations.nethermind.eth_executor import NethermindExecutor
+
+    chain = FakeChainRPC({}, latency=0.02).start()
+    executor = NethermindExecutor(chain.url, private_key="0x" + "4c" * 32, voting_address=CONTRACT,
+                                  verification_address="0x000000000000000000000000000000000000bEEF")
+    decisions = [({"proposal_id": i, "ai_insights": None},
+                  {"counts": {"inFavor": i, "against": 1, "abstain": 0}, "votesRoot": "0x%064x" % i,
+                   "tee_proof": "0x%064x" % i})
+                 for i in range(n)]
+
+    def workload():
+        if mode == "batched":
+            executions = executor.execute_dao_decisions(decisions, poll_interval=0)
+        else:
+            executions = [executor._send_transactions([decision], poll_interval=0)[0] for decision in decisions]
+        assert all(execution["success"] for execution in executions)
+
+    def teardown():
+        executor.provider.session.close()
+        chain.stop()
+
+    return workload, n, teardown
+
+
+@benchmark(
+    "strategy.generate_proposals",
+    cases=[{"assets": 1000}, {"assets": 3000}],
+    quick=[{"assets": 1000}]
+)
+def generate_proposals(assets):
+    """One new daily price row per call over a year of history: covariance update, screening and solve"""
+    import numpy as np
+
+    from integrations.nethermind.autonomous_strategies.proposal_generator import ProposalGenerator
+
+    calls = 20
+    rng = np.random.default_rng(5)
+    returns = rng.normal(0.0004, 0.001, assets) + rng.uniform(0.01, 0.05, assets) * rng.standard_normal((2000, assets))
+    prices = 100 * np.exp(np.cumsum(returns, axis=0))
+    names = [f"TOKEN{i}" for i in range(assets)]
+    generator = ProposalGenerator()
+    generator.observe_market({"assets": names, "prices": prices[:365]})
+    treasury = {"holdings": {"TOKEN0": 50, "TOKEN1": 50}}
+    rows = [365]
+
+    def workload():
+        for _ in range(calls):
+            rows[0] += 1
+            proposals = generator.generate_investment_proposals(treasury, {"assets": names, "prices": prices[:rows[0]]})
+            assert proposals
+
+    return workload, calls, None
+
+
+@benchmark(
+    "strategy.risk_ticks",
+    cases=[{"assets": assets, "mode": mode} for assets in (10, 50) for mode in ("tick", "batch")],
+    quick=[{"assets": 10, "mode": mode} for mode in ("tick", "batch")]
+)
+def risk_ticks(assets, mode):
+    """Synthetic minute ticks through the rolling risk engine (1440-tick window), one at a time or in batches"""
+    import numpy as np
+
+    from integrations.nethermind.autonomous_strategies.risk_assessment import TreasuryRiskMonitor
+
+    ticks = 5000 if mode == "tick" else 100000
+    rng = np.random.default_rng(13)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, (ticks, assets)), axis=0))
+    balances = np.tile(rng.uniform(1, 10, assets), (ticks, 1))
+    # Rebalance every 500 ticks
+    balances[::500] *= rng.uniform(0.5, 1.5, (len(balances[::500]), assets))
+    monitor = TreasuryRiskMonitor(range(assets))
+
+    def workload():
+        if mode == "batch":
+            for start in range(0, ticks, 1000):
+                monitor.ingest_many(prices[start:start + 1000], balances[start:start + 1000])
+        else:
+            for tick, holding in zip(prices, balances):
+                monitor.ingest(tick, holding)
+        assert monitor.snapshot()["volatility"] > 0
+
+    return workload, ticks, None
+
+
+@benchmark(
+    "ai.proposal_lookup",
+    cases=[{"proposals": 1000}, {"proposals": 5000}],
+    quick=[{"proposals": 1000}]
+)
+def proposal_lookup(proposals):
+    """Nearest-neighbour lookups of edited proposals in a ProposalIndex of 120-word proposals"""
+    import numpy as np
+
+    from ai.nillion_integration.proposal_index import ProposalIndex
+
+    queries = 200
+    rng = np.random.default_rng(17)
+    vocabulary = [f"term{i}" for i in range(5000)]
+    texts = [" ".join(rng.choice(vocabulary, 120)) for _ in range(proposals)]
+    index = ProposalIndex()
+    for i, text in enumerate(texts):
+        index.add(i, text, f"analysis {i}")
+    edited = [(i, texts[i] + " with an amended budget") for i in rng.integers(0, proposals, queries)]
+
+    def workload():
+        for key, text in edited:
+            assert index.nearest(text)[0].key == key
+
+    return workload, queries, None
+
+
+def _storage_manager(cache=False):
+    from integrations.og_storage.local_service import LocalStorageService
+    from integrations.og_storage.metadata_cache import MetadataCache
+    from integrations.og_storage.storage_manager import StorageManager
+    from integrations.og_storage.transport import StorageTransport
+    from integrations.og_storage.typescript_client import ZeroGStorageClient
+
+    service = LocalStorageService().start()
+    transport = StorageTransport()
+    manager = StorageManager(service.url, client=ZeroGStorageClient(service.url, transport=transport))
+    manager.cache = MetadataCache() if cache else None
+
+    def teardown():
+        transport.close()
+        service.stop()
+
+    return service, manager, teardown
+
+
+def _metadata(i):
+    return {"results": {"proposalId": i, "counts": {"inFavor": i, "against": 1, "abstain": 0}}, "timestamp": NOW_MS}
+
+
+@benchmark("storage.store_metadata", cases=[{"n": 200}], quick=[{"n": 200}])
+def store_metadata(n):
+    _, manager, teardown = _storage_manager()
+
+    def workload():
+        for i in range(n):
+            manager.store_metadata(f"vote_results_{i}", _metadata(i))
+
+    return workload, n, teardown
+
+
+@benchmark("storage.retrieve_metadata", cases=[{"n": 200}], quick=[{"n": 200}])
+def retrieve_metadata(n):
+    service, manager, teardown = _storage_manager()
+    service.kv.update({f"vote_results_{i}": _metadata(i) for i in range(n)})
+
+    def workload():
+        for i in range(n):
+            manager.retrieve_metadata(f"vote_results_{i}")
+
+    return workload, n, teardown
+
+
+@benchmark("storage.retrieve_metadata_cached", cases=[{"n": 2000}], quick=[{"n": 2000}])
+def retrieve_metadata_cached(n):
+    service, manager, teardown = _storage_manager(cache=True)
+    service.kv.update({f"auction_{i}": _metadata(i) for i in range(n)})
+    manager.warm_up([f"auction_{i}" for i in range(n)])
+
+    def workload():
+        for i in range(n):
+            manager.retrieve_metadata(f"auction_{i}")
+
+    return workload, n, teardown
+
+
+@benchmark("storage.store_many", cases=[{"n": 2000}], quick=[{"n": 2000}])
+def store_many(n):
+    _, manager, teardown = _storage_manager()
+    items = {f"vote_results_{i}": _metadata(i) for i in range(n)}
+    return (lambda: manager.store_many(items)), n, teardown
+
+
+@benchmark("storage.retrieve_many", cases=[{"n": 2000}], quick=[{"n": 2000}])
+def retrieve_many(n):
+    service, manager, teardown = _storage_manager()
+    keys = [f"vote_results_{i}" for i in range(n)]
+    service.kv.update({key: _metadata(i) for i, key in enumerate(keys)})
+    return (lambda: manager.retrieve_many(keys)), n, teardown
@@ -1,10 +1,22 @@
-from web3 import Web3
+import asyncio
+import functools
 import json
-from tee.marlin_tee_integration.marlin_tee import process_votes_in_tee
-from fastapi import FastAPI, HTTPException
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from tee.marlin_tee_integration import marlin_tee
+from tee.marlin_tee_integration.marlin_tee import process_votes_in_tee, load_tally_snapshot, load_tally_snapshots
+from tee.marlin_tee_integration.vote_batch import TallyAccumulator, VoteBatch, vote_leaves
+from tee.marlin_tee_integration.merkle import MerkleTree, MerkleTreeCache, verify_proofs
+from integrations.chain.vote_fetcher import BatchRPCClient, EncryptedVoteFetcher, VoteFetchError
+from integrations.chain.vote_indexer import VoteIndexer, VoteIndexStore
+from results_cache import ResultsCache
+import metrics
+from metrics import span
+from fastapi import Body, FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-import uvicorn
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, Awaitable, Iterator, List, NamedTuple
 
 # Create FastAPI app
 app = FastAPI(title="AISecureFundDAO Vote Processing API")
@@ -19,61 +31,383 @@ app.add_middleware(
 )
 
 # Connect to Arbitrum Sepolia
-w3 = Web3(Web3.HTTPProvider('https://sepolia-rollup.arbitrum.io/rpc'))
+RPC_URL = os.getenv('RPC_URL', 'https://sepolia-rollup.arbitrum.io/rpc')
 
-# Load contract ABIs
-with open('./frontend/src/utils/PrivateVotingABI.json', 'r') as f:
-    private_voting_abi = json.load(f)
+# Contract ABIs
+PRIVATE_VOTING_ABI_PATH = './frontend/src/utils/PrivateVotingABI.json'
 
 # Contract addresses
-PRIVATE_VOTING_ADDRESS = w3.to_checksum_address('0x32cb351c8562cb896ffbe7cc3bbc7ccebbcb2afb')
+PRIVATE_VOTING_ADDRESS = '0x32CB351c8562Cb896Ffbe7cc3bbc7cceBBcB2Afb'
 
-# Initialize contract
-private_voting_contract = w3.eth.contract(address=PRIVATE_VOTING_ADDRESS, abi=private_voting_abi)
+# Bulk processing (--process-range and /api/proposals/results): proposals in flight at once,
+# and the most proposal ids one request may ask for
+BULK_MAX_CONCURRENCY = int(os.getenv('BULK_MAX_CONCURRENCY', '4'))
+BULK_MAX_PROPOSALS = int(os.getenv('BULK_MAX_PROPOSALS', '1000'))
+# Inclusion proofs served or verified per request
+MAX_PROOFS = int(os.getenv('MAX_PROOFS', '1000'))
 
-def fetch_proposal_votes(project_id):
-    """Fetch encrypted votes for a specific proposal from the blockchain"""
-    encrypted_votes = []
-    
+def lazy_component(factory):
+    """Property that builds its value once, on first access, and can be overridden by assignment"""
+    name = factory.__name__
+
+    def get(self):
+        try:
+            return self.__dict__[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self.__dict__:
+                self.__dict__[name] = factory(self)
+            return self.__dict__[name]
+
+    def set(self, value):
+        self.__dict__[name] = value
+
+    return property(get, set, doc=factory.__doc__)
+
+class Components:
+    """
+    Service dependencies, created on first use.
+
+    Nothing here touches the network or disk until it is needed, so importing
+    this module stays cheap. Any component can be injected by assigning it
+    before first use (e.g. `components.vote_fetcher = fake`), and `close`
+    releases whatever was created so the next use starts afresh.
+    """
+
+    _lock = threading.RLock()
+
+    def __init__(self, rpc_url=RPC_URL, contract_address=PRIVATE_VOTING_ADDRESS, abi_path=PRIVATE_VOTING_ABI_PATH):
+        self.rpc_url = rpc_url
+        self.contract_address = contract_address
+        self.abi_path = abi_path
+
+    def created(self, name) -> bool:
+        return name in self.__dict__
+
+    def create(self, *names):
+        """Build the named components now instead of on first use"""
+        for name in names:
+            getattr(self, name)
+
+    @lazy_component
+    def w3(self):
+        """Web3 connection (only used for contract calls)"""
+        from web3 import Web3
+        return Web3(Web3.HTTPProvider(self.rpc_url))
+
+    @lazy_component
+    def private_voting_contract(self):
+        with open(self.abi_path, 'r') as f:
+            private_voting_abi = json.load(f)
+        return self.w3.eth.contract(address=self.contract_address, abi=private_voting_abi)
+
+    @lazy_component
+    def rpc_client(self):
+        return BatchRPCClient(self.rpc_url)
+
+    @lazy_component
+    def vote_fetcher(self):
+        """Batched vote fetcher (one JSON-RPC batch per chunk of votes)"""
+        return EncryptedVoteFetcher(self.rpc_client, self.contract_address)
+
+    @lazy_component
+    def vote_indexer(self):
+        """Local index of VoteCast / ProposalFinalized logs, kept up to date in the background"""
+        indexer = VoteIndexer(
+            self.rpc_client,
+            self.contract_address,
+            VoteIndexStore(os.getenv('VOTE_INDEX_PATH', 'vote_index.db')),
+            start_block=vote_index_start_block(),
+            confirmations=int(os.getenv('VOTE_INDEX_CONFIRMATIONS', '12')),
+            fetcher=self.vote_fetcher
+        )
+        indexer.add_listener(results_cache.on_chain_event)
+        return indexer
+
+    @lazy_component
+    def storage_manager(self):
+        """0G storage manager shared by every proposal (one connection pool, one metadata cache)"""
+        from integrations.og_storage.storage_manager import StorageManager
+        return StorageManager()
+
+    @lazy_component
+    def merkle_trees(self):
+        """Merkle trees over the votes of recently queried proposals, for inclusion proofs"""
+        return MerkleTreeCache(max_entries=int(os.getenv('MERKLE_TREE_CACHE_SIZE', '64')))
+
+    @lazy_component
+    def blocking_executor(self):
+        """Bounded pool for blocking work (web3 calls, TEE processing, LLM and storage requests)"""
+        return ThreadPoolExecutor(
+            max_workers=int(os.getenv('API_BLOCKING_WORKERS', '8')),
+            thread_name_prefix='vote-api'
+        )
+
+    def close(self):
+        """Stop background work and drop every created component"""
+        with self._lock:
+            created = dict(self.__dict__)
+            for name in ('w3', 'private_voting_contract', 'rpc_client', 'vote_fetcher', 'vote_indexer',
+                         'storage_manager', 'merkle_trees', 'blocking_executor'):
+                self.__dict__.pop(name, None)
+        if 'vote_indexer' in created:
+            created['vote_indexer'].stop(timeout=10)
+        if 'storage_manager' in created:
+            created['storage_manager'].flush()
+        if 'blocking_executor' in created:
+            created['blocking_executor'].shutdown(wait=False)
+
+components = Components()
+
+def fetch_proposal_votes(project_id, start=0, block=None, count=None):
+    """
+    Fetch encrypted votes for a specific proposal, from index `start` onwards, as a
+    VoteBatch stamped with the timestamps of the blocks the votes were cast in.
+    Confirmed votes come from the local index, only newer votes are read from the chain
+    (as of `block`, where the proposal holds `count` votes, when those are already known).
+    Raises VoteFetchError if only part of the votes could be retrieved.
+    """
     try:
-        # First check if the proposal exists
-        proposal_details = private_voting_contract.functions.getProposalDetails(project_id).call()
-        
-        # Try to get all votes directly from the public array
-        i = 0
-        while True:
-            try:
-                # Access encryptedVotes mapping directly
-                vote = private_voting_contract.functions.encryptedVotes(project_id, i).call()
-                encrypted_votes.append(vote)
-                i += 1
-            except Exception as e:
-                # Stop when out of bounds or error occurs
-                break
-                
-        print(f"Retrieved {len(encrypted_votes)} votes for proposal {project_id}")
-        return encrypted_votes
+        votes, timestamps = components.vote_indexer.votes_with_timestamps(project_id, start, block=block, count=count)
+        encrypted_votes = VoteBatch.from_votes(votes, timestamps=timestamps)
+    except VoteFetchError as e:
+        print(f"Error fetching votes for proposal {project_id}: {e}")
+        raise
     except Exception as e:
         print(f"Error fetching votes for proposal {project_id}: {e}")
         return []
 
-def process_chain_proposal(project_id):
-    """Process votes for an on-chain proposal using MarlinTEE"""
-    # Fetch encrypted votes from blockchain
-    encrypted_votes = fetch_proposal_votes(project_id)
-    
-    if not encrypted_votes:
-        print(f"No votes found for proposal {project_id}")
-        return None
-    
-    # Process votes using MarlinTEE
-    print(f"Processing {len(encrypted_votes)} votes in TEE...")
-    results = process_votes_in_tee(encrypted_votes, project_id)
-    
+    print(f"Retrieved {len(encrypted_votes)} votes for proposal {project_id}")
+    return encrypted_votes
+
+class ProposalState(NamedTuple):
+    """Where processing of a proposal resumes, read for many proposals at once by `prefetch_proposal_states`"""
+    accumulator: Optional[TallyAccumulator]
+    vote_count: int
+    block: str
+
+def prefetch_proposal_states(project_ids) -> Dict[int, ProposalState]:
+    """
+    Tally snapshots and on-chain vote counts of many proposals: one storage batch
+    for the snapshots and one JSON-RPC batch for the counts, all pinned to the same block.
+    """
+    project_ids = list(project_ids)
+    with span("bulk_snapshot_load"):
+        snapshots = load_tally_snapshots(project_ids, components.storage_manager)
+    with span("bulk_vote_count"):
+        block = components.vote_fetcher.block_number()
+        counts = components.vote_fetcher.vote_counts(project_ids, block)
+        # Unindexed votes are stamped with the pinned block; read its header once for all proposals
+        components.vote_indexer.blocks.timestamp(int(block, 16))
+    return {pid: ProposalState(snapshots.get(pid), counts[pid], block) for pid in project_ids}
+
+def process_chain_proposal(project_id, state: Optional[ProposalState] = None):
+    """
+    Process votes for an on-chain proposal using MarlinTEE.
+    Bulk callers pass the `state` they prefetched instead of reading it per proposal.
+    """
+    with span("total"):
+        if state is None:
+            # Resume from the tally stored with the previous results, if it is still consistent with the chain
+            with span("snapshot_load"):
+                accumulator = load_tally_snapshot(project_id, components.storage_manager)
+            block = count = on_chain = None
+            if accumulator:
+                with span("vote_count"):
+                    on_chain = components.vote_fetcher.vote_count(project_id)
+        else:
+            accumulator, count, block = state
+            on_chain = count
+        if accumulator and accumulator.total > on_chain:
+            print(f"Stored tally for proposal {project_id} is ahead of the chain, recomputing")
+            accumulator = None
+        elif accumulator and not accumulator.committed:
+            print(f"Stored tally for proposal {project_id} has no vote commitment, recomputing")
+            accumulator = None
+        start = accumulator.total if accumulator else 0
+
+        # Fetch encrypted votes past the checkpoint
+        with span("chain_fetch"):
+            encrypted_votes = fetch_proposal_votes(project_id, start, block=block, count=count)
+        
+        if not encrypted_votes and not accumulator:
+            print(f"No votes found for proposal {project_id}")
+            return None
+        
+        # Process votes using MarlinTEE
+        print(f"Processing {len(encrypted_votes)} new votes in TEE (resuming after {start})...")
+        results = process_votes_in_tee(encrypted_votes, project_id, accumulator=accumulator,
+                                       storage_manager=components.storage_manager)
+        
+        return results
+
+def parse_id_ranges(spec: str, limit: int, noun="proposal id") -> List[int]:
+    """Ids from a comma-separated list of ids and inclusive ranges, e.g. "1-50,72", at most `limit` of them"""
+    ids = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, sep, last = part.partition('-')
+        try:
+            first, last = int(first), int(last) if sep else int(first)
+        except ValueError:
+            raise ValueError(f"Invalid {noun} or range: {part!r}")
+        if first < 0 or last < first:
+            raise ValueError(f"Invalid {noun} or range: {part!r}")
+        if len(ids) + last - first + 1 > limit:
+            raise ValueError(f"At most {limit} {noun}s can be requested at once")
+        ids.extend(range(first, last + 1))
+    if not ids:
+        raise ValueError(f"No {noun}s given")
+    return list(dict.fromkeys(ids))
+
+def parse_proposal_ids(spec: str) -> List[int]:
+    """Proposal ids from a comma-separated list of ids and inclusive ranges, e.g. "1-50,72" """
+    return parse_id_ranges(spec, BULK_MAX_PROPOSALS)
+
+def proposal_merkle_tree(project_id) -> MerkleTree:
+    """
+    Merkle tree over the votes of a proposal, for inclusion proofs. It is built
+    on first use, then only extended with the votes cast since (O(new votes + log n)).
+    """
+    tree = components.merkle_trees.get(project_id)
+    start = tree.size
+    with span("merkle_sync"):
+        votes = components.vote_indexer.votes(project_id, start)
+        if votes:
+            tree.extend(vote_leaves(VoteBatch.from_votes(votes)), start=start)
+    return tree
+
+def vote_proofs(project_id, indices: List[int], size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Inclusion proofs of votes of a proposal. By default they are against the
+    root attested with the latest results (`votesRoot`), or the root over every
+    vote when there are no results yet.
+    """
+    tree = proposal_merkle_tree(project_id)
+    if size is None:
+        cached = results_cache.get(project_id)
+        attested = cached.get("results", {}).get("total") if cached else None
+        size = attested if attested is not None and attested <= tree.size else tree.size
+    with span("merkle_proof"):
+        proofs = tree.proofs(indices, size)
+    return {"proposalId": project_id, "size": size, "root": tree.root(size), "proofs": proofs}
+
+def bulk_outcome(project_id, results=None, error: Optional[Exception] = None) -> Dict[str, Any]:
+    """One line of bulk output: the results of a proposal, or why there are none"""
+    if error is not None:
+        return {"projectId": project_id, "status": "error", "error": str(error)}
+    if not results:
+        return {"projectId": project_id, "status": "empty", "error": f"No votes found for proposal {project_id}"}
+    return {"projectId": project_id, "status": "ok", "results": results}
+
+def process_chain_proposals(project_ids, max_concurrency=BULK_MAX_CONCURRENCY) -> Iterator[Dict[str, Any]]:
+    """
+    Process many proposals with at most `max_concurrency` in flight, yielding a
+    `bulk_outcome` for each as soon as it completes. All proposals share the
+    prefetched block, the RPC connection pool and the storage manager.
+    """
+    project_ids = list(dict.fromkeys(project_ids))
+    states = prefetch_proposal_states(project_ids)
+    pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='vote-bulk')
+    try:
+        futures = {pool.submit(process_chain_proposal, pid, states[pid]): pid for pid in project_ids}
+        for future in as_completed(futures):
+            error = future.exception()
+            yield bulk_outcome(futures[future], None if error else future.result(), error)
+    finally:
+        # Stop early if the consumer goes away
+        pool.shutdown(wait=True, cancel_futures=True)
+
+# Bounded cache for proposal results, invalidated by indexed VoteCast / ProposalFinalized events
+results_cache = ResultsCache(
+    max_entries=int(os.getenv('RESULTS_CACHE_SIZE', '1024')),
+    ttl=float(os.getenv('RESULTS_CACHE_TTL', '30')),
+    persist_path=os.getenv('RESULTS_CACHE_PATH')
+)
+
+async def run_blocking(fn, *args, **kwargs):
+    """Run a blocking function on the bounded executor without stalling the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(components.blocking_executor, functools.partial(fn, *args, **kwargs))
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one in-flight computation"""
+
+    def __init__(self):
+        self._inflight: Dict[Any, asyncio.Future] = {}
+
+    async def do(self, key, fn: Callable[[], Awaitable[Any]]):
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._inflight[key] = future
+
+            def _forget(done):
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+
+            future.add_done_callback(_forget)
+        # Shield so that a disconnecting client does not cancel the shared computation
+        return await asyncio.shield(future)
+
+results_flight = SingleFlight()
+
+async def compute_proposal_results(project_id, state: Optional[ProposalState] = None):
+    """Process a proposal off the event loop and cache the results"""
+    results = await run_blocking(process_chain_proposal, project_id, state)
+    if results:
+        proposal = components.vote_indexer.store.proposal(project_id)
+        results_cache.set(project_id, results, finalized=bool(proposal and proposal["finalized"]))
     return results
 
-# Cache for proposal results to avoid reprocessing
-results_cache: Dict[int, Any] = {}
+def with_insights(results):
+    """Fill in the current state of the background AI insights job"""
+    job = marlin_tee.get_insight_queue().get(results.get("insights_job"))
+    if job is None:
+        return results
+    return dict(results, ai_insights=job.result, insights_status=job.status)
+
+def vote_indexer_enabled() -> bool:
+    return os.getenv('VOTE_INDEXER_ENABLED', 'true').lower() == 'true'
+
+def vote_index_start_block() -> int:
+    """
+    First block the vote indexer reads: the PrivateVoting deployment block,
+    PRIVATE_VOTING_START_BLOCK. Required while the indexer runs, as starting
+    from genesis would page through the whole chain before the first vote.
+    """
+    start_block = os.getenv('PRIVATE_VOTING_START_BLOCK')
+    if start_block:
+        return int(start_block)
+    if vote_indexer_enabled():
+        raise RuntimeError(
+            "PRIVATE_VOTING_START_BLOCK (the PrivateVoting deployment block) must be set "
+            "when VOTE_INDEXER_ENABLED is true"
+        )
+    # Without background sync the index is only read, never backfilled
+    return 0
+
+@app.on_event("startup")
+def startup():
+    """Restore cached results and create the components the first request would otherwise wait for"""
+    vote_index_start_block()
+    loaded = results_cache.load()
+    if loaded:
+        print(f"Restored {loaded} cached proposal results")
+    components.create('vote_fetcher', 'vote_indexer', 'blocking_executor')
+    marlin_tee.get_insight_queue()
+    if vote_indexer_enabled():
+        components.vote_indexer.start(poll_interval=float(os.getenv('VOTE_INDEXER_POLL_INTERVAL', '5')))
+
+@app.on_event("shutdown")
+def shutdown():
+    """Stop background work; components are recreated if the app is started again"""
+    components.close()
+    marlin_tee.shutdown(wait=False)
+    results_cache.save()
 
 @app.get("/")
 async def root():
@@ -86,27 +420,210 @@ async def get_proposal_results(project_id: int, refresh: Optional[bool] = False)
     
     - **project_id**: ID of the proposal to process
     - **refresh**: Set to true to force reprocessing instead of using cache
+    
+    Concurrent requests for the same proposal share a single computation.
     """
     # Check cache first unless refresh is requested
-    if not refresh and project_id in results_cache:
-        return results_cache[project_id]
+    if not refresh:
+        cached = results_cache.get(project_id)
+        if cached is not None:
+            return with_insights(cached)
     
-    # Process the proposal votes
-    results = process_chain_proposal(project_id)
+    # Process the proposal votes, joining any computation already in flight
+    try:
+        results = await results_flight.do(project_id, lambda: compute_proposal_results(project_id))
+    except VoteFetchError as e:
+        raise HTTPException(status_code=502, detail=f"{e} (failed indices: {sorted(e.failures)[:20]})")
     
     if not results:
         raise HTTPException(status_code=404, detail=f"No votes found for proposal {project_id}")
     
-    # Update cache
-    results_cache[project_id] = results
+    return with_insights(results)
+
+@app.get("/api/proposals/results")
+async def get_proposals_results(ids: str, refresh: Optional[bool] = False):
+    """
+    Get processed vote results for many proposals, streamed as newline-delimited JSON
     
-    return results
+    - **ids**: Comma-separated proposal IDs and inclusive ranges, e.g. `1-50,72`
+    - **refresh**: Set to true to force reprocessing instead of using cache
+    
+    One line is sent per proposal as soon as it completes: cached results first,
+    then up to BULK_MAX_CONCURRENCY proposals are processed at a time.
+    """
+    try:
+        project_ids = parse_proposal_ids(ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    cached = {}
+    if not refresh:
+        for project_id in project_ids:
+            results = results_cache.get(project_id)
+            if results is not None:
+                cached[project_id] = results
+    pending = [project_id for project_id in project_ids if project_id not in cached]
+    
+    # Read every resume point up front so the proposals share one storage and one RPC batch
+    states = {}
+    if pending:
+        try:
+            states = await run_blocking(prefetch_proposal_states, pending)
+        except Exception as e:
+            raise HTTPException(status_code=502, detail=f"Error reading proposal state: {e}")
+    
+    semaphore = asyncio.Semaphore(BULK_MAX_CONCURRENCY)
+    
+    async def process(project_id):
+        async with semaphore:
+            try:
+                results = await results_flight.do(
+                    project_id, lambda: compute_proposal_results(project_id, states[project_id])
+                )
+            except Exception as e:
+                return bulk_outcome(project_id, error=e)
+        return bulk_outcome(project_id, with_insights(results) if results else None)
+    
+    async def stream():
+        for project_id, results in cached.items():
+            yield json.dumps(bulk_outcome(project_id, with_insights(results))) + "\n"
+        tasks = [asyncio.ensure_future(process(project_id)) for project_id in pending]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield json.dumps(await next_done) + "\n"
+        finally:
+            # The client went away; shared computations carry on behind results_flight
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.get("/api/proposal/{project_id}/votes/{vote_index}/proof")
+async def get_vote_proof(project_id: int, vote_index: int, size: Optional[int] = None):
+    """
+    Merkle inclusion proof of one vote of a proposal
+    
+    - **vote_index**: Position of the vote in on-chain order
+    - **size**: Number of votes covered by the root to prove against (default: the attested results)
+    """
+    proofs = await get_vote_proofs(project_id, str(vote_index), size)
+    return dict(proofs["proofs"][0], proposalId=project_id)
+
+@app.get("/api/proposal/{project_id}/proofs")
+async def get_vote_proofs(project_id: int, indices: str, size: Optional[int] = None):
+    """
+    Merkle inclusion proofs of many votes of a proposal, all against the same root
+    
+    - **indices**: Comma-separated vote indices and inclusive ranges, e.g. `0-99,250`
+    - **size**: Number of votes covered by the root to prove against (default: the attested results)
+    """
+    try:
+        vote_indices = parse_id_ranges(indices, MAX_PROOFS, noun="vote index")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        return await run_blocking(vote_proofs, project_id, vote_indices, size)
+    except VoteFetchError as e:
+        raise HTTPException(status_code=502, detail=f"{e} (failed indices: {sorted(e.failures)[:20]})")
+    except IndexError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/api/proofs/verify")
+async def verify_vote_proofs(proofs: List[Dict[str, Any]] = Body(...)):
+    """
+    Verify many Merkle inclusion proofs at once; proofs sharing a root share
+    their hashing. Returns one boolean per proof, in order.
+    """
+    if len(proofs) > MAX_PROOFS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_PROOFS} proofs can be verified at once")
+    valid = await run_blocking(verify_proofs, proofs)
+    return {"valid": valid, "all_valid": all(valid)}
+
+@app.get("/api/tee/public-key")
+async def get_tee_public_key():
+    """
+    Paillier public key under which votes are encrypted for `tally_encrypted_votes`.
+    Only served when the private key persists (HOMOMORPHIC_KEY_PATH).
+    """
+    try:
+        context = await run_blocking(marlin_tee.setup_seal_context, require_persistent_key=True)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return dict(context.public_key.to_dict(), **context.params)
+
+@app.get("/api/proposal/{project_id}/insights")
+async def get_proposal_insights(project_id: int):
+    """Status and result of the latest AI insights job for a proposal"""
+    job = marlin_tee.get_insight_queue().latest_for(project_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No insights requested for proposal {project_id}")
+    return job.to_dict()
+
+@app.get("/api/insights/{job_id}")
+async def get_insights_job(job_id: str):
+    """Status and result of an AI insights job"""
+    job = marlin_tee.get_insight_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown insights job {job_id}")
+    return job.to_dict()
+
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Hit / miss / eviction statistics of the results cache"""
+    return results_cache.stats()
+
+@app.get("/api/llm/cache/stats")
+async def get_llm_cache_stats():
+    """Hit rate of the Nillion SecretLLM response cache"""
+    llm = marlin_tee.get_secret_llm()
+    if not hasattr(llm, "cache_stats"):
+        raise HTTPException(status_code=404, detail="LLM backend has no response cache")
+    return llm.cache_stats()
+
+def _llm_cache_stats():
+    llm = marlin_tee.secret_llm
+    return llm.cache_stats() if hasattr(llm, "cache_stats") else None
+
+def _metadata_cache_stats():
+    from integrations.og_storage import metadata_cache
+    cache = metadata_cache._default_cache
+    return cache.stats() if cache is not None else None
+
+# Component statistics exported on /metrics; components that were never created are skipped
+metrics.registry.add_collector(metrics.stats_collector(
+    "results_cache", results_cache.stats,
+    counters=("hits", "misses", "evictions", "expirations", "invalidations")
+))
+metrics.registry.add_collector(metrics.stats_collector(
+    "llm_cache", _llm_cache_stats,
+    counters=("memory_hits", "disk_hits", "misses", "coalesced", "evictions")
+))
+metrics.registry.add_collector(metrics.stats_collector(
+    "metadata_cache", _metadata_cache_stats,
+    counters=("memory_hits", "disk_hits", "misses", "compactions")
+))
+metrics.registry.add_collector(metrics.stats_collector(
+    "merkle_trees", lambda: components.merkle_trees.stats() if components.created('merkle_trees') else None
+))
+metrics.registry.add_collector(metrics.stats_collector(
+    "rpc", lambda: components.rpc_client.stats() if components.created('rpc_client') else None,
+    counters=("batches", "calls", "errors")
+))
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Stage timings and cache / RPC counters in the Prometheus text format"""
+    if not metrics.registry.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (METRICS_ENABLED=false)")
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/api/proposals/{project_id}/details")
 async def get_proposal_details(project_id: int):
     """Get basic details about a proposal from the contract"""
     try:
-        details = private_voting_contract.functions.getProposalDetails(project_id).call()
+        details = await run_blocking(components.private_voting_contract.functions.getProposalDetails(project_id).call)
         
         # Format the response
         return {
@@ -128,14 +645,36 @@ if __name__ == "__main__":
     parser.add_argument('--host', default='0.0.0.0', help='Host to run the API on')
     parser.add_argument('--port', default=8000, type=int, help='Port to run the API on')
     parser.add_argument('--process', default=None, type=int, help='Process a specific proposal ID and exit')
+    parser.add_argument('--process-range', default=None,
+                        help='Process many proposals (e.g. "1-200" or "1-50,72"), print one JSON line per proposal and exit')
+    parser.add_argument('--concurrency', default=BULK_MAX_CONCURRENCY, type=int,
+                        help='Proposals processed at once with --process-range')
+    parser.add_argument('--chunk-size', default=None, type=int, help='Votes fetched per JSON-RPC batch')
+    parser.add_argument('--rpc-workers', default=None, type=int, help='Number of JSON-RPC batches in flight')
     
     args = parser.parse_args()
     
+    if args.chunk_size is not None:
+        components.vote_fetcher.chunk_size = args.chunk_size
+    if args.rpc_workers is not None:
+        components.vote_fetcher.max_workers = args.rpc_workers
+    
     if args.process is not None:
         # Just process a single proposal and exit
         results = process_chain_proposal(args.process)
+        if results:
+            # Wait for the background AI insights before printing
+            marlin_tee.get_insight_queue().get(results["insights_job"]).wait()
+            results = with_insights(results)
         print(json.dumps(results, indent=4))
+    elif args.process_range is not None:
+        for outcome in process_chain_proposals(parse_proposal_ids(args.process_range), max_concurrency=args.concurrency):
+            print(json.dumps(outcome), flush=True)
+        # Let queued AI insights finish and be stored before exiting
+        marlin_tee.shutdown(wait=True)
+        components.close()
     else:
         # Run the API server
+        import uvicorn
         print(f"Starting API server on {args.host}:{args.port}")
         uvicorn.run(app, host=args.host, port=args.port)
@@ -0,0 +1,82 @@
+# integrations/chain/bid_fetcher.py
+
+from itertools import islice
+from typing import Iterator, Tuple
+
+from eth_hash.auto import keccak
+
+from integrations.chain.vote_fetcher import DEFAULT_CHUNK_SIZE, BatchRPCClient, RPCError
+from integrations.chain.vote_indexer import DEFAULT_MAX_BLOCK_RANGE, checksum_address
+
+BID_PLACED_TOPIC = "0x" + keccak(b"BidPlaced(uint256,address)").hex()
+
+# 4-byte selector of the public getter `sealedBids(uint256,address)`
+SEALED_BIDS_SELECTOR = keccak(b"sealedBids(uint256,address)")[:4].hex()
+
+
+class SealedBidFetcher:
+    """
+    Stream the sealed bids of a `SealedBidAuction` project.
+
+    Bidders are read from paginated `BidPlaced` logs and their current
+    `sealedBids[projectId][bidder]` values from one JSON-RPC batch of eth_calls
+    per `chunk_size` bidders, all pinned to the same block. Bids are yielded
+    chunk by chunk, so memory stays bounded by one log page and one chunk.
+
+    A bidder who bid several times has one log per bid but a single stored
+    bid, so they are yielded once per log with the same value.
+    """
+
+    def __init__(self, rpc: BatchRPCClient, contract_address, start_block=0, chunk_size=DEFAULT_CHUNK_SIZE,
+                 max_block_range=DEFAULT_MAX_BLOCK_RANGE):
+        self.rpc = rpc
+        self.contract_address = contract_address
+        self.start_block = start_block
+        self.chunk_size = chunk_size
+        self.max_block_range = max_block_range
+
+    def _get_logs(self, project_id, from_block, to_block):
+        return self.rpc.call("eth_getLogs", [{
+            "address": self.contract_address,
+            "fromBlock": hex(from_block),
+            "toBlock": hex(to_block),
+            "topics": [BID_PLACED_TOPIC, "0x" + format(int(project_id), "064x")]
+        }])
+
+    def iter_bidders(self, project_id, to_block) -> Iterator[str]:
+        """Bidder of every `BidPlaced` log of a project up to `to_block`, in chain order"""
+        from_block = self.start_block
+        step = self.max_block_range
+        while from_block <= to_block:
+            page_end = min(from_block + step - 1, to_block)
+            try:
+                logs = self._get_logs(project_id, from_block, page_end)
+            except RPCError:
+                # Providers cap eth_getLogs result sizes; retry with a smaller window
+                if step == 1:
+                    raise
+                step = max(step // 2, 1)
+                continue
+            logs.sort(key=lambda log: (int(log["blockNumber"], 16), int(log["logIndex"], 16)))
+            for log in logs:
+                yield checksum_address(log["topics"][2][-40:])
+            from_block = page_end + 1
+
+    def _bid_call(self, project_id, bidder, block):
+        data = "0x" + SEALED_BIDS_SELECTOR + format(int(project_id), "064x") + bidder[2:].lower().rjust(64, "0")
+        return ("eth_call", [{"to": self.contract_address, "data": data}, block])
+
+    def iter_bids(self, project_id, block=None) -> Iterator[Tuple[str, bytes]]:
+        """(bidder, bytes32 sealed bid) pairs of a project as of `block` (default: latest)"""
+        if block is None:
+            block = self.rpc.call("eth_blockNumber", [])
+        bidders = self.iter_bidders(project_id, int(block, 16))
+        while True:
+            chunk = list(islice(bidders, self.chunk_size))
+            if not chunk:
+                return
+            results = self.rpc.batch_call([self._bid_call(project_id, bidder, block) for bidder in chunk])
+            for bidder, result in zip(chunk, results):
+                if isinstance(result, Exception):
+                    raise result
+                yield bidder, bytes.fromhex(result[2:66])
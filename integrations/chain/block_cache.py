@@ -0,0 +1,86 @@
+# integrations/chain/block_cache.py
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable
+
+from integrations.chain.vote_fetcher import BatchRPCClient
+
+DEFAULT_MAX_ENTRIES = 65536
+DEFAULT_BATCH_SIZE = 500
+
+
+class BlockTimestampCache:
+    """
+    Block number -> timestamp (ms), so that each block header is fetched once.
+
+    Lookups go through an in-memory LRU, then the optional persistent `store`
+    (VoteIndexStore), and only the blocks missing from both are read from the
+    node, with one eth_getBlockByNumber batch per `batch_size` blocks.
+    """
+
+    def __init__(self, rpc: BatchRPCClient, store=None, max_entries=DEFAULT_MAX_ENTRIES,
+                 batch_size=DEFAULT_BATCH_SIZE):
+        self.rpc = rpc
+        self.store = store
+        self.max_entries = max_entries
+        self.batch_size = batch_size
+        self._memory: "OrderedDict[int, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.fetched = 0
+
+    def _remember(self, timestamps: Dict[int, int], fetched=0):
+        with self._lock:
+            self.fetched += fetched
+            for number, timestamp in timestamps.items():
+                self._memory[number] = timestamp
+                self._memory.move_to_end(number)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _fetch(self, numbers):
+        timestamps = {}
+        for i in range(0, len(numbers), self.batch_size):
+            chunk = numbers[i:i + self.batch_size]
+            results = self.rpc.batch_call([("eth_getBlockByNumber", [hex(n), False]) for n in chunk])
+            for number, block in zip(chunk, results):
+                if isinstance(block, Exception):
+                    raise block
+                if block is None:
+                    raise ValueError(f"Block {number} not found")
+                timestamps[number] = int(block["timestamp"], 16) * 1000
+        return timestamps
+
+    def timestamps(self, block_numbers: Iterable[int]) -> Dict[int, int]:
+        """Timestamps in ms of the given blocks"""
+        found = {}
+        missing = []
+        with self._lock:
+            for number in set(block_numbers):
+                timestamp = self._memory.get(number)
+                if timestamp is None:
+                    missing.append(number)
+                else:
+                    self._memory.move_to_end(number)
+                    found[number] = timestamp
+            self.hits += len(found)
+        if not missing:
+            return found
+
+        stored = self.store.block_timestamps(missing) if self.store is not None else {}
+        missing = sorted(number for number in missing if number not in stored)
+        fetched = self._fetch(missing) if missing else {}
+        if fetched and self.store is not None:
+            self.store.put_block_timestamps(fetched)
+        self._remember({**stored, **fetched}, fetched=len(fetched))
+        found.update(stored)
+        found.update(fetched)
+        return found
+
+    def timestamp(self, block_number) -> int:
+        return self.timestamps([block_number])[block_number]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._memory), "hits": self.hits, "fetched": self.fetched}
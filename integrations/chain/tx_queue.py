@@ -0,0 +1,333 @@
+# integrations/chain/tx_queue.py
+
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from eth_abi import encode
+from eth_account import Account
+from eth_hash.auto import keccak
+
+from integrations.chain.vote_fetcher import BatchRPCClient, RPCError
+
+FINALIZE_PROPOSAL_SELECTOR = keccak(b"finalizeProposal(uint256,bool,bytes32,bytes)")[:4]
+VERIFY_TEE_RESULT_SELECTOR = keccak(b"verifyTeeResult(bytes32,bytes)")[:4]
+
+# Headroom over eth_estimateGas, since cached estimates are reused across calls
+GAS_MARGIN = 1.25
+DEFAULT_GAS_TTL = 300.0
+DEFAULT_FEE_TTL = 12.0
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_RECEIPT_TIMEOUT = 120.0
+
+QUEUED = "queued"
+SENT = "sent"
+MINED = "mined"
+REVERTED = "reverted"
+FAILED = "failed"
+
+
+def finalize_proposal_data(project_id, approved, ai_insights_hash: bytes, tee_proof: bytes) -> bytes:
+    """Calldata of `PrivateVoting.finalizeProposal`"""
+    return FINALIZE_PROPOSAL_SELECTOR + encode(
+        ["uint256", "bool", "bytes32", "bytes"], [int(project_id), bool(approved), ai_insights_hash, tee_proof]
+    )
+
+
+def verify_tee_result_data(result_hash: bytes, result_proof: bytes) -> bytes:
+    """Calldata of `ResultVerification.verifyTeeResult`"""
+    return VERIFY_TEE_RESULT_SELECTOR + encode(["bytes32", "bytes"], [result_hash, result_proof])
+
+
+class NonceManager:
+    """
+    Hands out consecutive nonces locally, so many transactions can be signed
+    and sent without a round trip each. The counter is read from the node's
+    pending transaction count on first use and after `reset` (e.g. when a send
+    failed and left a gap, which the next transaction then fills).
+    """
+
+    def __init__(self, rpc: BatchRPCClient, address):
+        self.rpc = rpc
+        self.address = address
+        self._next: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def reserve(self, count=1) -> range:
+        with self._lock:
+            if self._next is None:
+                self._next = int(self.rpc.call("eth_getTransactionCount", [self.address, "pending"]), 16)
+            nonces = range(self._next, self._next + count)
+            self._next += count
+            return nonces
+
+    def reset(self):
+        with self._lock:
+            self._next = None
+
+
+class FeeCache:
+    """
+    Gas estimates per (contract, function selector) and current fee
+    parameters, each reused for a while instead of being asked for every
+    transaction. Missing gas estimates are requested in one batch.
+    """
+
+    def __init__(self, rpc: BatchRPCClient, gas_ttl=DEFAULT_GAS_TTL, fee_ttl=DEFAULT_FEE_TTL):
+        self.rpc = rpc
+        self.gas_ttl = gas_ttl
+        self.fee_ttl = fee_ttl
+        self._gas: Dict[Tuple[str, bytes], Tuple[float, int]] = {}
+        self._fees: Optional[Tuple[float, Dict[str, int]]] = None
+        self._lock = threading.Lock()
+        self.gas_hits = 0
+        self.gas_estimates = 0
+        self.fee_fetches = 0
+
+    @staticmethod
+    def _key(tx) -> Tuple[str, bytes]:
+        return tx["to"].lower(), bytes(tx["data"][:4])
+
+    def _estimate(self, sender, txs: List[Dict[str, Any]]) -> List[Any]:
+        return self.rpc.batch_call([
+            ("eth_estimateGas", [{"from": sender, "to": tx["to"], "data": "0x" + bytes(tx["data"]).hex(),
+                                  "value": hex(tx.get("value", 0))}])
+            for tx in txs
+        ])
+
+    def gas_limits(self, sender, txs: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Gas limit of each transaction, estimating only (contract, function)
+        pairs not cached. A transaction whose estimate failed (e.g. the call
+        would revert) gets the exception instead of a limit.
+        """
+        now = time.monotonic()
+        limits: Dict[Tuple[str, bytes], int] = {}
+        missing: Dict[Tuple[str, bytes], Dict[str, Any]] = {}
+        with self._lock:
+            for tx in txs:
+                key = self._key(tx)
+                cached = self._gas.get(key)
+                if cached is not None and now - cached[0] < self.gas_ttl:
+                    limits[key] = cached[1]
+                elif key not in missing:
+                    missing[key] = tx
+            # Transactions that share a cached or batched estimate
+            self.gas_hits += len(txs) - len(missing)
+
+        failed: Dict[Tuple[str, bytes], Exception] = {}
+        if missing:
+            results = self._estimate(sender, list(missing.values()))
+            with self._lock:
+                for key, result in zip(missing, results):
+                    if isinstance(result, Exception):
+                        failed[key] = result
+                        continue
+                    limits[key] = int(int(result, 16) * GAS_MARGIN)
+                    self._gas[key] = (now, limits[key])
+                self.gas_estimates += len(missing)
+
+        gas = [limits.get(self._key(tx)) for tx in txs]
+        if failed:
+            # A revert is usually specific to one call (e.g. an already finalized
+            # proposal), so the other calls of that function are estimated one by one
+            retry = [i for i, tx in enumerate(txs) if self._key(tx) in failed and tx is not missing[self._key(tx)]]
+            results = self._estimate(sender, [txs[i] for i in retry]) if retry else []
+            with self._lock:
+                self.gas_estimates += len(retry)
+                for i, result in zip(retry, results):
+                    if isinstance(result, Exception):
+                        gas[i] = result
+                        continue
+                    gas[i] = int(int(result, 16) * GAS_MARGIN)
+                    self._gas[self._key(txs[i])] = (now, gas[i])
+            # What is left is the call whose estimate failed in the first place
+            gas = [failed[self._key(tx)] if limit is None else limit for tx, limit in zip(txs, gas)]
+        return gas
+
+    def fees(self) -> Dict[str, int]:
+        """EIP-1559 fee fields (legacy `gasPrice` on chains without a base fee)"""
+        now = time.monotonic()
+        with self._lock:
+            if self._fees is not None and now - self._fees[0] < self.fee_ttl:
+                return self._fees[1]
+        block, tip, gas_price = self.rpc.batch_call([
+            ("eth_getBlockByNumber", ["latest", False]),
+            ("eth_maxPriorityFeePerGas", []),
+            ("eth_gasPrice", [])
+        ])
+        if isinstance(block, Exception):
+            raise block
+        base_fee = block.get("baseFeePerGas")
+        if base_fee is not None and not isinstance(tip, Exception):
+            tip = int(tip, 16)
+            fees = {"maxPriorityFeePerGas": tip, "maxFeePerGas": 2 * int(base_fee, 16) + tip}
+        elif not isinstance(gas_price, Exception):
+            fees = {"gasPrice": int(gas_price, 16)}
+        else:
+            raise gas_price
+        with self._lock:
+            self._fees = (now, fees)
+            self.fee_fetches += 1
+        return fees
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"gas_hits": self.gas_hits, "gas_estimates": self.gas_estimates, "fee_fetches": self.fee_fetches}
+
+
+class PendingTransaction:
+    """A contract call going through the queue"""
+
+    def __init__(self, to, data: bytes, value=0, label=None):
+        self.to = to
+        self.data = data
+        self.value = value
+        self.label = label
+        self.nonce: Optional[int] = None
+        self.tx_hash: Optional[str] = None
+        self.receipt: Optional[Dict[str, Any]] = None
+        self.status = QUEUED
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "label": self.label,
+            "to": self.to,
+            "nonce": self.nonce,
+            "tx_hash": self.tx_hash,
+            "status": self.status,
+            "block": int(self.receipt["blockNumber"], 16) if self.receipt else None,
+            "error": self.error
+        }
+
+
+class TransactionQueue:
+    """
+    Pipelined transaction submission for one sending account.
+
+    Calls are queued with `enqueue` and sent by `flush`: nonces come from a
+    local NonceManager, gas limits and fees from a FeeCache, and every
+    transaction is signed locally and sent in a single JSON-RPC batch of
+    eth_sendRawTransaction, without waiting for earlier ones to be mined.
+    `wait` then polls the receipts of all outstanding transactions with one
+    batch per interval. The contracts have no multicall entry point, so
+    finalizing N proposals is N transactions, but they share one submission
+    round trip and are mined together.
+    """
+
+    def __init__(self, rpc: BatchRPCClient, private_key, chain_id: Optional[int] = None,
+                 fee_cache: Optional[FeeCache] = None):
+        self.rpc = rpc
+        self.account = Account.from_key(private_key)
+        self._chain_id = chain_id
+        self.nonces = NonceManager(rpc, self.account.address)
+        self.fees = fee_cache or FeeCache(rpc)
+        self._queue: List[PendingTransaction] = []
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+
+    @property
+    def address(self) -> str:
+        return self.account.address
+
+    @property
+    def chain_id(self) -> int:
+        if self._chain_id is None:
+            self._chain_id = int(self.rpc.call("eth_chainId", []), 16)
+        return self._chain_id
+
+    def enqueue(self, to, data: bytes, value=0, label=None) -> PendingTransaction:
+        tx = PendingTransaction(to, data, value, label)
+        with self._lock:
+            self._queue.append(tx)
+        return tx
+
+    def flush(self) -> List[PendingTransaction]:
+        """
+        Sign and send everything queued so far in one batch. Transactions
+        whose gas estimate failed are marked FAILED and get no nonce; if the
+        batch cannot be sent at all, every transaction in it is marked FAILED
+        and the nonce counter is resynced from the node.
+        """
+        # One flush at a time, so nonces reach the node in order
+        with self._send_lock:
+            with self._lock:
+                txs, self._queue = self._queue, []
+            if not txs:
+                return []
+            try:
+                self._send(txs)
+            except Exception as e:
+                # Nothing may have reached the node; do not leave a nonce gap behind
+                self.nonces.reset()
+                for tx in txs:
+                    if tx.status == QUEUED:
+                        tx.status, tx.error = FAILED, str(e)
+            return txs
+
+    def _send(self, txs: List[PendingTransaction]):
+        calls = [{"to": tx.to, "data": tx.data, "value": tx.value} for tx in txs]
+        gas_limits = self.fees.gas_limits(self.address, calls)
+        sendable = []
+        for tx, gas in zip(txs, gas_limits):
+            if isinstance(gas, Exception):
+                tx.status = FAILED
+                tx.error = f"gas estimation failed: {gas.message if isinstance(gas, RPCError) else gas}"
+            else:
+                sendable.append((tx, gas))
+        if not sendable:
+            return
+        fees = self.fees.fees()
+        nonces = self.nonces.reserve(len(sendable))
+
+        raw = []
+        for (tx, gas), nonce in zip(sendable, nonces):
+            tx.nonce = nonce
+            fields = dict(fees, chainId=self.chain_id, nonce=nonce, to=tx.to, value=tx.value, data=tx.data, gas=gas)
+            if "maxFeePerGas" in fields:
+                fields["type"] = 2
+            signed = self.account.sign_transaction(fields)
+            tx.tx_hash = "0x" + bytes(signed.hash).hex()
+            raw.append(("eth_sendRawTransaction", ["0x" + bytes(signed.raw_transaction).hex()]))
+
+        results = self.rpc.batch_call(raw)
+        failed = False
+        for (tx, _), result in zip(sendable, results):
+            if isinstance(result, Exception):
+                tx.status, tx.error = FAILED, result.message if isinstance(result, RPCError) else str(result)
+                failed = True
+            else:
+                tx.status = SENT
+        if failed:
+            # Later nonces may now be waiting on a gap; resync so the next flush fills it
+            self.nonces.reset()
+
+    def wait(self, txs: Iterable[PendingTransaction], timeout=DEFAULT_RECEIPT_TIMEOUT,
+             poll_interval=DEFAULT_POLL_INTERVAL) -> List[PendingTransaction]:
+        """Poll receipts of every sent transaction, one batch per interval, until all are mined or `timeout`"""
+        txs = list(txs)
+        outstanding = [tx for tx in txs if tx.status == SENT]
+        deadline = time.monotonic() + timeout
+        while outstanding:
+            receipts = self.rpc.batch_call([("eth_getTransactionReceipt", [tx.tx_hash]) for tx in outstanding])
+            still = []
+            for tx, receipt in zip(outstanding, receipts):
+                if isinstance(receipt, Exception) or receipt is None:
+                    still.append(tx)
+                    continue
+                tx.receipt = receipt
+                tx.status = MINED if int(receipt.get("status", "0x1"), 16) == 1 else REVERTED
+            outstanding = still
+            if outstanding:
+                if time.monotonic() >= deadline:
+                    break
+                time.sleep(poll_interval)
+        return txs
+
+    def submit(self, calls: Iterable[Tuple[str, bytes]], wait=True, **wait_kwargs) -> List[PendingTransaction]:
+        """Queue `(to, data)` calls, send them in one batch and optionally wait for their receipts"""
+        for to, data in calls:
+            self.enqueue(to, data)
+        txs = self.flush()
+        return self.wait(txs, **wait_kwargs) if wait else txs
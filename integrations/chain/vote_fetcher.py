@@ -0,0 +1,222 @@
+# integrations/chain/vote_fetcher.py
+
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from eth_hash.auto import keccak
+
+# Storage slot of `mapping(uint256 => bytes32[]) encryptedVotes` in PrivateVoting.sol
+# (slot 0: tee, 1: resultVerification, 2: proposals, 3: encryptedVotes)
+ENCRYPTED_VOTES_SLOT = 3
+
+# 4-byte selector of the public getter `encryptedVotes(uint256,uint256)`
+ENCRYPTED_VOTES_SELECTOR = keccak(b"encryptedVotes(uint256,uint256)")[:4].hex()
+
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_MAX_WORKERS = 4
+# Keep-alive connections per RPC client; enough for several proposals fetched at once
+DEFAULT_POOL_SIZE = 32
+
+
+class RPCError(Exception):
+    """Error object returned by the node for a single JSON-RPC request"""
+
+    def __init__(self, code, message):
+        super().__init__(f"RPC error {code}: {message}")
+        self.code = code
+        self.message = message
+
+
+class VoteFetchError(Exception):
+    """Raised when some votes of a proposal could not be retrieved"""
+
+    def __init__(self, project_id, votes: List[Optional[bytes]], failures: Dict[int, str]):
+        super().__init__(
+            f"Failed to fetch {len(failures)} of {len(votes)} votes for proposal {project_id}"
+        )
+        self.project_id = project_id
+        self.votes = votes
+        self.failures = failures
+
+
+class BatchRPCClient:
+    """Minimal JSON-RPC client that sends many requests in a single HTTP POST"""
+
+    def __init__(self, endpoint_uri, timeout=30, session=None, pool_size=DEFAULT_POOL_SIZE):
+        self.endpoint_uri = endpoint_uri
+        self.timeout = timeout
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+        self._ids = itertools.count(1)
+        # Batches are sent from several fetcher threads
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.calls = 0
+        self.errors = 0
+
+    def _count(self, calls, errors):
+        with self._stats_lock:
+            self.batches += 1
+            self.calls += calls
+            self.errors += errors
+
+    def stats(self) -> Dict[str, int]:
+        """HTTP batches sent, JSON-RPC calls they carried and calls that failed"""
+        with self._stats_lock:
+            return {"batches": self.batches, "calls": self.calls, "errors": self.errors}
+
+    def call(self, method, params):
+        """Send a single request and return its result, raising RPCError on failure"""
+        result = self.batch_call([(method, params)])[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def batch_call(self, calls: List[Tuple[str, list]]) -> List[Any]:
+        """
+        Send a JSON-RPC batch and return results in request order.
+        Failed requests are returned as RPCError instances instead of raising,
+        so callers can decide how to handle partial failures.
+        """
+        if not calls:
+            return []
+
+        payload = []
+        for method, params in calls:
+            payload.append({"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params})
+
+        try:
+            response = self.session.post(self.endpoint_uri, json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            body = response.json()
+        except Exception:
+            self._count(len(payload), errors=len(payload))
+            raise
+
+        # A node may reject the whole batch with a single error object
+        if isinstance(body, dict):
+            self._count(len(payload), errors=len(payload))
+            error = body.get("error") or {}
+            raise RPCError(error.get("code"), error.get("message", "Invalid batch response"))
+
+        by_id = {item.get("id"): item for item in body}
+        results = []
+        for request in payload:
+            item = by_id.get(request["id"])
+            if item is None:
+                results.append(RPCError(None, "Missing response"))
+            elif "error" in item:
+                results.append(RPCError(item["error"].get("code"), item["error"].get("message")))
+            else:
+                results.append(item.get("result"))
+        self._count(len(payload), errors=sum(isinstance(r, RPCError) for r in results))
+        return results
+
+
+class EncryptedVoteFetcher:
+    """
+    Fetch `PrivateVoting.encryptedVotes` arrays with batched JSON-RPC calls.
+
+    The array length is read from contract storage first, then votes are pulled
+    in chunks of `chunk_size` eth_calls per batch, with up to `max_workers`
+    batches in flight. All calls are pinned to the same block so the result is
+    a consistent snapshot.
+    """
+
+    def __init__(self, rpc: BatchRPCClient, contract_address, chunk_size=DEFAULT_CHUNK_SIZE,
+                 max_workers=DEFAULT_MAX_WORKERS, votes_slot=ENCRYPTED_VOTES_SLOT):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.rpc = rpc
+        self.contract_address = contract_address
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.votes_slot = votes_slot
+
+    def _array_slot(self, project_id) -> int:
+        """Storage slot holding the length of encryptedVotes[project_id]"""
+        key = int(project_id).to_bytes(32, "big") + int(self.votes_slot).to_bytes(32, "big")
+        return int.from_bytes(keccak(key), "big")
+
+    def block_number(self) -> str:
+        return self.rpc.call("eth_blockNumber", [])
+
+    def vote_count(self, project_id, block="latest") -> int:
+        """Number of votes stored for a proposal at the given block"""
+        value = self.rpc.call("eth_getStorageAt", [self.contract_address, hex(self._array_slot(project_id)), block])
+        return int(value, 16)
+
+    def vote_counts(self, project_ids, block="latest") -> Dict[int, int]:
+        """Number of votes of many proposals, read with one JSON-RPC batch per `chunk_size` proposals"""
+        project_ids = list(project_ids)
+        counts = {}
+        for i in range(0, len(project_ids), self.chunk_size):
+            chunk = project_ids[i:i + self.chunk_size]
+            calls = [("eth_getStorageAt", [self.contract_address, hex(self._array_slot(pid)), block]) for pid in chunk]
+            for project_id, result in zip(chunk, self.rpc.batch_call(calls)):
+                if isinstance(result, Exception):
+                    raise result
+                counts[project_id] = int(result, 16)
+        return counts
+
+    def _vote_call(self, project_id, index, block):
+        data = "0x" + ENCRYPTED_VOTES_SELECTOR + format(int(project_id), "064x") + format(index, "064x")
+        return ("eth_call", [{"to": self.contract_address, "data": data}, block])
+
+    def _fetch_chunk(self, project_id, start, stop, block):
+        calls = [self._vote_call(project_id, i, block) for i in range(start, stop)]
+        try:
+            results = self.rpc.batch_call(calls)
+        except Exception as e:
+            # Transport-level failure loses the whole chunk
+            return start, [e] * (stop - start)
+        return start, results
+
+    def fetch(self, project_id, block=None, start=0, count=None) -> List[bytes]:
+        """
+        Return the encrypted votes of a proposal from index `start` onwards as
+        bytes32 values. Raises VoteFetchError if any vote could not be retrieved.
+        `count` skips the length lookup when the caller already read it at `block`.
+        """
+        if block is None:
+            block = self.block_number()
+
+        if count is None:
+            count = self.vote_count(project_id, block)
+        return self.fetch_range(project_id, start, count, block)
+
+    def fetch_range(self, project_id, start, stop, block) -> List[bytes]:
+        """Return encryptedVotes[project_id][start:stop] as of the given block"""
+        votes: List[Optional[bytes]] = [None] * max(stop - start, 0)
+        failures: Dict[int, str] = {}
+
+        ranges = [(i, min(i + self.chunk_size, stop)) for i in range(start, stop, self.chunk_size)]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            chunks = pool.map(lambda r: self._fetch_chunk(project_id, r[0], r[1], block), ranges)
+            for chunk_start, results in chunks:
+                for offset, result in enumerate(results):
+                    index = chunk_start + offset
+                    if isinstance(result, Exception):
+                        failures[index] = str(result)
+                        continue
+                    try:
+                        vote = bytes.fromhex(result[2:66])
+                    except (TypeError, ValueError):
+                        vote = b""
+                    if len(vote) != 32:
+                        failures[index] = f"Malformed eth_call result: {result!r}"
+                        continue
+                    votes[index - start] = vote
+
+        if failures:
+            raise VoteFetchError(project_id, votes, failures)
+        return votes
@@ -0,0 +1,382 @@
+# integrations/chain/vote_indexer.py
+
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from eth_hash.auto import keccak
+
+from integrations.chain.block_cache import BlockTimestampCache
+from integrations.chain.vote_fetcher import BatchRPCClient, EncryptedVoteFetcher, RPCError
+
+VOTE_CAST_TOPIC = "0x" + keccak(b"VoteCast(uint256,address)").hex()
+PROPOSAL_FINALIZED_TOPIC = "0x" + keccak(b"ProposalFinalized(uint256,bool,bytes32)").hex()
+
+DEFAULT_CONFIRMATIONS = 12
+DEFAULT_MAX_BLOCK_RANGE = 2000
+# Number of processed block hashes kept around for reorg detection
+CHECKPOINT_HISTORY = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS votes (
+    project_id TEXT NOT NULL,
+    vote_index INTEGER NOT NULL,
+    vote BLOB,
+    voter TEXT,
+    block_number INTEGER NOT NULL,
+    tx_hash TEXT,
+    log_index INTEGER,
+    PRIMARY KEY (project_id, vote_index)
+);
+CREATE INDEX IF NOT EXISTS votes_block ON votes (block_number);
+CREATE TABLE IF NOT EXISTS proposals (
+    project_id TEXT PRIMARY KEY,
+    finalized INTEGER NOT NULL,
+    approved INTEGER NOT NULL,
+    ai_insights_hash TEXT,
+    block_number INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    block_number INTEGER PRIMARY KEY,
+    block_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS blocks (
+    block_number INTEGER PRIMARY KEY,
+    timestamp INTEGER NOT NULL
+);
+"""
+
+
+def checksum_address(hex_address) -> str:
+    """EIP-55 checksummed form of a 20-byte hex address (with or without 0x)"""
+    hex_address = hex_address.lower().removeprefix("0x")
+    digest = keccak(hex_address.encode()).hex()
+    return "0x" + "".join(c.upper() if int(d, 16) >= 8 else c for c, d in zip(hex_address, digest))
+
+
+class VoteIndexStore:
+    """SQLite-backed store of indexed votes, finalizations and the block cursor"""
+
+    def __init__(self, path="vote_index.db"):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def cursor_block(self) -> Optional[int]:
+        """Last block whose logs have been fully processed"""
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(block_number) FROM checkpoints").fetchone()
+        return row[0]
+
+    def checkpoints(self) -> List[tuple]:
+        """Stored (block_number, block_hash) checkpoints, newest first"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT block_number, block_hash FROM checkpoints ORDER BY block_number DESC"
+            ).fetchall()
+
+    def vote_count(self, project_id) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM votes WHERE project_id = ?", (str(project_id),)
+            ).fetchone()
+        return row[0]
+
+    def votes(self, project_id, start=0) -> List[bytes]:
+        """Indexed votes of a proposal in on-chain order"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT vote FROM votes WHERE project_id = ? AND vote_index >= ? ORDER BY vote_index",
+                (str(project_id), start)
+            ).fetchall()
+        return [bytes(row[0]) for row in rows]
+
+    def vote_blocks(self, project_id, start=0) -> List[int]:
+        """Block number of each indexed vote of a proposal, aligned with `votes`"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT block_number FROM votes WHERE project_id = ? AND vote_index >= ? ORDER BY vote_index",
+                (str(project_id), start)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def vote_snapshot(self, project_id, start=0) -> Tuple[List[bytes], List[int], int]:
+        """
+        Indexed votes of a proposal from `start` on, the block of each, and the
+        proposal's total indexed vote count, all read in one transaction so a
+        sync committing in between cannot leave them out of step.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                rows = self._conn.execute(
+                    "SELECT vote, block_number FROM votes WHERE project_id = ? AND vote_index >= ? ORDER BY vote_index",
+                    (str(project_id), start)
+                ).fetchall()
+                count = self._conn.execute(
+                    "SELECT COUNT(*) FROM votes WHERE project_id = ?", (str(project_id),)
+                ).fetchone()[0]
+            finally:
+                self._conn.commit()
+        return [bytes(row[0]) for row in rows], [row[1] for row in rows], count
+
+    def block_timestamps(self, block_numbers: Iterable[int]) -> Dict[int, int]:
+        """Stored timestamps (ms) of the given blocks; unknown blocks are left out"""
+        block_numbers = list(block_numbers)
+        found = {}
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(block_numbers), 500):
+                chunk = block_numbers[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT block_number, timestamp FROM blocks WHERE block_number IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def put_block_timestamps(self, timestamps: Dict[int, int]):
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO blocks VALUES (?, ?)", list(timestamps.items()))
+
+    def proposal(self, project_id) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT finalized, approved, ai_insights_hash, block_number FROM proposals WHERE project_id = ?",
+                (str(project_id),)
+            ).fetchone()
+        if not row:
+            return None
+        return {
+            "finalized": bool(row[0]),
+            "approved": bool(row[1]),
+            "aiInsightsHash": row[2],
+            "blockNumber": row[3]
+        }
+
+    def commit_range(self, votes: List[Dict], finalized: List[Dict], block_number, block_hash):
+        """Atomically persist the logs of a block range and advance the cursor"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO votes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(str(v["project_id"]), v["vote_index"], v["vote"], v["voter"],
+                  v["block_number"], v["tx_hash"], v["log_index"]) for v in votes]
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO proposals VALUES (?, 1, ?, ?, ?)",
+                [(str(f["project_id"]), int(f["approved"]), f["ai_insights_hash"], f["block_number"])
+                 for f in finalized]
+            )
+            self._conn.execute("INSERT OR REPLACE INTO checkpoints VALUES (?, ?)", (block_number, block_hash))
+            self._conn.execute(
+                "DELETE FROM checkpoints WHERE block_number NOT IN "
+                "(SELECT block_number FROM checkpoints ORDER BY block_number DESC LIMIT ?)",
+                (CHECKPOINT_HISTORY,)
+            )
+
+    def rollback_to(self, block_number):
+        """Drop everything indexed after `block_number` (used on reorgs)"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM votes WHERE block_number > ?", (block_number,))
+            self._conn.execute("DELETE FROM proposals WHERE block_number > ?", (block_number,))
+            self._conn.execute("DELETE FROM checkpoints WHERE block_number > ?", (block_number,))
+            self._conn.execute("DELETE FROM blocks WHERE block_number > ?", (block_number,))
+
+
+class VoteIndexer:
+    """
+    Incrementally index PrivateVoting `VoteCast` and `ProposalFinalized` logs.
+
+    Logs are read with paginated eth_getLogs up to `confirmations` blocks behind
+    the head. The n-th VoteCast log of a proposal corresponds to
+    encryptedVotes[projectId][n], whose value is fetched in a JSON-RPC batch.
+    `start_block` must be at or before the contract deployment block so that
+    vote indices line up with the on-chain array.
+    """
+
+    def __init__(self, rpc: BatchRPCClient, contract_address, store: VoteIndexStore, start_block=0,
+                 confirmations=DEFAULT_CONFIRMATIONS, max_block_range=DEFAULT_MAX_BLOCK_RANGE,
+                 fetcher: Optional[EncryptedVoteFetcher] = None):
+        self.rpc = rpc
+        self.contract_address = contract_address
+        self.store = store
+        self.start_block = start_block
+        self.confirmations = confirmations
+        self.max_block_range = max_block_range
+        self.fetcher = fetcher or EncryptedVoteFetcher(rpc, contract_address)
+        # Vote timestamps come from their blocks; headers are cached in the store
+        self.blocks = BlockTimestampCache(rpc, store)
+        self._sync_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """Register `callback(event_name, project_id)`, called for every indexed log"""
+        self._listeners.append(callback)
+
+    def _notify(self, event, project_id):
+        for callback in self._listeners:
+            try:
+                callback(event, project_id)
+            except Exception as e:
+                print(f"Vote indexer listener error: {e}")
+
+    def _block_hash(self, block_number) -> Optional[str]:
+        block = self.rpc.call("eth_getBlockByNumber", [hex(block_number), False])
+        return block["hash"] if block else None
+
+    def _handle_reorg(self):
+        """Rewind the index to the newest checkpoint that is still canonical"""
+        for block_number, block_hash in self.store.checkpoints():
+            if self._block_hash(block_number) == block_hash:
+                if block_number != self.store.cursor_block():
+                    print(f"Reorg detected, rewinding vote index to block {block_number}")
+                    self.store.rollback_to(block_number)
+                return
+        if self.store.cursor_block() is not None:
+            print("Reorg deeper than stored checkpoints, rebuilding vote index")
+            self.store.rollback_to(self.start_block - 1)
+
+    def _get_logs(self, from_block, to_block):
+        return self.rpc.call("eth_getLogs", [{
+            "address": self.contract_address,
+            "fromBlock": hex(from_block),
+            "toBlock": hex(to_block),
+            "topics": [[VOTE_CAST_TOPIC, PROPOSAL_FINALIZED_TOPIC]]
+        }])
+
+    def _index_range(self, from_block, to_block):
+        logs = self._get_logs(from_block, to_block)
+        logs.sort(key=lambda log: (int(log["blockNumber"], 16), int(log["logIndex"], 16)))
+
+        votes, finalized = [], []
+        counts: Dict[int, int] = {}
+        for log in logs:
+            topics = log["topics"]
+            project_id = int(topics[1], 16)
+            block_number = int(log["blockNumber"], 16)
+            if topics[0] == VOTE_CAST_TOPIC:
+                if project_id not in counts:
+                    counts[project_id] = self.store.vote_count(project_id)
+                votes.append({
+                    "project_id": project_id,
+                    "vote_index": counts[project_id],
+                    "vote": None,
+                    "voter": checksum_address(topics[2][-40:]),
+                    "block_number": block_number,
+                    "tx_hash": log.get("transactionHash"),
+                    "log_index": int(log["logIndex"], 16)
+                })
+                counts[project_id] += 1
+            elif topics[0] == PROPOSAL_FINALIZED_TOPIC:
+                data = log["data"][2:]
+                finalized.append({
+                    "project_id": project_id,
+                    "approved": int(data[0:64], 16) != 0,
+                    "ai_insights_hash": "0x" + data[64:128],
+                    "block_number": block_number
+                })
+
+        # Resolve vote values for every proposal touched in this range
+        by_project: Dict[int, List[Dict]] = {}
+        for vote in votes:
+            by_project.setdefault(vote["project_id"], []).append(vote)
+        for project_id, project_votes in by_project.items():
+            start = project_votes[0]["vote_index"]
+            values = self.fetcher.fetch_range(project_id, start, start + len(project_votes), hex(to_block))
+            for vote, value in zip(project_votes, values):
+                vote["vote"] = value
+        # Resolve vote timestamps now, while their blocks are being walked anyway
+        if votes:
+            self.blocks.timestamps({vote["block_number"] for vote in votes})
+
+        self.store.commit_range(votes, finalized, to_block, self._block_hash(to_block))
+
+        for vote in votes:
+            self._notify("VoteCast", vote["project_id"])
+        for event in finalized:
+            self._notify("ProposalFinalized", event["project_id"])
+        return len(votes)
+
+    def sync(self) -> int:
+        """Index all confirmed blocks past the cursor; returns the number of new votes"""
+        with self._sync_lock:
+            self._handle_reorg()
+
+            head = int(self.rpc.call("eth_blockNumber", []), 16)
+            safe_head = head - self.confirmations
+            cursor = self.store.cursor_block()
+            from_block = self.start_block if cursor is None else cursor + 1
+
+            indexed = 0
+            step = self.max_block_range
+            while from_block <= safe_head:
+                to_block = min(from_block + step - 1, safe_head)
+                try:
+                    indexed += self._index_range(from_block, to_block)
+                except RPCError:
+                    # Providers cap eth_getLogs result sizes; retry with a smaller window
+                    if step == 1:
+                        raise
+                    step = max(step // 2, 1)
+                    continue
+                from_block = to_block + 1
+            return indexed
+
+    def votes(self, project_id, start=0, block=None, count=None) -> List[bytes]:
+        """
+        Votes of a proposal from index `start` onwards: confirmed votes from the
+        local index plus the unconfirmed tail fetched directly from the chain
+        (as of `block`, holding `count` votes, when the caller already knows them).
+        """
+        indexed, _, indexed_count = self.store.vote_snapshot(project_id, start)
+        tail_start = max(start, indexed_count)
+        return indexed + self.fetcher.fetch(project_id, block=block, start=tail_start, count=count)
+
+    def votes_with_timestamps(self, project_id, start=0, block=None, count=None) -> Tuple[List[bytes], List[int]]:
+        """
+        `votes` along with the timestamp (ms) of the block each vote was cast in.
+        The unconfirmed tail is not indexed yet and gets the timestamp of `block`.
+        """
+        if block is None or not block.startswith("0x"):
+            block = self.fetcher.block_number()
+        indexed, vote_blocks, indexed_count = self.store.vote_snapshot(project_id, start)
+        tail_start = max(start, indexed_count)
+        tail = self.fetcher.fetch(project_id, block=block, start=tail_start, count=count)
+
+        head = int(block, 16)
+        stamps = self.blocks.timestamps(set(vote_blocks) | ({head} if tail else set()))
+        timestamps = [stamps[number] for number in vote_blocks]
+        if tail:
+            timestamps.extend([stamps[head]] * len(tail))
+        return indexed + tail, timestamps
+
+    def start(self, poll_interval=5.0):
+        """Run `sync` periodically in a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(poll_interval,), daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self, poll_interval):
+        while not self._stop.is_set():
+            try:
+                new_votes = self.sync()
+                if new_votes:
+                    print(f"Indexed {new_votes} new votes up to block {self.store.cursor_block()}")
+            except Exception as e:
+                print(f"Vote indexer error: {e}")
+            self._stop.wait(poll_interval)
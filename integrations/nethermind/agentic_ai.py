@@ -1,9 +1,26 @@
 # integrations/nethermind/agentic_ai.py
 
+from typing import Optional
+
+from ai.nillion_integration.proposal_index import ProposalIndex
+from ai.nillion_integration.secret_llm import proposal_key
+
+# Queries are routed to the agent whose description they are most similar to
+ROUTES = {
+    "analyze": "analyze analysis review evaluate assess proposal proposals risks benefits funding grant budget",
+    "voting": "voting vote votes voters strategy strategies optimize turnout participation quorum incentives"
+}
+DEFAULT_ROUTE = "analyze"
+
 
 class AgenticAI:
-    def __init__(self):
+    def __init__(self, proposal_index: Optional[ProposalIndex] = None):
         self.agents = self._setup_agents()
+        # Near-duplicate proposals get the analysis of the earlier one
+        self.proposal_index = proposal_index if proposal_index is not None else ProposalIndex()
+        self.routes = ProposalIndex(dim=512)
+        for route, description in ROUTES.items():
+            self.routes.add(route, description)
     
     def _setup_agents(self):
         return {
@@ -11,13 +28,24 @@ class AgenticAI:
             "advisor": "Strategy Advisor"
         }
     
-    def analyze_proposal(self, proposal_text):
-        return {
+    def _analyze(self, proposal_text, similar=None):
+        analysis = {
             "risks": ["Financial instability", "Regulatory challenges"],
             "benefits": ["Increased community engagement", "Potential for high ROI"],
             "alignment": "The proposal aligns well with the DAO's long-term objectives",
             "recommendation": "Proceed with caution, but the potential benefits outweigh the risks"
         }
+        if similar is not None:
+            analysis["related_proposal"] = {"key": similar.key, "similarity": round(similar.similarity, 3)}
+        return analysis
+    
+    def analyze_proposal(self, proposal_text, proposal_id=None):
+        key = proposal_id if proposal_id is not None else proposal_key(proposal_text)
+        analysis, reused = self.proposal_index.analyze(key, proposal_text,
+                                                       lambda similar: self._analyze(proposal_text, similar))
+        if reused is None:
+            return analysis
+        return dict(analysis, reused_from={"key": reused.key, "similarity": round(reused.similarity, 3)})
     
     def optimize_voting(self, voting_data):
         return {
@@ -26,10 +54,11 @@ class AgenticAI:
             "incentives": "Offer governance tokens as rewards for consistent voters"
         }
     
+    def route(self, query):
+        matches = self.routes.nearest(query, k=1, min_similarity=1e-6)
+        return matches[0].key if matches else DEFAULT_ROUTE
+    
     def run(self, query):
-        if "proposal" in query.lower() or "analyze" in query.lower():
-            return self.analyze_proposal(query)
-        elif "voting" in query.lower() or "strategy" in query.lower():
+        if self.route(query) == "voting":
             return self.optimize_voting(query)
-        else:
-            return self.analyze_proposal(query)
+        return self.analyze_proposal(query)
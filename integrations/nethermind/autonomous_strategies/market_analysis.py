@@ -0,0 +1,202 @@
+# integrations/nethermind/autonomous_strategies/market_analysis.py
+
+import threading
+from typing import Any, Dict, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+# Ticks kept in the rolling windows
+DEFAULT_WINDOW = 1440
+# Minute ticks, around the clock
+DEFAULT_TICKS_PER_YEAR = 365 * 24 * 60
+
+PriceTick = Union[Sequence[float], np.ndarray, Mapping[Any, float]]
+
+
+class RollingWindow:
+    """
+    The last `size` rows of `width` values, in a ring buffer preallocated as
+    one NumPy array, with running sums (and optionally cross products) kept up
+    to date as rows enter and leave. Statistics never rescan the window; the
+    sums are recomputed from the buffer once every `size` rows to keep
+    floating-point drift from accumulating, which is O(1) amortized per row.
+    """
+
+    def __init__(self, size, width, cross=False):
+        if size < 2:
+            raise ValueError("A rolling window needs at least two rows")
+        self.size = size
+        self.width = width
+        self.buffer = np.zeros((size, width))
+        self.count = 0
+        self.position = 0
+        self.pushed = 0
+        self.sum = np.zeros(width)
+        self.square = np.zeros(width)
+        self.cross = np.zeros((width, width)) if cross else None
+
+    def push(self, row):
+        row = np.asarray(row, dtype=np.float64)
+        if self.count == self.size:
+            old = self.buffer[self.position]
+            self.sum -= old
+            self.square -= old * old
+            if self.cross is not None:
+                self.cross -= np.outer(old, old)
+        else:
+            self.count += 1
+        self.buffer[self.position] = row
+        self.sum += row
+        self.square += row * row
+        if self.cross is not None:
+            self.cross += np.outer(row, row)
+        self.position = (self.position + 1) % self.size
+        self.pushed += 1
+        if self.pushed % self.size == 0:
+            self._resync()
+
+    def extend(self, rows):
+        """Push many rows at once, in contiguous slices of the ring"""
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, self.width)
+        if len(rows) > self.size:
+            # Older rows would be evicted within this call anyway
+            self.pushed += len(rows) - self.size
+            rows = rows[-self.size:]
+        while len(rows):
+            take = min(len(rows), self.size - self.position)
+            chunk, rows = rows[:take], rows[take:]
+            slots = slice(self.position, self.position + take)
+            if self.count == self.size:
+                # Once the window is full, the slots being overwritten hold the oldest rows
+                old = self.buffer[slots]
+                self.sum -= old.sum(axis=0)
+                self.square -= (old * old).sum(axis=0)
+                if self.cross is not None:
+                    self.cross -= old.T @ old
+            self.count = min(self.size, self.count + take)
+            self.buffer[slots] = chunk
+            self.sum += chunk.sum(axis=0)
+            self.square += (chunk * chunk).sum(axis=0)
+            if self.cross is not None:
+                self.cross += chunk.T @ chunk
+            self.position = (self.position + take) % self.size
+            before, self.pushed = self.pushed, self.pushed + take
+            if self.pushed // self.size != before // self.size:
+                self._resync()
+
+    def _resync(self):
+        rows = self.buffer[:self.count] if self.count < self.size else self.buffer
+        self.sum = rows.sum(axis=0)
+        self.square = (rows * rows).sum(axis=0)
+        if self.cross is not None:
+            self.cross = rows.T @ rows
+
+    def values(self) -> np.ndarray:
+        """Rows in the window, oldest first"""
+        if self.count < self.size:
+            return self.buffer[:self.count].copy()
+        return np.concatenate([self.buffer[self.position:], self.buffer[:self.position]])
+
+    def mean(self) -> np.ndarray:
+        return self.sum / max(self.count, 1)
+
+    def variance(self) -> np.ndarray:
+        """Sample variance of each column"""
+        if self.count < 2:
+            return np.zeros(self.width)
+        return np.maximum((self.square - self.sum * self.sum / self.count) / (self.count - 1), 0.0)
+
+    def covariance(self) -> np.ndarray:
+        if self.cross is None:
+            raise ValueError("Window does not track cross products")
+        if self.count < 2:
+            return np.zeros((self.width, self.width))
+        return (self.cross - np.outer(self.sum, self.sum) / self.count) / (self.count - 1)
+
+    def correlation(self) -> np.ndarray:
+        cov = self.covariance()
+        std = np.sqrt(np.maximum(np.diag(cov), 0.0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = cov / np.outer(std, std)
+        corr = np.nan_to_num(np.clip(corr, -1.0, 1.0))
+        np.fill_diagonal(corr, 1.0)
+        return corr
+
+
+class MarketAnalyzer:
+    """
+    Rolling market statistics from a stream of price ticks.
+
+    Each tick gives prices for the tracked assets, as a vector in `assets`
+    order or a {asset: price} mapping of the ones that moved (the others
+    keep their last price). Log returns between ticks go into a
+    RollingWindow, so volatilities and correlations over the last `window`
+    ticks are available at any time without touching older history.
+    """
+
+    def __init__(self, assets: Sequence[Any], window=DEFAULT_WINDOW, ticks_per_year=DEFAULT_TICKS_PER_YEAR):
+        self.assets = list(assets)
+        self.index = {asset: i for i, asset in enumerate(self.assets)}
+        self.ticks_per_year = ticks_per_year
+        self.returns = RollingWindow(window, len(self.assets), cross=True)
+        self.prices = np.full(len(self.assets), np.nan)
+        self._last_log: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        self.ticks = 0
+
+    def _price_vector(self, prices: PriceTick) -> np.ndarray:
+        if isinstance(prices, Mapping):
+            vector = self.prices.copy()
+            for asset, price in prices.items():
+                vector[self.index[asset]] = price
+        else:
+            vector = np.asarray(prices, dtype=np.float64)
+            if vector.shape != self.prices.shape:
+                raise ValueError(f"Expected {len(self.assets)} prices, got {vector.shape}")
+        if (vector <= 0).any():
+            raise ValueError("Prices must be positive")
+        return vector
+
+    def ingest(self, prices: PriceTick) -> Optional[np.ndarray]:
+        """Apply one price tick; returns the log returns it added (None until every asset has a price)"""
+        with self._lock:
+            self.prices = self._price_vector(prices)
+            self.ticks += 1
+            if np.isnan(self.prices).any():
+                return None
+            logs = np.log(self.prices)
+            returns = None
+            if self._last_log is not None:
+                returns = logs - self._last_log
+                self.returns.push(returns)
+            self._last_log = logs
+            return returns
+
+    def ingest_many(self, prices) -> np.ndarray:
+        """Apply consecutive full price vectors (one row per tick); returns their log returns"""
+        prices = np.asarray(prices, dtype=np.float64).reshape(-1, len(self.assets))
+        if not (prices > 0).all():
+            raise ValueError("Prices must be positive")
+        with self._lock:
+            logs = np.log(prices)
+            if self._last_log is not None:
+                logs = np.vstack([self._last_log, logs])
+            returns = np.diff(logs, axis=0)
+            self.returns.extend(returns)
+            self._last_log = logs[-1]
+            self.prices = prices[-1].copy()
+            self.ticks += len(prices)
+            return returns
+
+    def volatility(self) -> np.ndarray:
+        """Annualized rolling volatility of each asset"""
+        with self._lock:
+            return np.sqrt(self.returns.variance() * self.ticks_per_year)
+
+    def correlation(self) -> np.ndarray:
+        with self._lock:
+            return self.returns.correlation()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"assets": len(self.assets), "ticks": self.ticks, "window": self.returns.count}
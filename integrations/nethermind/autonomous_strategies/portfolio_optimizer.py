@@ -0,0 +1,247 @@
+# integrations/nethermind/autonomous_strategies/portfolio_optimizer.py
+
+import threading
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+import numpy as np
+
+# Price rows are daily closes, and crypto markets trade every day
+PERIODS_PER_YEAR = 365
+# Weight of the diagonal in the shrunk covariance
+DEFAULT_SHRINKAGE = 0.1
+# Price rows buffered before they are folded into the full cross-product matrix
+DEFAULT_FOLD_ROWS = 32
+# Assets kept after screening, i.e. the size of the mean-variance problem
+DEFAULT_MAX_CANDIDATES = 25
+DEFAULT_MAX_WEIGHT = 0.3
+DEFAULT_RISK_FREE_RATE = 0.04
+DEFAULT_SOLVER_ITERATIONS = 500
+DEFAULT_TOLERANCE = 1e-7
+# Annualized volatility per step of the 1-10 risk scale
+VOLATILITY_PER_LEVEL = 0.1
+RISK_LEVELS = tuple(range(1, 11))
+
+
+def risk_aversion(levels) -> np.ndarray:
+    """Mean-variance risk aversion for risk tolerance levels, from 1 (cautious) to 10 (aggressive)"""
+    return 32.0 * 0.6 ** (np.asarray(levels, dtype=np.float64) - 1)
+
+
+def risk_level(volatility) -> np.ndarray:
+    """Annualized volatility mapped onto the 1-10 risk scale"""
+    return np.clip(np.ceil(np.asarray(volatility) / VOLATILITY_PER_LEVEL), 1, 10).astype(int)
+
+
+def project_capped_simplex(v: np.ndarray, cap=1.0) -> np.ndarray:
+    """
+    Row-wise Euclidean projection onto {w : 0 <= w <= cap, sum(w) = 1}.
+    The projection is clip(v - tau, 0, cap) where tau makes the row sum to 1;
+    the sum is piecewise linear in tau with breakpoints at v and v - cap, so
+    tau is found exactly by evaluating it at every breakpoint.
+    """
+    rows = np.arange(len(v))
+    breakpoints = np.sort(np.concatenate([v, v - cap], axis=1), axis=1)
+    sums = np.clip(v[:, None, :] - breakpoints[:, :, None], 0, cap).sum(axis=2)
+    # The sum is 0 at the largest breakpoint, so every row has a first one at or below 1
+    hi = np.argmax(sums <= 1, axis=1)
+    lo = np.maximum(hi - 1, 0)
+    t0, t1 = breakpoints[rows, lo], breakpoints[rows, hi]
+    s0, s1 = sums[rows, lo], sums[rows, hi]
+    slope = np.where(s0 > s1, s0 - s1, 1.0)
+    tau = t0 + (s0 - 1) * (t1 - t0) / slope
+    return np.clip(v - tau[:, None], 0, cap)
+
+
+def solve_mean_variance(mean: np.ndarray, cov: np.ndarray, aversions, max_weight=1.0,
+                        iterations=DEFAULT_SOLVER_ITERATIONS, tol=DEFAULT_TOLERANCE) -> np.ndarray:
+    """
+    Long-only, fully invested weights maximizing mean @ w - aversion / 2 * w @ cov @ w,
+    one row per risk aversion. All profiles are solved together by
+    accelerated projected gradient ascent on a (profiles x assets) matrix.
+    """
+    n = len(mean)
+    if n * max_weight < 1:
+        raise ValueError(f"max_weight {max_weight} cannot allocate everything over {n} assets")
+    aversions = np.asarray(aversions, dtype=np.float64)[:, None]
+    step = 1.0 / (aversions * max(np.linalg.eigvalsh(cov)[-1], 1e-12))
+    weights = np.full((len(aversions), n), 1.0 / n)
+    momentum, t = weights, 1.0
+    for _ in range(iterations):
+        gradient = mean - aversions * (momentum @ cov)
+        updated = project_capped_simplex(momentum + step * gradient, max_weight)
+        t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        momentum = updated + (t - 1) / t_next * (updated - weights)
+        converged = np.abs(updated - weights).max() < tol
+        weights, t = updated, t_next
+        if converged:
+            break
+    return weights
+
+
+class CovarianceEstimator:
+    """
+    Running mean and covariance of the log returns of a fixed list of assets.
+
+    Returns are folded into exponentially weighted sums (equal weights
+    without a `halflife`), so new prices never cost a pass over the whole
+    history. Per-asset sums are updated right away, which keeps expected
+    returns and volatilities (what screening needs) at O(assets) per price
+    row. New rows are only folded into the assets x assets cross-product
+    matrix once `fold_rows` of them are pending; until then covariance
+    blocks add the pending rows themselves, so small blocks over the screened
+    candidates stay cheap. Blocks are shrunk towards their diagonal so they
+    stay invertible with more assets than observations.
+    """
+
+    def __init__(self, assets: Sequence[Any], halflife: Optional[float] = None, shrinkage=DEFAULT_SHRINKAGE,
+                 fold_rows=DEFAULT_FOLD_ROWS):
+        self.assets = list(assets)
+        self.index = {asset: i for i, asset in enumerate(self.assets)}
+        n = len(self.assets)
+        self.decay = 0.5 ** (1.0 / halflife) if halflife else 1.0
+        self.shrinkage = shrinkage
+        self.fold_rows = fold_rows
+        self.rows = 0
+        self.observations = 0
+        self._weight = 0.0
+        self._sum = np.zeros(n)
+        self._square = np.zeros(n)
+        self._cross = np.zeros((n, n))
+        self._pending = np.zeros((0, n))
+        self._last_log: Optional[np.ndarray] = None
+        self._moments = None
+        self._lock = threading.Lock()
+        self.updates = 0
+        self.folds = 0
+        self.recomputes = 0
+
+    @staticmethod
+    def _weights(decay, count) -> np.ndarray:
+        # The newest return gets weight 1 and older ones decay
+        return decay ** np.arange(count - 1, -1, -1)
+
+    def update(self, prices) -> int:
+        """Fold new price rows (oldest first, one column per asset) into the estimate; returns the returns added"""
+        prices = np.atleast_2d(np.asarray(prices, dtype=np.float64))
+        if prices.shape[1] != len(self.assets):
+            raise ValueError(f"Expected {len(self.assets)} prices per row, got {prices.shape[1]}")
+        if not (prices > 0).all():
+            raise ValueError("Prices must be positive")
+        logs = np.log(prices)
+        with self._lock:
+            if self._last_log is not None:
+                logs = np.vstack([self._last_log, logs])
+            returns = np.diff(logs, axis=0)
+            self._last_log = logs[-1]
+            self.rows += len(prices)
+            self.updates += 1
+            if len(returns):
+                weights = self._weights(self.decay, len(returns))
+                fade = self.decay ** len(returns)
+                self._weight = fade * self._weight + weights.sum()
+                self._sum = fade * self._sum + weights @ returns
+                self._square = fade * self._square + weights @ (returns * returns)
+                self._pending = np.vstack([self._pending, returns])
+                self.observations += len(returns)
+                self._moments = None
+                if len(self._pending) >= self.fold_rows:
+                    self._fold()
+            return len(returns)
+
+    def _fold(self):
+        pending = self._pending
+        if not len(pending):
+            return
+        weights = self._weights(self.decay, len(pending))
+        self._cross *= self.decay ** len(pending)
+        self._cross += (pending * weights[:, None]).T @ pending
+        self._pending = pending[:0]
+        self.folds += 1
+
+    def moments(self):
+        """Annualized (expected returns, volatilities) of every asset"""
+        with self._lock:
+            if self._moments is None:
+                if self.observations < 2:
+                    raise ValueError("At least two returns are needed")
+                mean = self._sum / self._weight
+                variance = np.maximum(self._square / self._weight - mean * mean, 0.0)
+                self._moments = (mean * PERIODS_PER_YEAR, np.sqrt(variance * PERIODS_PER_YEAR))
+                self.recomputes += 1
+            return self._moments
+
+    def covariance(self, indices: Optional[Sequence[int]] = None) -> np.ndarray:
+        """Annualized, shrunk covariance of the assets at `indices` (all assets if None)"""
+        with self._lock:
+            if self.observations < 2:
+                raise ValueError("At least two returns are needed")
+            if indices is None:
+                self._fold()
+                cross, total = self._cross.copy(), self._sum
+            else:
+                indices = np.asarray(indices)
+                pending = self._pending[:, indices]
+                weights = self._weights(self.decay, len(pending))
+                cross = self.decay ** len(pending) * self._cross[np.ix_(indices, indices)]
+                cross += (pending * weights[:, None]).T @ pending
+                total = self._sum[indices]
+            mean = total / self._weight
+            cov = cross / self._weight - np.outer(mean, mean)
+        cov *= 1 - self.shrinkage
+        cov[np.diag_indices_from(cov)] /= 1 - self.shrinkage
+        return cov * PERIODS_PER_YEAR
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"assets": len(self.assets), "observations": self.observations, "updates": self.updates,
+                    "folds": self.folds, "recomputes": self.recomputes}
+
+
+class PortfolioOptimizer:
+    """
+    Screens candidate assets by Sharpe ratio, then solves mean-variance
+    allocations over the best `max_candidates` (plus any assets that must be
+    considered, such as current holdings) for many risk levels at once.
+    """
+
+    def __init__(self, max_candidates=DEFAULT_MAX_CANDIDATES, max_weight=DEFAULT_MAX_WEIGHT,
+                 risk_free_rate=DEFAULT_RISK_FREE_RATE):
+        self.max_candidates = max_candidates
+        self.max_weight = max_weight
+        self.risk_free_rate = risk_free_rate
+
+    def scores(self, estimator: CovarianceEstimator) -> np.ndarray:
+        """Sharpe ratio of every asset"""
+        mean, volatility = estimator.moments()
+        return (mean - self.risk_free_rate) / np.maximum(volatility, 1e-12)
+
+    def candidates(self, estimator: CovarianceEstimator, include: Iterable[Any] = ()) -> np.ndarray:
+        """Indices of the best-scoring assets plus those in `include`, best first"""
+        scores = self.scores(estimator)
+        top = min(self.max_candidates, len(scores))
+        best = np.argpartition(-scores, top - 1)[:top]
+        extra = [estimator.index[asset] for asset in include if asset in estimator.index]
+        chosen = np.union1d(best, np.asarray(extra, dtype=int))
+        return chosen[np.argsort(-scores[chosen], kind="stable")]
+
+    def allocate(self, estimator: CovarianceEstimator, levels: Sequence[int] = RISK_LEVELS,
+                 include: Iterable[Any] = ()) -> Dict[str, Any]:
+        """
+        Allocations for each risk level in one batched solve: `weights` has one
+        row per level and one column per entry of `assets`.
+        """
+        indices = self.candidates(estimator, include)
+        mean, volatility = estimator.moments()
+        mean = mean[indices]
+        cov = estimator.covariance(indices)
+        max_weight = max(self.max_weight, 1.0 / len(indices))
+        weights = solve_mean_variance(mean, cov, risk_aversion(levels), max_weight)
+        return {
+            "levels": list(levels),
+            "assets": [estimator.assets[i] for i in indices],
+            "weights": weights,
+            "asset_returns": mean,
+            "asset_volatility": volatility[indices],
+            "expected_return": weights @ mean,
+            "volatility": np.sqrt(np.einsum("pi,ij,pj->p", weights, cov, weights))
+        }
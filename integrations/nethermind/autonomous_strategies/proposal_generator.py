@@ -1,38 +1,125 @@
 # integrations/nethermind/autonomous_strategies/proposal_generator.py
 
-from integrations.nethermind.agentic_ai import NethermindAgent
+import threading
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from integrations.nethermind.autonomous_strategies.portfolio_optimizer import (
+    RISK_LEVELS,
+    CovarianceEstimator,
+    PortfolioOptimizer,
+    risk_level,
+)
+from integrations.nethermind.autonomous_strategies.risk_assessment import TreasuryRiskMonitor
+
+DEFAULT_RISK_LEVEL = 5
+# Allocations below this share are dropped from the proposals
+MIN_ALLOCATION = 0.01
+DEFAULT_TIMEFRAME = "6 months"
 
 class ProposalGenerator:
-    def __init__(self):
-        self.nethermind_agent = NethermindAgent()
-        
+    """
+    Turns market price history into DAO investment proposals.
+
+    `market_conditions` carries `assets` (names) and `prices`, the price
+    history so far with one row per period (oldest first) and one column per
+    asset. Rows past those already seen are folded into a cached
+    CovarianceEstimator, so repeated calls with a growing history only pay
+    for the new rows. `treasury_data` may carry `holdings` ({asset: value})
+    and an explicit `risk_tolerance` (1-10). With a `risk_monitor` fed by
+    live price and balance ticks, the treasury's risk tolerance comes from
+    its rolling volatility and drawdown.
+    """
+
+    def __init__(self, optimizer: Optional[PortfolioOptimizer] = None, halflife: Optional[float] = None,
+                 timeframe=DEFAULT_TIMEFRAME, risk_monitor: Optional[TreasuryRiskMonitor] = None):
+        self.optimizer = optimizer or PortfolioOptimizer()
+        self.risk_monitor = risk_monitor
+        self.halflife = halflife
+        self.timeframe = timeframe
+        self.estimator: Optional[CovarianceEstimator] = None
+        self._lock = threading.Lock()
+
+    def observe_market(self, market_conditions) -> CovarianceEstimator:
+        """Bring the covariance estimate up to date with `market_conditions['prices']`"""
+        assets = list(market_conditions["assets"])
+        prices = np.atleast_2d(np.asarray(market_conditions["prices"], dtype=np.float64))
+        with self._lock:
+            estimator = self.estimator
+            # A different asset list or a shorter history is a new market; start over
+            if estimator is None or estimator.assets != assets or len(prices) < estimator.rows:
+                estimator = self.estimator = CovarianceEstimator(assets, self.halflife)
+            if len(prices) > estimator.rows:
+                estimator.update(prices[estimator.rows:])
+            return estimator
+
     def generate_investment_proposals(self, treasury_data, market_conditions):
         """
         Generate investment proposals for the DAO treasury
         """
+        estimator = self.observe_market(market_conditions)
         risk_profile = self._analyze_treasury_risk(treasury_data)
-        
-        # Use Nethermind's AI to generate optimized strategies
-        strategies = self.nethermind_agent.generate_optimized_strategies(
-            market_conditions,
-            risk_profile
-        )
-        
+        holdings = (treasury_data or {}).get("holdings") or {}
+
+        # Mean-variance allocation at the treasury's risk tolerance
+        allocation = self.optimizer.allocate(estimator, [risk_profile], include=holdings)
+        weights = allocation["weights"][0]
+        keep = np.flatnonzero(weights >= MIN_ALLOCATION)
+        keep = keep[np.argsort(-weights[keep], kind="stable")]
+        shares = weights[keep] / weights[keep].sum()
+        asset_risk = risk_level(allocation["asset_volatility"][keep])
+
         # Format as formal DAO proposals
         proposals = []
-        for strategy in strategies:
+        for i, share, level in zip(keep, shares, asset_risk):
+            expected_return = float(allocation["asset_returns"][i])
+            volatility = float(allocation["asset_volatility"][i])
             proposals.append({
-                "title": f"Investment in {strategy['asset_class']}",
-                "description": strategy["rationale"],
-                "allocation": strategy["suggested_allocation"],
-                "expected_return": strategy["projected_return"],
-                "risk_level": strategy["risk_assessment"],
-                "timeframe": strategy["suggested_timeframe"]
+                "title": f"Investment in {allocation['assets'][i]}",
+                "description": (
+                    f"Mean-variance allocation at risk tolerance {risk_profile}/10: "
+                    f"{expected_return:.1%} expected annual return, {volatility:.1%} annual volatility"
+                ),
+                "allocation": round(float(share), 4),
+                "expected_return": expected_return,
+                "risk_level": int(level),
+                "timeframe": self.timeframe
             })
-            
+
         return proposals
-        
+
+    def allocate_risk_profiles(self, market_conditions, levels: Sequence[int] = RISK_LEVELS,
+                               holdings=()) -> Dict[int, Dict[str, Any]]:
+        """Allocation, expected return and volatility for every risk level, solved in one batch"""
+        estimator = self.observe_market(market_conditions)
+        allocation = self.optimizer.allocate(estimator, levels, include=holdings)
+        profiles = {}
+        for row, level in enumerate(allocation["levels"]):
+            weights = allocation["weights"][row]
+            profiles[level] = {
+                "allocation": {allocation["assets"][i]: round(float(weights[i]), 4)
+                               for i in np.flatnonzero(weights >= MIN_ALLOCATION)},
+                "expected_return": float(allocation["expected_return"][row]),
+                "volatility": float(allocation["volatility"][row])
+            }
+        return profiles
+
     def _analyze_treasury_risk(self, treasury_data):
         # Calculate current risk exposure
         # Return risk tolerance level from 1-10
-        return 5  # Default moderate risk
+        treasury_data = treasury_data or {}
+        if "risk_tolerance" in treasury_data:
+            return int(np.clip(treasury_data["risk_tolerance"], 1, 10))
+        if self.risk_monitor is not None and self.risk_monitor.ready:
+            return self.risk_monitor.risk_level()
+        estimator = self.estimator
+        holdings = {asset: value for asset, value in (treasury_data.get("holdings") or {}).items()
+                    if estimator is not None and asset in estimator.index and value > 0}
+        if not holdings or estimator.observations < 2:
+            return DEFAULT_RISK_LEVEL  # Default moderate risk
+        indices = [estimator.index[asset] for asset in holdings]
+        weights = np.array(list(holdings.values()), dtype=np.float64)
+        weights /= weights.sum()
+        volatility = np.sqrt(weights @ estimator.covariance(indices) @ weights)
+        return int(risk_level(volatility))
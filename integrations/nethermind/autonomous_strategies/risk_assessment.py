@@ -0,0 +1,178 @@
+# integrations/nethermind/autonomous_strategies/risk_assessment.py
+
+import threading
+from collections import deque
+from statistics import NormalDist
+from typing import Any, Dict, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from integrations.nethermind.autonomous_strategies.market_analysis import (
+    DEFAULT_TICKS_PER_YEAR,
+    DEFAULT_WINDOW,
+    MarketAnalyzer,
+    PriceTick,
+    RollingWindow,
+)
+from integrations.nethermind.autonomous_strategies.portfolio_optimizer import risk_level
+
+DEFAULT_CONFIDENCE = 0.95
+# Risk tolerance drops one level per this much drawdown from the rolling peak
+DRAWDOWN_PER_LEVEL = 0.1
+
+BalanceTick = Union[Sequence[float], np.ndarray, Mapping[Any, float]]
+
+
+class TreasuryRiskMonitor:
+    """
+    Streaming risk metrics of the treasury portfolio.
+
+    Price ticks go to a MarketAnalyzer (rolling per-asset volatility and
+    correlations); balance ticks set the quantity held of each asset. The
+    portfolio return of a tick is the change in value of the holdings before
+    the tick at the new prices, so deposits and withdrawals do not count as
+    gains or losses. Those returns feed a rolling window (volatility, VaR)
+    and a flow-free value index whose rolling peak is tracked with a
+    monotonic queue (drawdown). Every update is O(1) amortized in the window
+    length; only `historical_var` looks at the whole window.
+    """
+
+    def __init__(self, assets: Sequence[Any], window=DEFAULT_WINDOW, ticks_per_year=DEFAULT_TICKS_PER_YEAR,
+                 confidence=DEFAULT_CONFIDENCE):
+        self.market = MarketAnalyzer(assets, window, ticks_per_year)
+        self.window = window
+        self.confidence = confidence
+        self._z = NormalDist().inv_cdf(confidence)
+        self.balances = np.zeros(len(self.market.assets))
+        self.returns = RollingWindow(window, 1)
+        self.index_value = 1.0
+        # (tick, index value) with decreasing values; the front is the rolling peak
+        self._peaks: deque = deque()
+        self.max_drawdown = 0.0
+        self.ticks = 0
+        self._lock = threading.Lock()
+
+    def _balance_vector(self, balances: BalanceTick) -> np.ndarray:
+        if isinstance(balances, Mapping):
+            vector = self.balances.copy()
+            for asset, amount in balances.items():
+                vector[self.market.index[asset]] = amount
+            return vector
+        vector = np.asarray(balances, dtype=np.float64)
+        if vector.shape != self.balances.shape:
+            raise ValueError(f"Expected {len(self.balances)} balances, got {vector.shape}")
+        return vector
+
+    def _record(self, portfolio_returns: np.ndarray):
+        if len(portfolio_returns) == 1:
+            self.returns.push(portfolio_returns)
+        else:
+            self.returns.extend(portfolio_returns[:, None])
+        values = self.index_value * np.exp(np.cumsum(portfolio_returns))
+        peaks, window, tick, max_drawdown = self._peaks, self.window, self.ticks, self.max_drawdown
+        for value in values.tolist():
+            tick += 1
+            while peaks and peaks[-1][1] <= value:
+                peaks.pop()
+            peaks.append((tick, value))
+            if peaks[0][0] <= tick - window:
+                peaks.popleft()
+            max_drawdown = max(max_drawdown, 1 - value / peaks[0][1])
+        self.index_value = values[-1]
+        self.ticks, self.max_drawdown = tick, max_drawdown
+
+    def ingest(self, prices: Optional[PriceTick] = None, balances: Optional[BalanceTick] = None):
+        """Apply one tick of new prices and/or balances (either may be partial mappings)"""
+        with self._lock:
+            if prices is not None:
+                held = self.balances * self.market.prices
+                returns = self.market.ingest(prices)
+                value_before = np.nansum(held)
+                if returns is not None and value_before > 0:
+                    value_after = np.sum(held * np.exp(returns))
+                    self._record(np.log([value_after / value_before]))
+            if balances is not None:
+                self.balances = self._balance_vector(balances)
+
+    def ingest_many(self, prices, balances=None):
+        """
+        Apply consecutive full price vectors, one row per tick. `balances`
+        (same shape) are the holdings after each tick; without them the
+        current holdings are kept.
+        """
+        with self._lock:
+            prices = np.asarray(prices, dtype=np.float64).reshape(-1, len(self.balances))
+            start = self.market.prices.copy()
+            returns = self.market.ingest_many(prices)
+            if balances is None:
+                held = np.broadcast_to(self.balances, prices.shape)
+            else:
+                balances = np.asarray(balances, dtype=np.float64).reshape(prices.shape)
+                held = np.vstack([self.balances, balances[:-1]])
+                self.balances = balances[-1].copy()
+            before = np.vstack([start, prices[:-1]])
+            # Without earlier prices the first tick has no return
+            skip = len(prices) - len(returns)
+            value_before = (held[skip:] * before[skip:]).sum(axis=1)
+            value_after = (held[skip:] * prices[skip:]).sum(axis=1)
+            valid = value_before > 0
+            if valid.any():
+                self._record(np.log(value_after[valid] / value_before[valid]))
+
+    @property
+    def value(self) -> float:
+        with self._lock:
+            return float(np.nansum(self.balances * self.market.prices))
+
+    def volatility(self) -> float:
+        """Annualized rolling volatility of the portfolio"""
+        with self._lock:
+            return float(np.sqrt(self.returns.variance()[0] * self.market.ticks_per_year))
+
+    def drawdown(self) -> float:
+        """Drop of the flow-free value index from its peak within the window"""
+        with self._lock:
+            return 1 - self.index_value / self._peaks[0][1] if self._peaks else 0.0
+
+    def value_at_risk(self) -> float:
+        """One-tick parametric (Gaussian) VaR, as a fraction of the portfolio value"""
+        with self._lock:
+            mean = self.returns.mean()[0]
+            std = np.sqrt(self.returns.variance()[0])
+            return float(max(0.0, -np.expm1(mean - self._z * std)))
+
+    def historical_var(self) -> float:
+        """One-tick VaR from the empirical quantile of the windowed returns"""
+        with self._lock:
+            returns = self.returns.values()[:, 0]
+        if not len(returns):
+            return 0.0
+        return float(max(0.0, -np.expm1(np.quantile(returns, 1 - self.confidence))))
+
+    @property
+    def ready(self) -> bool:
+        return self.returns.count >= 2
+
+    def risk_level(self) -> int:
+        """Risk tolerance (1-10) implied by the portfolio volatility, reduced while in drawdown"""
+        level = int(risk_level(self.volatility())) - int(self.drawdown() / DRAWDOWN_PER_LEVEL)
+        return max(1, min(10, level))
+
+    def snapshot(self, correlations=False) -> Dict[str, Any]:
+        snapshot = {
+            "ticks": self.ticks,
+            "value": self.value,
+            "volatility": self.volatility(),
+            "drawdown": self.drawdown(),
+            "max_drawdown": self.max_drawdown,
+            "var": self.value_at_risk(),
+            "historical_var": self.historical_var(),
+            "confidence": self.confidence,
+            "asset_volatility": dict(zip(self.market.assets, self.market.volatility().tolist()))
+        }
+        if correlations:
+            snapshot["correlation"] = self.market.correlation().tolist()
+        return snapshot
+
+    def stats(self) -> Dict[str, int]:
+        return {"ticks": self.ticks, "window": self.returns.count, "market_ticks": self.market.ticks}
@@ -1,25 +1,134 @@
 # integrations/nethermind/eth_executor.py
+import json
+import os
+import threading
+
+from eth_hash.auto import keccak
+
+from integrations.chain.tx_queue import (
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_RECEIPT_TIMEOUT,
+    MINED,
+    TransactionQueue,
+    finalize_proposal_data,
+    verify_tee_result_data,
+)
+from integrations.chain.vote_fetcher import BatchRPCClient
 from tee.marlin_tee_integration.marlin_tee import process_votes_in_tee
 
+DEFAULT_PRIVATE_VOTING_ADDRESS = '0x32CB351c8562Cb896Ffbe7cc3bbc7cceBBcB2Afb'
+
+def _hex_bytes(value) -> bytes:
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+
 class NethermindExecutor:
-    def __init__(self, provider_url, private_key=None):
+    """
+    Sends DAO decisions on-chain through a TransactionQueue: nonces are
+    assigned locally and many decisions go out in one JSON-RPC batch (see
+    `execute_dao_decisions`). The signing key and contract addresses default
+    to EXECUTOR_PRIVATE_KEY, PRIVATE_VOTING_ADDRESS and
+    RESULT_VERIFICATION_ADDRESS; without a verification address only
+    `finalizeProposal` is sent. `storage_manager` is where TEE tallies are
+    stored (a default StorageManager if None).
+    """
+
+    def __init__(self, provider_url, private_key=None, voting_address=None, verification_address=None,
+                 chain_id=None, storage_manager=None):
         self.provider = self._setup_provider(provider_url)
-        self.private_key = private_key
-        
+        self.private_key = private_key or os.getenv("EXECUTOR_PRIVATE_KEY")
+        self.voting_address = voting_address or os.getenv("PRIVATE_VOTING_ADDRESS", DEFAULT_PRIVATE_VOTING_ADDRESS)
+        self.verification_address = verification_address or os.getenv("RESULT_VERIFICATION_ADDRESS")
+        self.chain_id = chain_id
+        self.storage_manager = storage_manager
+        self._queue = None
+        self._queue_lock = threading.Lock()
+
     def _setup_provider(self, provider_url):
-        # Initialize Nethermind's provider
-        return NethermindProvider(provider_url)
-        
-    def execute_dao_decision(self, decision_data, verification_required=True):
+        # JSON-RPC client that can send many calls per request
+        return BatchRPCClient(provider_url)
+
+    @property
+    def queue(self) -> TransactionQueue:
+        # One queue (and so one NonceManager) per executor, even when first used from several threads
+        with self._queue_lock:
+            if self._queue is None:
+                if not self.private_key:
+                    raise ValueError("A private key is required to send transactions")
+                self._queue = TransactionQueue(self.provider, self.private_key, self.chain_id)
+            return self._queue
+
+    def verify_decision(self, decision_data):
+        """TEE tally of a decision's votes; only needs the votes and proposal id"""
+        return process_votes_in_tee(
+            decision_data["votes"],
+            decision_data["proposal_id"],
+            storage_manager=self.storage_manager
+        )
+
+    def _enqueue_decision(self, queue: TransactionQueue, decision_data, verified_data=None):
+        """Queue the contract calls of one decision on `queue` and return them"""
+        # A `verify_decision` result carries the tally under "results"
+        results = verified_data.get("results", verified_data) if verified_data else decision_data
+        if "approved" in results:
+            approved = bool(results["approved"])
+        else:
+            counts = results["counts"]
+            approved = counts["inFavor"] > counts["against"]
+        tee_proof = _hex_bytes(results.get("tee_proof") or b"")
+        insights_hash = keccak(json.dumps(decision_data.get("ai_insights"), sort_keys=True, default=str).encode())
+        proposal_id = decision_data["proposal_id"]
+
+        txs = [queue.enqueue(
+            self.voting_address, finalize_proposal_data(proposal_id, approved, insights_hash, tee_proof),
+            label=f"finalizeProposal:{proposal_id}"
+        )]
+        # Independent of finalizeProposal, so both go out in the same batch
+        if self.verification_address and results.get("votesRoot"):
+            txs.append(queue.enqueue(
+                self.verification_address, verify_tee_result_data(_hex_bytes(results["votesRoot"]), tee_proof),
+                label=f"verifyTeeResult:{proposal_id}"
+            ))
+        return {"proposal_id": proposal_id, "approved": approved, "transactions": txs}
+
+    def _send_transaction(self, decision_data, verified_data=None, wait=True):
+        return self._send_transactions([(decision_data, verified_data)], wait)[0]
+
+    def _send_transactions(self, decisions, wait=True, timeout=DEFAULT_RECEIPT_TIMEOUT,
+                           poll_interval=DEFAULT_POLL_INTERVAL):
+        queue = self.queue
+        executions = [self._enqueue_decision(queue, decision_data, verified_data)
+                      for decision_data, verified_data in decisions]
+        # A concurrent call may flush these along with its own; either way they are sent once this returns
+        queue.flush()
+        if wait:
+            queue.wait([tx for execution in executions for tx in execution["transactions"]], timeout, poll_interval)
+        for execution in executions:
+            execution["transactions"] = [tx.to_dict() for tx in execution["transactions"]]
+            execution["success"] = all(tx["status"] == MINED for tx in execution["transactions"])
+        return executions
+
+    def execute_dao_decision(self, decision_data, verification_required=True, verified_data=None):
         """
-        Execute DAO decisions on-chain with TEE verification
+        Execute DAO decisions on-chain with TEE verification.
+        Pass `verified_data` when the votes were already tallied by `verify_decision`.
         """
         if verification_required:
             # Use Marlin TEE for secure execution
-            verified_data = process_votes_in_tee(
-                decision_data["votes"], 
-                decision_data["proposal_id"]
-            )
-            return self._send_transaction(verified_data)
+            if verified_data is None:
+                verified_data = self.verify_decision(decision_data)
+            return self._send_transaction(decision_data, verified_data)
         else:
             return self._send_transaction(decision_data)
+
+    def execute_dao_decisions(self, decisions, wait=True, timeout=DEFAULT_RECEIPT_TIMEOUT,
+                              poll_interval=DEFAULT_POLL_INTERVAL):
+        """
+        Execute many decisions at once. `decisions` are (decision_data,
+        verified_data) pairs, with verified_data None for decisions that carry
+        their own `counts` or `approved`. All transactions are signed with
+        consecutive local nonces and sent in one batch, then their receipts are
+        polled together; results come back in input order.
+        """
+        return self._send_transactions(list(decisions), wait, timeout, poll_interval)
@@ -0,0 +1,135 @@
+# integrations/og_storage/async_client.py
+
+import asyncio
+
+from integrations.og_storage.transport import (
+    DEFAULT_BACKOFF,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_RETRIES,
+    DEFAULT_TIMEOUT,
+    RETRY_STATUSES,
+)
+
+
+class AsyncZeroGStorageClient:
+    """
+    asyncio counterpart of ZeroGStorageClient.
+
+    Uses one aiohttp session with a bounded keep-alive connection pool, and
+    retries connection errors and transient statuses with exponential backoff.
+    Use it as an async context manager, or call `close()` when done.
+    """
+
+    def __init__(self, base_url="http://localhost:3001", pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT, retries=DEFAULT_RETRIES, backoff_factor=DEFAULT_BACKOFF):
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            # Imported lazily so the synchronous clients do not depend on aiohttp
+            import aiohttp
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=30),
+                timeout=aiohttp.ClientTimeout(total=self.timeout, connect=self.connect_timeout)
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def _request(self, method, path, make_data=None, **kwargs):
+        """
+        Send a request and return (status, body bytes), retrying transient failures.
+        `make_data` builds a fresh request body for every attempt, for bodies that
+        can only be sent once (aiohttp.FormData).
+        """
+        import aiohttp
+        session = self._get_session()
+        url = f"{self.base_url}{path}"
+        for attempt in range(self.retries + 1):
+            if make_data is not None:
+                kwargs["data"] = make_data()
+            try:
+                async with session.request(method, url, **kwargs) as response:
+                    body = await response.read()
+                    if response.status not in RETRY_STATUSES or attempt == self.retries:
+                        return response.status, body
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == self.retries:
+                    raise
+            await asyncio.sleep(self.backoff_factor * (2 ** attempt))
+
+    async def upload_bytes(self, data: bytes, filename="upload.bin"):
+        """Upload in-memory content to 0G Storage using the TypeScript service"""
+        import aiohttp
+
+        def make_form():
+            form = aiohttp.FormData()
+            form.add_field("file", data, filename=filename)
+            return form
+
+        status, body = await self._request("POST", "/upload", make_data=make_form)
+        if status == 200:
+            return _json(body)
+        raise Exception(f"Upload failed: {body.decode(errors='replace')}")
+
+    async def download_bytes(self, root_hash) -> bytes:
+        """Download a file from 0G Storage using the TypeScript service"""
+        status, body = await self._request("GET", f"/download/{root_hash}")
+        if status == 200:
+            return body
+        raise Exception(f"Download failed: {body.decode(errors='replace')}")
+
+    async def store_key_value(self, key, value):
+        """Store a key-value pair using the TypeScript service"""
+        status, body = await self._request("POST", "/kv", json={"key": key, "value": value})
+        if status == 200:
+            return _json(body)
+        raise Exception(f"Key-value storage failed: {body.decode(errors='replace')}")
+
+    async def retrieve_key_value(self, key):
+        """Retrieve a key-value pair using the TypeScript service"""
+        status, body = await self._request("GET", f"/kv/{key}")
+        if status == 200:
+            return _json(body)
+        raise Exception(f"Key-value retrieval failed: {body.decode(errors='replace')}")
+
+    async def store_many(self, items, batch_size=1000):
+        """Store many key-value pairs through the batch endpoint"""
+        entries = [{"key": k, "value": v} for k, v in (items.items() if isinstance(items, dict) else items)]
+        chunks = [entries[i:i + batch_size] for i in range(0, len(entries), batch_size)]
+        for chunk in chunks:
+            status, body = await self._request("POST", "/kv/batch", json={"entries": chunk})
+            if status != 200:
+                raise Exception(f"Batch key-value storage failed: {body.decode(errors='replace')}")
+        return {"success": True, "stored": len(entries)}
+
+    async def retrieve_many(self, keys, batch_size=1000):
+        """Retrieve many keys at once; returns {key: value}, with None for missing keys"""
+        keys = list(dict.fromkeys(keys))
+        values = {}
+        for start in range(0, len(keys), batch_size):
+            status, body = await self._request("POST", "/kv/batch/get", json={"keys": keys[start:start + batch_size]})
+            if status != 200:
+                raise Exception(f"Batch key-value retrieval failed: {body.decode(errors='replace')}")
+            values.update(_json(body)["values"])
+        return values
+
+
+def _json(body: bytes):
+    import json
+    return json.loads(body)
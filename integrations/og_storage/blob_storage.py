@@ -1,19 +1,20 @@
-import requests
+from integrations.og_storage.transport import StorageTransport, default_transport
 
 class BlobStorage:
-    def __init__(self, base_url):
+    def __init__(self, base_url, transport: StorageTransport = None):
         self.base_url = base_url
+        self.transport = transport or default_transport()
 
     def upload_blob(self, file_path):
         with open(file_path, "rb") as file:
-            response = requests.post(f"{self.base_url}/upload", files={"file": file})
+            response = self.transport.post(f"{self.base_url}/upload", files={"file": file})
             if response.status_code == 200:
                 return response.json()
             else:
                 raise Exception(f"Blob upload failed: {response.text}")
 
     def retrieve_blob(self, blob_id):
-        response = requests.get(f"{self.base_url}/retrieve/{blob_id}")
+        response = self.transport.get(f"{self.base_url}/retrieve/{blob_id}")
         if response.status_code == 200:
             return response.content
         else:
@@ -1,19 +1,20 @@
-import requests
+from integrations.og_storage.transport import StorageTransport, default_transport
 
 class KeyValueStorage:
-    def __init__(self, base_url):
+    def __init__(self, base_url, transport: StorageTransport = None):
         self.base_url = base_url
+        self.transport = transport or default_transport()
 
     def set_key_value(self, key, value):
         payload = {"key": key, "value": value}
-        response = requests.post(f"{self.base_url}/set", json=payload)
+        response = self.transport.post(f"{self.base_url}/set", json=payload)
         if response.status_code == 200:
             return response.json()
         else:
             raise Exception(f"Key-Value set failed: {response.text}")
 
     def get_key_value(self, key):
-        response = requests.get(f"{self.base_url}/get/{key}")
+        response = self.transport.get(f"{self.base_url}/get/{key}")
         if response.status_code == 200:
             return response.json()
         else:
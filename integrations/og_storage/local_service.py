@@ -0,0 +1,232 @@
+# integrations/og_storage/local_service.py
+
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from email import policy
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+
+MAX_BATCH_SIZE = 1000
+
+
+class LocalStorageService:
+    """
+    In-memory stand-in for the TypeScript storage-service.
+
+    Serves the same key-value endpoints (`/kv`, `/kv/<key>`, `/kv/batch`,
+    `/kv/batch/get`) and blob endpoints (`/upload`, `/download/<rootHash>`,
+    with Range support) over HTTP/1.1 keep-alive, so the Python clients can be
+    exercised without Node or the 0G network. Blobs are addressed by the
+    SHA-256 of their content. Counters and the `fail_next` / `delay` /
+    `drop_download_after` knobs make it usable in tests and benchmarks.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.host = host
+        self.port = port
+        self.kv: Dict[str, Any] = {}
+        self.blobs: Dict[str, bytes] = {}
+        # Cut the next download's connection after this many body bytes
+        self.drop_download_after = None
+        self.connections = 0
+        self.requests = 0
+        self.fail_next = 0
+        self.delay = 0.0
+        self.lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self._server.server_address[1]}"
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), _make_handler(self))
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def handle(self, method, path, body):
+        """Route a request; returns (status, JSON body)"""
+        if method == "POST" and path == "/kv":
+            if not body.get("key") or "value" not in body:
+                return 400, {"error": "Key and value are required"}
+            with self.lock:
+                self.kv[body["key"]] = body["value"]
+            return 200, {"success": True}
+
+        if method == "POST" and path == "/kv/batch":
+            entries = body.get("entries")
+            if not isinstance(entries, list) or any(not e or not e.get("key") or "value" not in e for e in entries):
+                return 400, {"error": "entries must be a list of {key, value}"}
+            if len(entries) > MAX_BATCH_SIZE:
+                return 413, {"error": f"At most {MAX_BATCH_SIZE} entries per batch"}
+            with self.lock:
+                for entry in entries:
+                    self.kv[entry["key"]] = entry["value"]
+            return 200, {"success": True, "stored": len(entries)}
+
+        if method == "POST" and path == "/kv/batch/get":
+            keys = body.get("keys")
+            if not isinstance(keys, list) or any(not isinstance(k, str) or not k for k in keys):
+                return 400, {"error": "keys must be a list of strings"}
+            if len(keys) > MAX_BATCH_SIZE:
+                return 413, {"error": f"At most {MAX_BATCH_SIZE} keys per batch"}
+            with self.lock:
+                return 200, {"values": {key: self.kv.get(key) for key in keys}}
+
+        if method == "POST" and path == "/upload":
+            content = body.get("file")
+            if content is None:
+                return 400, {"error": "No file provided"}
+            root_hash = f"0x{hashlib.sha256(content).hexdigest()}"
+            with self.lock:
+                self.blobs[root_hash] = content
+            return 200, {"rootHash": root_hash, "transactionHash": f"0x{time.time_ns():x}"}
+
+        if method == "GET" and path.startswith("/kv/"):
+            key = path[len("/kv/"):]
+            with self.lock:
+                if key not in self.kv:
+                    return 404, {"error": "Key not found"}
+                return 200, {"key": key, "value": self.kv[key]}
+
+        return 404, {"error": "Not found"}
+
+
+def _make_handler(service: LocalStorageService):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            with service.lock:
+                service.connections += 1
+
+        def _reply(self, status, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            try:
+                self.wfile.write(payload)
+            except (BrokenPipeError, ConnectionResetError):
+                # Client gave up, e.g. after a timeout
+                self.close_connection = True
+
+        def _read_body(self) -> bytes:
+            if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                chunks = []
+                while True:
+                    size = int(self.rfile.readline().split(b";")[0], 16)
+                    if size == 0:
+                        self.rfile.readline()
+                        return b"".join(chunks)
+                    chunks.append(self.rfile.read(size))
+                    self.rfile.readline()
+            length = int(self.headers.get("Content-Length") or 0)
+            return self.rfile.read(length) if length else b""
+
+        def _parse_form(self, raw) -> dict:
+            header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode()
+            message = BytesParser(policy=policy.HTTP).parsebytes(header + raw)
+            return {
+                part.get_param("name", header="content-disposition"): part.get_payload(decode=True)
+                for part in message.iter_parts()
+            } if message.is_multipart() else {}
+
+        def _download(self, root_hash):
+            with service.lock:
+                content = service.blobs.get(root_hash)
+                drop_after, service.drop_download_after = service.drop_download_after, None
+            if content is None:
+                self._reply(500, {"error": f"Unknown root hash {root_hash}"})
+                return
+            start, status = 0, 200
+            match = re.fullmatch(r"bytes=(\d+)-", self.headers.get("Range", ""))
+            if match:
+                start, status = int(match.group(1)), 206
+                if start >= len(content):
+                    self._reply(416, {"error": "Range not satisfiable"})
+                    return
+            body = content[start:]
+            self.send_response(status)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("Content-Length", str(len(body)))
+            if status == 206:
+                self.send_header("Content-Range", f"bytes {start}-{len(content) - 1}/{len(content)}")
+            self.end_headers()
+            if drop_after is not None:
+                self.wfile.write(body[:drop_after])
+                self.wfile.flush()
+                self.close_connection = True
+                return
+            self.wfile.write(body)
+
+        def _dispatch(self, method):
+            raw = self._read_body()
+            with service.lock:
+                service.requests += 1
+                failing = service.fail_next > 0
+                service.fail_next -= failing
+            if service.delay:
+                time.sleep(service.delay)
+            if failing:
+                self._reply(503, {"error": "Service unavailable"})
+                return
+            if method == "GET" and self.path.startswith("/download/"):
+                self._download(self.path[len("/download/"):])
+                return
+            try:
+                if self.headers.get("Content-Type", "").startswith("multipart/form-data"):
+                    body = self._parse_form(raw)
+                else:
+                    body = json.loads(raw) if raw else {}
+            except ValueError:
+                self._reply(400, {"error": "Invalid JSON"})
+                return
+            self._reply(*service.handle(method, self.path, body))
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local in-memory stand-in for the 0G storage service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3001)
+    args = parser.parse_args()
+
+    service = LocalStorageService(args.host, args.port).start()
+    print(f"Local storage service running at {service.url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        service.stop()
@@ -0,0 +1,376 @@
+# integrations/og_storage/metadata_cache.py
+
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory file locks (Windows): every process then keeps its own log
+    fcntl = None
+
+DEFAULT_CACHE_PATH = os.getenv("OG_STORAGE_CACHE_PATH")
+DEFAULT_CACHE_SIZE = int(os.getenv("OG_STORAGE_CACHE_SIZE", "4096"))
+
+# Keys whose values never change once written. vote_results_* is not one of
+# them: it is rewritten on every tally and again when AI insights land.
+IMMUTABLE_PREFIXES = ("auction_",)
+
+# key length, value length (TOMBSTONE for deletions), crc32 of key + value
+_HEADER = struct.Struct("<III")
+_TOMBSTONE = 0xFFFFFFFF
+
+
+class AppendOnlyLog:
+    """
+    Append-only key/value log on disk, read through a memory map.
+
+    Every write appends a `(key, value)` record; an in-memory index maps each
+    key to the offset and length of its latest value, so reads are a slice of
+    the mapping. The index is rebuilt by scanning the log on open, stopping at
+    the first torn or corrupt record (which is truncated away). Superseded
+    records are reclaimed by `compact`, which runs automatically once dead
+    bytes outweigh live ones.
+
+    Several processes may share one log: writes and compactions hold an
+    exclusive lock on `<path>.lock`, and first catch up on records appended
+    (or a compaction done) by the others. Where file locks are unavailable
+    the log is made per-process instead, by suffixing `path` with the pid.
+    """
+
+    def __init__(self, path, compact_min_bytes=1 << 20):
+        if fcntl is None:
+            path = f"{path}.{os.getpid()}"
+        self.path = path
+        self.compact_min_bytes = compact_min_bytes
+        self._lock = threading.Lock()
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._live_bytes = 0
+        self._mmap = None
+        self._mapped_size = 0
+        # Offset up to which the log has been indexed
+        self._end = 0
+        self.compactions = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = open(f"{path}.lock", "a+b") if fcntl is not None else None
+        with self._file_lock():
+            self._file = open(path, "a+b")
+            self._load()
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def keys(self):
+        with self._lock:
+            return list(self._index)
+
+    @property
+    def size(self) -> int:
+        return self._file.tell()
+
+    def _remap(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.flush()
+        self._mapped_size = os.fstat(self._file.fileno()).st_size
+        if self._mapped_size:
+            self._mmap = mmap.mmap(self._file.fileno(), self._mapped_size, access=mmap.ACCESS_READ)
+
+    @contextmanager
+    def _file_lock(self):
+        if self._lock_file is None:
+            yield
+            return
+        fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _catch_up(self):
+        """Index what other processes appended since our last write, reopening after their compactions"""
+        if self._lock_file is None:
+            return
+        try:
+            replaced = os.stat(self.path).st_ino != os.fstat(self._file.fileno()).st_ino
+        except FileNotFoundError:
+            replaced = True
+        if replaced:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+            self._file.close()
+            self._file = open(self.path, "a+b")
+            self._index = {}
+            self._live_bytes = 0
+            self._load()
+        elif os.fstat(self._file.fileno()).st_size != self._end:
+            self._load(self._end)
+
+    def _load(self, start=0):
+        self._remap()
+        offset = start
+        data = self._mmap
+        while data is not None and offset + _HEADER.size <= self._mapped_size:
+            key_len, value_len, crc = _HEADER.unpack_from(data, offset)
+            body_len = key_len + (0 if value_len == _TOMBSTONE else value_len)
+            end = offset + _HEADER.size + body_len
+            if end > self._mapped_size:
+                break
+            body = data[offset + _HEADER.size:end]
+            if zlib.crc32(body) != crc:
+                break
+            key = body[:key_len].decode()
+            self._drop(key)
+            if value_len != _TOMBSTONE:
+                self._index[key] = (offset + _HEADER.size + key_len, value_len)
+                self._live_bytes += _HEADER.size + body_len
+            offset = end
+
+        if offset < self._mapped_size:
+            print(f"Truncating metadata cache log {self.path} at byte {offset} (torn or corrupt record)")
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+            self._file.truncate(offset)
+            self._remap()
+        self._file.seek(0, os.SEEK_END)
+        self._end = offset
+
+    def _drop(self, key):
+        previous = self._index.pop(key, None)
+        if previous is not None:
+            self._live_bytes -= _HEADER.size + len(key.encode()) + previous[1]
+
+    def _append(self, key: str, value: Optional[bytes]):
+        key_bytes = key.encode()
+        body = key_bytes + (value or b"")
+        value_len = _TOMBSTONE if value is None else len(value)
+        self._file.seek(0, os.SEEK_END)
+        offset = self._file.tell()
+        self._file.write(_HEADER.pack(len(key_bytes), value_len, zlib.crc32(body)) + body)
+        self._end = offset + _HEADER.size + len(body)
+        self._drop(key)
+        if value is not None:
+            self._index[key] = (offset + _HEADER.size + len(key_bytes), len(value))
+            self._live_bytes += _HEADER.size + len(body)
+
+    def get(self, key) -> Optional[bytes]:
+        with self._lock:
+            location = self._index.get(key)
+            if location is None:
+                return None
+            offset, length = location
+            if offset + length > self._mapped_size:
+                self._remap()
+            return self._mmap[offset:offset + length]
+
+    def put(self, key, value: bytes):
+        self.put_many([(key, value)])
+
+    def put_many(self, items: Iterable[Tuple[str, bytes]]):
+        with self._lock, self._file_lock():
+            self._catch_up()
+            for key, value in items:
+                self._append(key, value)
+            self._file.flush()
+            self._maybe_compact()
+
+    def delete(self, key):
+        with self._lock, self._file_lock():
+            self._catch_up()
+            if key in self._index:
+                self._append(key, None)
+                self._file.flush()
+                self._maybe_compact()
+
+    def _maybe_compact(self):
+        size = self._file.tell()
+        if size >= self.compact_min_bytes and size - self._live_bytes > self._live_bytes:
+            self._compact()
+
+    def compact(self):
+        """Rewrite the log with only the latest value of each live key"""
+        with self._lock, self._file_lock():
+            self._catch_up()
+            self._compact()
+
+    def _compact(self):
+        self._remap()
+        tmp_path = f"{self.path}.compact"
+        index = {}
+        with open(tmp_path, "wb") as out:
+            for key, (offset, length) in self._index.items():
+                key_bytes = key.encode()
+                body = key_bytes + self._mmap[offset:offset + length]
+                index[key] = (out.tell() + _HEADER.size + len(key_bytes), length)
+                out.write(_HEADER.pack(len(key_bytes), length, zlib.crc32(body)))
+                out.write(body)
+            out.flush()
+            os.fsync(out.fileno())
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, "a+b")
+        self._index = index
+        self._live_bytes = os.path.getsize(self.path)
+        self._remap()
+        self._file.seek(0, os.SEEK_END)
+        self._end = self._file.tell()
+        self.compactions += 1
+
+    def sync(self):
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+            self._file.close()
+            if self._lock_file is not None:
+                self._lock_file.close()
+
+
+class MetadataCache:
+    """
+    Read-through / write-through cache for StorageManager metadata.
+
+    An in-memory LRU of encoded values sits in front of an optional
+    `AppendOnlyLog`, so cached keys survive restarts and are served at local
+    disk speed. Only keys accepted by `cacheable` (by default those starting
+    with one of `immutable_prefixes`, i.e. values that are final once
+    written) are cached; values are returned as fresh
+    decoded copies, so callers may mutate them freely.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_memory_entries=DEFAULT_CACHE_SIZE,
+                 immutable_prefixes=IMMUTABLE_PREFIXES, compact_min_bytes=1 << 20):
+        self.max_memory_entries = max_memory_entries
+        self.immutable_prefixes = tuple(immutable_prefixes)
+        self.log = AppendOnlyLog(path, compact_min_bytes=compact_min_bytes) if path else None
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            if key in self._memory:
+                return True
+        return self.log is not None and key in self.log
+
+    def cacheable(self, key) -> bool:
+        return key.startswith(self.immutable_prefixes)
+
+    def _remember(self, key, encoded: bytes):
+        self._memory[key] = encoded
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, key) -> Optional[bytes]:
+        with self._lock:
+            encoded = self._memory.get(key)
+            if encoded is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return encoded
+        encoded = self.log.get(key) if self.log is not None else None
+        with self._lock:
+            if encoded is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, encoded)
+            return encoded
+
+    def get(self, key, default=None):
+        encoded = self._lookup(key)
+        return default if encoded is None else json.loads(encoded)
+
+    def put(self, key, value):
+        self.put_many([(key, value)])
+
+    def put_many(self, items: Iterable[Tuple[str, Any]]):
+        encoded = [(key, json.dumps(value, separators=(",", ":")).encode()) for key, value in items]
+        if not encoded:
+            return
+        if self.log is not None:
+            self.log.put_many(encoded)
+        with self._lock:
+            for key, value in encoded:
+                self._remember(key, value)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._memory.pop(key, None)
+        if self.log is not None:
+            self.log.delete(key)
+
+    def warm(self, limit=None) -> int:
+        """Load up to `limit` (default: the LRU size) most recently written keys from disk into memory"""
+        if self.log is None:
+            return 0
+        limit = self.max_memory_entries if limit is None else min(limit, self.max_memory_entries)
+        keys = self.log.keys()[-limit:] if limit else []
+        loaded = 0
+        for key in keys:
+            encoded = self.log.get(key)
+            if encoded is not None:
+                with self._lock:
+                    self._remember(key, encoded)
+                loaded += 1
+        return loaded
+
+    def close(self):
+        if self.log is not None:
+            self.log.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "disk_entries": len(self.log) if self.log is not None else 0,
+                "disk_bytes": self.log.size if self.log is not None else 0,
+                "compactions": self.log.compactions if self.log is not None else 0,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0
+            }
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_metadata_cache() -> Optional[MetadataCache]:
+    """Process-wide cache backed by OG_STORAGE_CACHE_PATH, or None when that is unset"""
+    global _default_cache
+    if not DEFAULT_CACHE_PATH:
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = MetadataCache(DEFAULT_CACHE_PATH)
+            _default_cache.warm()
+        return _default_cache
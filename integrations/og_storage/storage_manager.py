@@ -1,10 +1,21 @@
 # integrations/0g_storage/storage_manager.py
 
+from integrations.og_storage.metadata_cache import MetadataCache, default_metadata_cache
 from integrations.og_storage.typescript_client import ZeroGStorageClient
+from integrations.og_storage.write_buffer import WriteBehindBuffer
+
+_MISSING = object()
 
 class StorageManager:
-    def __init__(self, service_url="http://localhost:3001"):
+    def __init__(self, service_url="http://localhost:3001", client: ZeroGStorageClient = None,
+                 write_buffer: WriteBehindBuffer = None, cache: MetadataCache = None):
         self.service_url = service_url
+        # One client per manager, backed by the shared connection pool
+        self.client = client or ZeroGStorageClient(service_url)
+        # Optional write-behind buffer; metadata writes are then batched in the background
+        self.write_buffer = write_buffer
+        # Local read-through/write-through cache for immutable keys (OG_STORAGE_CACHE_PATH)
+        self.cache = cache if cache is not None else default_metadata_cache()
     
     # De-prioritize blob storage but keep the method
     def upload_file(self, file_path):
@@ -12,6 +23,15 @@ class StorageManager:
         print(f"NOTICE: Blob storage upload not functioning. Would have uploaded: {file_path}")
         return {"rootHash": f"simulated-hash-{hash(file_path)}", "transactionHash": "simulated-tx"}
     
+    def upload_data(self, data, filename="upload.bin"):
+        """Stream bytes, a file-like object or an iterator of chunks to blob storage, no temp file needed"""
+        try:
+            return self.client.upload(data, filename=filename)
+        except Exception as e:
+            # Keep the demo flowing like upload_file when blob storage is unavailable
+            print(f"NOTICE: Blob storage upload failed ({e}). Simulating upload of: {filename}")
+            return {"rootHash": f"simulated-hash-{hash(filename)}", "transactionHash": "simulated-tx"}
+    
     # De-prioritize blob storage but keep the method
     def retrieve_file(self, blob_id, output_path):
         # For hackathon demo, simply log that this would download a file
@@ -21,14 +41,83 @@ class StorageManager:
     # Focus on these two working methods
     def store_metadata(self, key, value):
         # This method is working - use it for your demo
-        from integrations.og_storage.typescript_client import ZeroGStorageClient
-        client = ZeroGStorageClient(self.service_url)
-        return client.store_key_value(key, value)
+        if self.write_buffer is not None:
+            self.write_buffer.put(key, value)
+            result = {"success": True, "buffered": True}
+        else:
+            result = self.client.store_key_value(key, value)
+        self._cache_put([(key, value)])
+        return result
     
     def retrieve_metadata(self, key):
         # This method is working - use it for your demo
-        from integrations.og_storage.typescript_client import ZeroGStorageClient
-        client = ZeroGStorageClient(self.service_url)
-        response = client.retrieve_key_value(key)
-        return response.get("value") if response else None
+        if self.write_buffer is not None:
+            value = self.write_buffer.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+        if self._cacheable(key):
+            value = self.cache.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+        response = self.client.retrieve_key_value(key)
+        value = response.get("value") if response else None
+        if value is not None:
+            self._cache_put([(key, value)])
+        return value
+
+    def _cacheable(self, key):
+        return self.cache is not None and self.cache.cacheable(key)
+
+    def _cache_put(self, items):
+        if self.cache is not None:
+            self.cache.put_many([(key, value) for key, value in items if self.cache.cacheable(key)])
+
+    def store_many(self, items):
+        """Store many metadata entries (a mapping or (key, value) pairs) in batched requests"""
+        items = list(items.items() if isinstance(items, dict) else items)
+        if self.write_buffer is not None:
+            for key, value in items:
+                self.write_buffer.put(key, value)
+            result = {"success": True, "buffered": True}
+        else:
+            result = self.client.store_many(items)
+        self._cache_put(items)
+        return result
+
+    def retrieve_many(self, keys):
+        """Retrieve many metadata entries; returns {key: value}, with None for missing keys"""
+        keys = list(keys)
+        values = {}
+        if self.write_buffer is not None:
+            for key in keys:
+                value = self.write_buffer.get(key, _MISSING)
+                if value is not _MISSING:
+                    values[key] = value
+        for key in keys:
+            if key not in values and self._cacheable(key):
+                value = self.cache.get(key, _MISSING)
+                if value is not _MISSING:
+                    values[key] = value
+        remaining = [key for key in keys if key not in values]
+        if remaining:
+            fetched = self.client.retrieve_many(remaining)
+            values.update(fetched)
+            self._cache_put((key, value) for key, value in fetched.items() if value is not None)
+        return values
+
+    def warm_up(self, keys):
+        """Bulk-load cacheable keys missing from the local cache; returns how many were fetched"""
+        if self.cache is None:
+            return 0
+        missing = [key for key in keys if self.cache.cacheable(key) and key not in self.cache]
+        if not missing:
+            return 0
+        fetched = self.retrieve_many(missing)
+        return sum(1 for value in fetched.values() if value is not None)
+
+    def flush(self):
+        """Write out buffered metadata, if a write-behind buffer is in use"""
+        if self.write_buffer is not None:
+            return self.write_buffer.flush()
+        return 0
 
@@ -2,18 +2,18 @@
 
 from integrations.og_storage.storage_manager import StorageManager
 import json
-import os
 
-def store_voting_results(proposal_id, results):
-    storage_manager = StorageManager()
-    
-    # Create temporary file with voting results
-    results_file = f"vote_results_{proposal_id}.json"
-    with open(results_file, "w") as f:
-        json.dump(results, f)
+def serialize_results(results):
+    """Encode results to JSON incrementally, as a stream of byte chunks"""
+    return (chunk.encode() for chunk in json.JSONEncoder().iterencode(results))
+
+def store_voting_results(proposal_id, results, storage_manager=None):
+    storage_manager = storage_manager or StorageManager()
     
-    # Upload file to 0G Storage
-    upload_result = storage_manager.upload_file(results_file)
+    # Stream the serialized results straight to 0G Storage
+    upload_result = storage_manager.upload_data(
+        serialize_results(results), filename=f"vote_results_{proposal_id}.json"
+    )
     root_hash = upload_result["rootHash"]
     
     # Store metadata using key-value storage
@@ -23,21 +23,15 @@ def store_voting_results(proposal_id, results):
         "total_votes": results["totalVotes"]
     })
     
-    # Clean up temporary file
-    os.remove(results_file)
-    
     return root_hash
 
-def store_auction_results(project_id, results):
-    storage_manager = StorageManager()
+def store_auction_results(project_id, results, storage_manager=None):
+    storage_manager = storage_manager or StorageManager()
     
-    # Create temporary file with auction results
-    results_file = f"auction_results_{project_id}.json"
-    with open(results_file, "w") as f:
-        json.dump(results, f)
-    
-    # Upload file to 0G Storage
-    upload_result = storage_manager.upload_file(results_file)
+    # Stream the serialized results straight to 0G Storage
+    upload_result = storage_manager.upload_data(
+        serialize_results(results), filename=f"auction_results_{project_id}.json"
+    )
     root_hash = upload_result["rootHash"]
     
     # Store metadata using key-value storage
@@ -48,7 +42,4 @@ def store_auction_results(project_id, results):
         "timestamp": results["timestamp"]
     })
     
-    # Clean up temporary file
-    os.remove(results_file)
-    
     return root_hash
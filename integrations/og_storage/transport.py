@@ -0,0 +1,89 @@
+# integrations/og_storage/transport.py
+
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_POOL_SIZE = int(os.getenv("OG_STORAGE_POOL_SIZE", "16"))
+DEFAULT_TIMEOUT = float(os.getenv("OG_STORAGE_TIMEOUT", "30"))
+DEFAULT_CONNECT_TIMEOUT = float(os.getenv("OG_STORAGE_CONNECT_TIMEOUT", "3.05"))
+DEFAULT_RETRIES = int(os.getenv("OG_STORAGE_RETRIES", "3"))
+DEFAULT_BACKOFF = float(os.getenv("OG_STORAGE_BACKOFF", "0.2"))
+DEFAULT_CHUNK_SIZE = int(os.getenv("OG_STORAGE_CHUNK_SIZE", str(1024 * 1024)))
+
+# Transient statuses worth retrying; KV writes are idempotent so POST is retried too
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_METHODS = frozenset(["GET", "POST", "PUT", "DELETE", "HEAD"])
+
+
+class StorageTransport:
+    """
+    Connection-pooled HTTP transport shared by the 0G storage clients.
+
+    Wraps a keep-alive `requests.Session` with a bounded connection pool,
+    default timeouts and retries with exponential backoff on connection
+    errors and transient HTTP statuses.
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT, retries=DEFAULT_RETRIES,
+                 backoff_factor=DEFAULT_BACKOFF, session=None):
+        self.timeout = (connect_timeout, timeout)
+        self.pool_size = pool_size
+        self.session = session or requests.Session()
+        self._single_shot = None
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=RETRY_METHODS,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method, url, retry=True, **kwargs) -> requests.Response:
+        """Send a request; pass retry=False for bodies that cannot be replayed, such as streams"""
+        kwargs.setdefault("timeout", self.timeout)
+        session = self.session if retry else self._single_shot_session()
+        return session.request(method, url, **kwargs)
+
+    def _single_shot_session(self) -> requests.Session:
+        if self._single_shot is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=0)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._single_shot = session
+        return self._single_shot
+
+    def get(self, url, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+        if self._single_shot is not None:
+            self._single_shot.close()
+
+
+_default_transport = None
+_default_lock = threading.Lock()
+
+
+def default_transport() -> StorageTransport:
+    """Process-wide transport, created on first use"""
+    global _default_transport
+    with _default_lock:
+        if _default_transport is None:
+            _default_transport = StorageTransport()
+        return _default_transport
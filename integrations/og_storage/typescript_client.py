@@ -1,37 +1,156 @@
 # integrations/0g_storage/typescript_client.py
 
+import hashlib
+import os
+import uuid
+
 import requests
-import json
+
+from integrations.og_storage.transport import DEFAULT_CHUNK_SIZE, StorageTransport, default_transport
+
+# Entries per /kv/batch request; matches the service's KV_MAX_BATCH_SIZE default
+KV_BATCH_SIZE = 1000
+
+# Times a download may be resumed after the connection drops mid-transfer
+DOWNLOAD_RESUMES = 3
+
+def iter_chunks(data, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield bytes chunks from bytes, str, a binary file-like object or an iterable of either"""
+    if isinstance(data, str):
+        data = data.encode()
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        view = memoryview(data)
+        for start in range(0, len(view), chunk_size):
+            yield bytes(view[start:start + chunk_size])
+    elif hasattr(data, 'read'):
+        while True:
+            chunk = data.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk.encode() if isinstance(chunk, str) else chunk
+    else:
+        # Coalesce small pieces (e.g. from json iterencode) into chunk_size writes
+        buffer = bytearray()
+        for chunk in data:
+            buffer += chunk.encode() if isinstance(chunk, str) else chunk
+            if len(buffer) >= chunk_size:
+                yield bytes(buffer)
+                buffer.clear()
+        if buffer:
+            yield bytes(buffer)
 
 class ZeroGStorageClient:
-    def __init__(self, base_url="http://localhost:3001"):
+    def __init__(self, base_url="http://localhost:3001", transport: StorageTransport = None, batch_size=KV_BATCH_SIZE,
+                 chunk_size=DEFAULT_CHUNK_SIZE):
         self.base_url = base_url
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        # Shared keep-alive connection pool with timeouts and retries
+        self.transport = transport or default_transport()
         
     def upload_file(self, file_path):
         """Upload a file to 0G Storage using the TypeScript service"""
         with open(file_path, 'rb') as f:
-            files = {'file': f}
-            response = requests.post(f"{self.base_url}/upload", files=files)
-            if response.status_code == 200:
-                return response.json()
-            else:
-                raise Exception(f"Upload failed: {response.text}")
+            return self.upload(f, filename=os.path.basename(file_path))
+
+    def upload(self, data, filename="upload.bin"):
+        """
+        Stream bytes, a file-like object or an iterator of chunks to 0G Storage.
+
+        The multipart body is sent with chunked transfer encoding, so nothing is
+        buffered or written to disk; the SHA-256 of the content is computed on
+        the way through and returned as `contentHash` along with `size`.
+        Streams cannot be replayed, so the upload is attempted once.
+        """
+        boundary = uuid.uuid4().hex
+        hasher = hashlib.sha256()
+        size = 0
+
+        def body():
+            nonlocal size
+            yield (f'--{boundary}\r\n'
+                   f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+                   f'Content-Type: application/octet-stream\r\n\r\n').encode()
+            for chunk in iter_chunks(data, self.chunk_size):
+                hasher.update(chunk)
+                size += len(chunk)
+                yield chunk
+            yield f'\r\n--{boundary}--\r\n'.encode()
+
+        response = self.transport.post(
+            f"{self.base_url}/upload",
+            data=body(),
+            headers={'Content-Type': f'multipart/form-data; boundary={boundary}'},
+            retry=False
+        )
+        if response.status_code != 200:
+            raise Exception(f"Upload failed: {response.text}")
+        result = response.json()
+        result['contentHash'] = f"0x{hasher.hexdigest()}"
+        result['size'] = size
+        return result
+
+    def iter_download(self, root_hash, offset=0, chunk_size=None, max_resumes=DOWNLOAD_RESUMES):
+        """
+        Stream a file from 0G Storage in chunks, starting at byte `offset`.
+
+        If the connection drops mid-transfer the download is resumed from the
+        last received byte with a Range request, up to `max_resumes` times.
+        """
+        chunk_size = chunk_size or self.chunk_size
+        resumes = 0
+        while True:
+            headers = {'Range': f'bytes={offset}-'} if offset else {}
+            response = self.transport.get(f"{self.base_url}/download/{root_hash}", stream=True, headers=headers)
+            try:
+                if response.status_code == 416:
+                    # Nothing left past `offset`
+                    return
+                if response.status_code not in (200, 206):
+                    raise Exception(f"Download failed: {response.text}")
+                # A server that ignores Range resends the whole file; skip what we already have
+                skip = offset if response.status_code == 200 else 0
+                try:
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        if skip:
+                            if len(chunk) <= skip:
+                                skip -= len(chunk)
+                                continue
+                            chunk, skip = chunk[skip:], 0
+                        offset += len(chunk)
+                        yield chunk
+                    return
+                except (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError):
+                    resumes += 1
+                    if resumes > max_resumes:
+                        raise
+            finally:
+                response.close()
+
+    def download_bytes(self, root_hash, chunk_size=None):
+        """Download a file from 0G Storage into memory"""
+        return b"".join(self.iter_download(root_hash, chunk_size=chunk_size))
                 
-    def download_file(self, root_hash, output_path):
-        """Download a file from 0G Storage using the TypeScript service"""
-        response = requests.get(f"{self.base_url}/download/{root_hash}", stream=True)
-        if response.status_code == 200:
-            with open(output_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            return True
-        else:
-            raise Exception(f"Download failed: {response.text}")
+    def download_file(self, root_hash, output_path, chunk_size=None, resume=True):
+        """
+        Download a file from 0G Storage using the TypeScript service.
+
+        Data is written to `<output_path>.part` and renamed once complete; with
+        `resume` a leftover partial file from an interrupted run is continued
+        rather than downloaded again.
+        """
+        part_path = f"{output_path}.part"
+        offset = os.path.getsize(part_path) if resume and os.path.exists(part_path) else 0
+        with open(part_path, 'ab' if offset else 'wb') as f:
+            for chunk in self.iter_download(root_hash, offset=offset, chunk_size=chunk_size):
+                f.write(chunk)
+        os.replace(part_path, output_path)
+        return True
             
     def store_key_value(self, key, value):
         """Store a key-value pair using the TypeScript service"""
         data = {'key': key, 'value': value}
-        response = requests.post(f"{self.base_url}/kv", json=data)
+        response = self.transport.post(f"{self.base_url}/kv", json=data)
         if response.status_code == 200:
             return response.json()
         else:
@@ -39,8 +158,32 @@ class ZeroGStorageClient:
             
     def retrieve_key_value(self, key):
         """Retrieve a key-value pair using the TypeScript service"""
-        response = requests.get(f"{self.base_url}/kv/{key}")
+        response = self.transport.get(f"{self.base_url}/kv/{key}")
         if response.status_code == 200:
             return response.json()
         else:
             raise Exception(f"Key-value retrieval failed: {response.text}")
+
+    def store_many(self, items):
+        """Store many key-value pairs (a mapping or (key, value) pairs) in as few requests as possible"""
+        entries = [{'key': k, 'value': v} for k, v in (items.items() if isinstance(items, dict) else items)]
+        stored = 0
+        for start in range(0, len(entries), self.batch_size):
+            chunk = entries[start:start + self.batch_size]
+            response = self.transport.post(f"{self.base_url}/kv/batch", json={'entries': chunk})
+            if response.status_code != 200:
+                raise Exception(f"Batch key-value storage failed: {response.text}")
+            stored += response.json().get('stored', len(chunk))
+        return {'success': True, 'stored': stored}
+
+    def retrieve_many(self, keys):
+        """Retrieve many keys at once; returns {key: value}, with None for missing keys"""
+        keys = list(dict.fromkeys(keys))
+        values = {}
+        for start in range(0, len(keys), self.batch_size):
+            chunk = keys[start:start + self.batch_size]
+            response = self.transport.post(f"{self.base_url}/kv/batch/get", json={'keys': chunk})
+            if response.status_code != 200:
+                raise Exception(f"Batch key-value retrieval failed: {response.text}")
+            values.update(response.json()['values'])
+        return values
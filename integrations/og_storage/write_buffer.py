@@ -0,0 +1,123 @@
+# integrations/og_storage/write_buffer.py
+
+import threading
+from typing import Any, Dict
+
+
+class WriteBehindBuffer:
+    """
+    Write-behind buffer for key-value metadata.
+
+    `put` only records the latest value per key; a background thread flushes
+    the pending writes with one `store_many` call every `flush_interval`
+    seconds (or as soon as `max_pending` distinct keys are waiting), so
+    repeated writes to the same key within an interval cost one write. Reads
+    through `get` see pending values. Writes that fail are kept and retried on
+    the next flush unless the key was overwritten in the meantime.
+    """
+
+    def __init__(self, client, flush_interval=0.5, max_pending=1000):
+        self.client = client
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[str, Any] = {}
+        # Batch currently being written, still visible to readers
+        self._inflight: Dict[str, Any] = {}
+        self._wakeup = threading.Event()
+        self._closed = False
+        self.writes = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.flushed_keys = 0
+        self.failures = 0
+        self.last_error = None
+        self._thread = threading.Thread(target=self._run, name="og-storage-write-behind", daemon=True)
+        self._thread.start()
+
+    def put(self, key, value):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("WriteBehindBuffer is closed")
+            self.writes += 1
+            if key in self._pending:
+                self.coalesced += 1
+            self._pending[key] = value
+            if len(self._pending) >= self.max_pending:
+                self._wakeup.set()
+
+    def get(self, key, default=None):
+        """Pending value for `key`, or `default` if nothing is buffered"""
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key]
+            return self._inflight.get(key, default)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """Write all pending entries now; returns the number of keys written"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._inflight = batch
+            if not batch:
+                return 0
+            try:
+                self.client.store_many(batch)
+            except Exception as e:
+                with self._lock:
+                    self._inflight = {}
+                    self.failures += 1
+                    self.last_error = str(e)
+                    # Newer values written since the swap win over the failed ones
+                    for key, value in batch.items():
+                        self._pending.setdefault(key, value)
+                raise
+            with self._lock:
+                self._inflight = {}
+                self.flushes += 1
+                self.flushed_keys += len(batch)
+            return len(batch)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._closed:
+                return
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Write-behind flush failed, will retry: {e}")
+
+    def close(self):
+        """Stop the background thread and write whatever is still pending"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._wakeup.set()
+        self._thread.join()
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "writes": self.writes,
+                "coalesced": self.coalesced,
+                "flushes": self.flushes,
+                "flushed_keys": self.flushed_keys,
+                "failures": self.failures,
+                "last_error": self.last_error
+            }
@@ -0,0 +1,203 @@
+# metrics.py
+
+import contextlib
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Seconds; spans from sub-millisecond tallies up to slow LLM calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# (metric name, type, help, [(labels, value[, name suffix])])
+Family = Tuple[str, str, str, List[tuple]]
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, amount=1, *labelvalues):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues) -> float:
+        with self._lock:
+            return self._values.get(labelvalues, 0)
+
+    def collect(self) -> Family:
+        with self._lock:
+            samples = [(dict(zip(self.labelnames, k)), v) for k, v in self._values.items()]
+        return self.name, "counter", self.help, samples
+
+
+class Histogram:
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # labelvalues -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[tuple, list] = {}
+
+    def observe(self, value, *labelvalues):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, *labelvalues) -> int:
+        with self._lock:
+            series = self._series.get(labelvalues)
+            return sum(series[0]) if series else 0
+
+    def collect(self) -> Family:
+        samples = []
+        with self._lock:
+            series = [(k, list(counts), total) for k, (counts, total) in self._series.items()]
+        for labelvalues, counts, total in series:
+            labels = dict(zip(self.labelnames, labelvalues))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                samples.append(({**labels, "le": _format_value(bound)}, cumulative, "_bucket"))
+            samples.append((labels, total, "_sum"))
+            samples.append((labels, cumulative, "_count"))
+        return self.name, "histogram", self.help, samples
+
+
+class Registry:
+    """
+    Minimal Prometheus registry: counters, histograms and collector callbacks
+    rendered in the text exposition format.
+
+    Collectors are callables returning metric families built from the
+    `stats()` of existing components (caches, RPC client, ...), so those do not
+    need to know about metrics at all.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._metrics: Dict[str, object] = {}
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+        self._lock = threading.Lock()
+
+    def counter(self, name, help_text, labelnames=()) -> Counter:
+        return self._register(name, lambda: Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(name, lambda: Histogram(name, help_text, labelnames, buckets))
+
+    def _register(self, name, factory):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = factory()
+            return self._metrics[name]
+
+    def add_collector(self, collector: Callable[[], Iterable[Family]]):
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            families = [metric.collect() for metric in self._metrics.values()]
+            collectors = list(self._collectors)
+        for collector in collectors:
+            try:
+                families.extend(collector())
+            except Exception as e:
+                print(f"Metrics collector failed: {e}")
+
+        lines = []
+        for name, kind, help_text, samples in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample in samples:
+                labels, value = sample[0], sample[1]
+                suffix = sample[2] if len(sample) > 2 else ""
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry(enabled=os.getenv("METRICS_ENABLED", "true").lower() == "true")
+
+stage_seconds = registry.histogram(
+    "vote_stage_duration_seconds", "Time spent in each stage of proposal processing", ("stage",)
+)
+stage_errors = registry.counter(
+    "vote_stage_errors_total", "Stages of proposal processing that raised", ("stage",)
+)
+
+
+class _Span:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        stage_seconds.observe(time.perf_counter() - self.start, self.stage)
+        if exc_type is not None:
+            stage_errors.inc(1, self.stage)
+        return False
+
+
+_NOOP_SPAN = contextlib.nullcontext()
+
+
+def span(stage):
+    """Time a stage of proposal processing; a shared no-op when metrics are disabled"""
+    if not registry.enabled:
+        return _NOOP_SPAN
+    return _Span(stage)
+
+
+def stats_collector(prefix, get_stats: Callable[[], Optional[dict]], counters=(), help_text=""):
+    """
+    Collector exposing the numeric entries of a component's `stats()` dict as
+    `<prefix>_<key>` gauges, or counters (with a `_total` suffix) for keys in
+    `counters`. `get_stats` may return None when the component does not exist yet.
+    """
+    def collect():
+        stats = get_stats()
+        if not stats:
+            return []
+        families = []
+        for key, value in stats.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            if key in counters:
+                families.append((f"{prefix}_{key}_total", "counter", help_text or f"{prefix} {key}", [({}, value)]))
+            else:
+                families.append((f"{prefix}_{key}", "gauge", help_text or f"{prefix} {key}", [({}, value)]))
+        return families
+    return collect
@@ -0,0 +1,147 @@
+# results_cache.py
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class ResultsCache:
+    """
+    Bounded LRU cache for processed proposal results.
+
+    Results of open proposals expire after `ttl` seconds, results of finalized
+    proposals are pinned (no expiry) and only evicted once no unpinned entry is
+    left. Entries are dropped when the vote indexer reports a `VoteCast` or
+    `ProposalFinalized` event for their proposal. The cache can optionally be
+    persisted to a JSON file for warm restarts.
+    """
+
+    def __init__(self, max_entries=1024, ttl=30.0, persist_path: Optional[str] = None, clock=time.time):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.persist_path = persist_path
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (value, expires_at or None when pinned)
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self.get(key, count=False) is not None
+
+    def get(self, key, count=True):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                if count:
+                    self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if count:
+                self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, finalized=False):
+        """Cache results; finalized proposals are pinned instead of expiring"""
+        expires_at = None if finalized else self._clock() + self.ttl
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._evict_one()
+
+    def _evict_one(self):
+        # Least recently used unpinned entry first, pinned ones only as a last resort
+        for key, (_, expires_at) in self._entries.items():
+            if expires_at is not None:
+                del self._entries[key]
+                break
+        else:
+            self._entries.popitem(last=False)
+        self.evictions += 1
+
+    def invalidate(self, key) -> bool:
+        with self._lock:
+            if self._entries.pop(key, None) is None:
+                return False
+            self.invalidations += 1
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def on_chain_event(self, event, project_id):
+        """Vote indexer listener: any new vote or finalization makes cached results stale"""
+        if event in ("VoteCast", "ProposalFinalized"):
+            self.invalidate(project_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "pinned": sum(1 for _, expires_at in self._entries.values() if expires_at is None),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
+
+    def save(self):
+        """Write unexpired entries to `persist_path` (atomically)"""
+        if not self.persist_path:
+            return
+        now = self._clock()
+        with self._lock:
+            entries = [
+                {"key": key, "value": value, "expires_at": expires_at}
+                for key, (value, expires_at) in self._entries.items()
+                if expires_at is None or expires_at > now
+            ]
+        tmp_path = f"{self.persist_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"entries": entries}, f)
+        os.replace(tmp_path, self.persist_path)
+
+    def load(self) -> int:
+        """Restore entries saved by `save`; returns the number of entries loaded"""
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return 0
+        try:
+            with open(self.persist_path, "r") as f:
+                entries = json.load(f)["entries"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable results cache file {self.persist_path}: {e}")
+            return 0
+
+        now = self._clock()
+        loaded = 0
+        with self._lock:
+            for entry in entries:
+                if entry["expires_at"] is not None and entry["expires_at"] <= now:
+                    continue
+                self._entries[entry["key"]] = (entry["value"], entry["expires_at"])
+                loaded += 1
+            while len(self._entries) > self.max_entries:
+                self._evict_one()
+        return loaded
@@ -99,6 +99,47 @@ app.get('/kv/:key', async (req, res) => {
   }
 });
 
+// Batch key-value endpoints: one round trip for many keys
+const MAX_BATCH_SIZE = parseInt(process.env.KV_MAX_BATCH_SIZE || '1000', 10);
+
+app.post('/kv/batch', express.json({ limit: '10mb' }), async (req, res) => {
+  try {
+    const { entries } = req.body;
+    if (!Array.isArray(entries) || entries.some((e: any) => !e || !e.key || e.value === undefined)) {
+      res.status(400).json({ error: 'entries must be a list of {key, value}' });
+      return;
+    }
+    if (entries.length > MAX_BATCH_SIZE) {
+      res.status(413).json({ error: `At most ${MAX_BATCH_SIZE} entries per batch` });
+      return;
+    }
+
+    await storageService.storeKeyValues(entries);
+    res.json({ success: true, stored: entries.length });
+  } catch (error: any) {
+    res.status(500).json({ error: error.message });
+  }
+});
+
+app.post('/kv/batch/get', express.json({ limit: '1mb' }), async (req, res) => {
+  try {
+    const { keys } = req.body;
+    if (!Array.isArray(keys) || keys.some((k: any) => typeof k !== 'string' || !k)) {
+      res.status(400).json({ error: 'keys must be a list of strings' });
+      return;
+    }
+    if (keys.length > MAX_BATCH_SIZE) {
+      res.status(413).json({ error: `At most ${MAX_BATCH_SIZE} keys per batch` });
+      return;
+    }
+
+    const values = await storageService.retrieveKeyValues(keys);
+    res.json({ values });
+  } catch (error: any) {
+    res.status(500).json({ error: error.message });
+  }
+});
+
 app.listen(port, () => {
   console.log(`0G Storage service running at http://localhost:${port}`);
 });
@@ -150,4 +150,33 @@ export class StorageService {
     }
     return JSON.parse(fs.readFileSync(filePath, 'utf8'));
   }
+
+  // Store many key-value pairs in one call
+  async storeKeyValues(entries: {key: string, value: any}[]): Promise<void> {
+    const kvPath = path.join(__dirname, '../kv-store');
+    if (!fs.existsSync(kvPath)) {
+      fs.mkdirSync(kvPath, { recursive: true });
+    }
+    await Promise.all(entries.map(({ key, value }) =>
+      fs.promises.writeFile(path.join(kvPath, `${key}.json`), JSON.stringify(value))
+    ));
+  }
+
+  // Retrieve many key-value pairs in one call; missing keys map to null
+  async retrieveKeyValues(keys: string[]): Promise<Record<string, any>> {
+    const kvPath = path.join(__dirname, '../kv-store');
+    const values = await Promise.all(keys.map(async (key) => {
+      try {
+        return JSON.parse(await fs.promises.readFile(path.join(kvPath, `${key}.json`), 'utf8'));
+      } catch (error: any) {
+        if (error.code === 'ENOENT') {
+          return null;
+        }
+        throw error;
+      }
+    }));
+    const result: Record<string, any> = {};
+    keys.forEach((key, i) => { result[key] = values[i]; });
+    return result;
+  }
 }
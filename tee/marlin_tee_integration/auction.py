@@ -0,0 +1,140 @@
+# tee/marlin_tee_integration/auction.py
+
+import heapq
+import json
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Tuple
+
+FIRST_PRICE = "first_price"
+SECOND_PRICE = "second_price"
+
+DEFAULT_CHUNK_SIZE = 10000
+
+
+def unseal(sealed) -> int:
+    """
+    Amount of a sealed bid.
+
+    `SealedBidAuction.sealedBids` holds a bytes32 bound to the TEE; for the
+    demo the enclave unseals it by reading it as a big-endian uint256, the same
+    way encrypted votes decode to an option (see VoteBatch).
+    """
+    if isinstance(sealed, str):
+        sealed = bytes.fromhex(sealed[2:] if sealed.startswith("0x") else sealed)
+    return int.from_bytes(sealed, "big")
+
+
+def decode_bid(bid) -> Tuple[int, str]:
+    """
+    (amount, bidder) of a bid; raises if it cannot be decoded.
+
+    Accepts `{"bidder", "amount"}` dicts or their JSON strings, and
+    `(bidder, sealed bid)` pairs as yielded by SealedBidFetcher.
+    """
+    if isinstance(bid, tuple):
+        bidder, sealed = bid
+        return unseal(sealed), bidder
+    parsed = bid if isinstance(bid, dict) else json.loads(bid)
+    amount = parsed["amount"]
+    if isinstance(amount, str):
+        amount = int(amount, 0)
+    return int(amount), parsed["bidder"]
+
+
+class TopBids:
+    """
+    Streaming top-k of bids by amount, one entry per bidder.
+
+    A min-heap of size k keeps the best bids seen so far, so each bid costs a
+    comparison with the heap root and only contenders are pushed. Ties go to
+    the earlier bid. A bidder that shows up again only replaces their own entry
+    with a higher bid.
+    """
+
+    def __init__(self, k=2):
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        self.k = k
+        # (amount, -sequence, bidder); the root is the weakest kept bid
+        self._heap: List[Tuple[int, int, str]] = []
+
+    def add(self, amount, sequence, bidder):
+        heap = self._heap
+        entry = (amount, -sequence, bidder)
+        if len(heap) == self.k and entry[:2] <= heap[0][:2]:
+            return
+        for index, kept in enumerate(heap):
+            if kept[2] == bidder:
+                if entry[:2] > kept[:2]:
+                    heap[index] = entry
+                    heapq.heapify(heap)
+                return
+        if len(heap) < self.k:
+            heapq.heappush(heap, entry)
+        else:
+            heapq.heapreplace(heap, entry)
+
+    def top(self) -> List[Tuple[int, str]]:
+        """(amount, bidder) of the kept bids, best first"""
+        return [(amount, bidder) for amount, _, bidder in sorted(self._heap, reverse=True)]
+
+
+def iter_chunks(bids: Iterable[Any], chunk_size=DEFAULT_CHUNK_SIZE):
+    iterator = iter(bids)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def resolve_auction(bids: Iterable[Any], pricing=SECOND_PRICE, reserve_price=0,
+                    chunk_size=DEFAULT_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Winner, runner-up and clearing price of a sealed-bid auction.
+
+    `bids` may be any iterable (e.g. a generator over fetched chunks); it is
+    consumed `chunk_size` bids at a time, so memory stays bounded whatever the
+    number of bids. Bids below `reserve_price`, non-positive or undecodable are
+    ignored. Under SECOND_PRICE the winner pays the runner-up's bid (or the
+    reserve price without one), under FIRST_PRICE their own bid.
+    """
+    if pricing not in (FIRST_PRICE, SECOND_PRICE):
+        raise ValueError(f"Unknown pricing rule: {pricing}")
+
+    top = TopBids(k=2)
+    bid_count = 0
+    invalid = 0
+    for chunk in iter_chunks(bids, chunk_size):
+        for sequence, bid in enumerate(chunk, bid_count):
+            try:
+                amount, bidder = decode_bid(bid)
+            except Exception:
+                invalid += 1
+                continue
+            if amount <= 0 or amount < reserve_price:
+                invalid += 1
+                continue
+            top.add(amount, sequence, bidder)
+        bid_count += len(chunk)
+
+    ranked = top.top()
+    winner, highest = (ranked[0][1], ranked[0][0]) if ranked else (None, 0)
+    runner_up, runner_up_amount = (ranked[1][1], ranked[1][0]) if len(ranked) > 1 else (None, 0)
+    if winner is None:
+        price = 0
+    elif pricing == SECOND_PRICE:
+        price = max(runner_up_amount, reserve_price)
+    else:
+        price = highest
+
+    return {
+        "bid_count": bid_count,
+        "invalid_bids": invalid,
+        "pricing": pricing,
+        "winner": winner,
+        "highestBid": highest,
+        "runnerUp": runner_up,
+        "runnerUpBid": runner_up_amount,
+        "winningAmount": price
+    }
@@ -0,0 +1,264 @@
+# tee/marlin_tee_integration/homomorphic.py
+
+import json
+import math
+import os
+import secrets
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+try:
+    import gmpy2
+except ImportError:  # Pure Python big integers; gmpy2 only makes them faster
+    gmpy2 = None
+
+from tee.marlin_tee_integration.vote_batch import BASE_OPTIONS, COUNT_ORDER
+
+DEFAULT_KEY_BITS = 2048
+# Width of each option's counter in the packed plaintext; caps a tally at 2**32 - 1 votes per option
+SLOT_BITS = 32
+# Ciphertexts multiplied per task sent to a worker process
+DEFAULT_CHUNK_SIZE = 4096
+
+_SMALL_PRIMES = [p for p in range(3, 2000, 2) if all(p % d for d in range(3, int(p ** 0.5) + 1, 2))]
+
+
+def _mpz(value):
+    return gmpy2.mpz(value) if gmpy2 is not None else value
+
+
+def _powmod(base, exponent, modulus):
+    return gmpy2.powmod(base, exponent, modulus) if gmpy2 is not None else pow(base, exponent, modulus)
+
+
+def _is_probable_prime(candidate, rounds=40) -> bool:
+    if gmpy2 is not None:
+        return bool(gmpy2.is_prime(candidate, rounds))
+    for p in _SMALL_PRIMES:
+        if candidate % p == 0:
+            return candidate == p
+    d, s = candidate - 1, 0
+    while d % 2 == 0:
+        d, s = d // 2, s + 1
+    for _ in range(rounds):
+        x = pow(secrets.randbelow(candidate - 3) + 2, d, candidate)
+        if x in (1, candidate - 1):
+            continue
+        for _ in range(s - 1):
+            x = x * x % candidate
+            if x == candidate - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def random_prime(bits) -> int:
+    while True:
+        candidate = secrets.randbits(bits) | (1 << (bits - 1)) | (1 << (bits - 2)) | 1
+        if _is_probable_prime(candidate):
+            return candidate
+
+
+class PaillierPublicKey:
+    """Encryption half of a Paillier key pair, with g = n + 1"""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.n_sq = n * n
+
+    def encrypt(self, plaintext: int, r: Optional[int] = None) -> int:
+        if not 0 <= plaintext < self.n:
+            raise ValueError("Plaintext out of range")
+        if r is None:
+            r = secrets.randbelow(self.n - 1) + 1
+        # g**m = (1 + n)**m = 1 + m*n (mod n**2)
+        return (1 + plaintext * self.n) * _powmod(r, self.n, self.n_sq) % self.n_sq
+
+    def add(self, *ciphertexts: int) -> int:
+        """Ciphertext of the sum of the plaintexts"""
+        result = 1
+        for ciphertext in ciphertexts:
+            result = result * ciphertext % self.n_sq
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"n": hex(self.n), "g": hex(self.n + 1)}
+
+
+class PaillierPrivateKey:
+    def __init__(self, p: int, q: int):
+        self.p, self.q = p, q
+        self.public_key = PaillierPublicKey(p * q)
+        self.lam = math.lcm(p - 1, q - 1)
+        self.mu = pow(self.lam, -1, self.public_key.n)
+
+    @classmethod
+    def generate(cls, bits=DEFAULT_KEY_BITS) -> "PaillierPrivateKey":
+        while True:
+            p, q = random_prime(bits // 2), random_prime(bits // 2)
+            if p != q and math.gcd(p * q, (p - 1) * (q - 1)) == 1:
+                return cls(p, q)
+
+    def decrypt(self, ciphertext: int) -> int:
+        n = self.public_key.n
+        return (int(_powmod(ciphertext, self.lam, self.public_key.n_sq)) - 1) // n * self.mu % n
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"p": hex(self.p), "q": hex(self.q)}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "PaillierPrivateKey":
+        return cls(int(state["p"], 16), int(state["q"], 16))
+
+
+def _multiply_chunk(n_sq: int, ciphertexts: Sequence[int]) -> int:
+    """Product of a chunk of ciphertexts mod n**2 (runs in a worker process)"""
+    modulus = _mpz(n_sq)
+    result = _mpz(1)
+    for ciphertext in ciphertexts:
+        result = result * ciphertext % modulus
+    return int(result)
+
+
+def parse_ciphertext(ciphertext) -> int:
+    """Ciphertexts are accepted as ints, '0x' hex strings or big-endian bytes"""
+    if isinstance(ciphertext, int):
+        return ciphertext
+    if isinstance(ciphertext, str):
+        return int(ciphertext, 16)
+    return int.from_bytes(ciphertext, "big")
+
+
+class HomomorphicTally:
+    """
+    Additively homomorphic vote tally over Paillier ciphertexts.
+
+    A vote for option k encrypts 2**(SLOT_BITS * k), so every option has its
+    own counter in a single plaintext and one ciphertext carries one vote.
+    Multiplying ciphertexts adds their plaintexts: the tally is the product of
+    all ballots, fanned out over a process pool in chunks, followed by one
+    decryption of the aggregate. Individual ballots are never decrypted.
+
+    Ballot validity (exactly one vote for one option) is not proven here; a
+    production deployment would require a zero-knowledge proof per ballot.
+    """
+
+    def __init__(self, private_key: PaillierPrivateKey, extra_options: Sequence[Any] = (),
+                 workers: Optional[int] = None, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.option_names = list(BASE_OPTIONS) + list(extra_options)
+        if len(self.option_names) * SLOT_BITS >= private_key.public_key.n.bit_length():
+            raise ValueError("Too many options for the key size")
+        self.private_key = private_key
+        self.public_key = private_key.public_key
+        self._codes = {name: code for code, name in enumerate(self.option_names)}
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return {
+            "scheme": "Paillier",
+            "key_bits": self.public_key.n.bit_length(),
+            "slot_bits": SLOT_BITS,
+            "options": self.option_names,
+            "gmpy2": gmpy2 is not None
+        }
+
+    def encode(self, option) -> int:
+        return 1 << (SLOT_BITS * self._codes[option])
+
+    def encrypt_vote(self, option, r: Optional[int] = None) -> int:
+        return self.public_key.encrypt(self.encode(option), r)
+
+    def aggregate(self, ciphertexts: Iterable[Any], workers: Optional[int] = None) -> int:
+        """Product of all ciphertexts mod n**2, i.e. the encrypted packed counts"""
+        values = [parse_ciphertext(c) for c in ciphertexts]
+        n_sq = self.public_key.n_sq
+        for value in values:
+            if not 0 < value < n_sq:
+                raise ValueError("Ciphertext out of range")
+        workers = min(workers or self.workers, max(1, len(values) // self.chunk_size))
+        if workers <= 1:
+            return _multiply_chunk(n_sq, values)
+        # A few chunks per worker keeps them busy when chunks take uneven time
+        size = max(1, math.ceil(len(values) / (workers * 4)))
+        chunks = [values[i:i + size] for i in range(0, len(values), size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            partials = list(pool.map(_multiply_chunk, [n_sq] * len(chunks), chunks))
+        return _multiply_chunk(n_sq, partials)
+
+    def decrypt_counts(self, aggregate: int) -> Dict[Any, int]:
+        """Counts keyed by option name, reported in the same order as plaintext tallies"""
+        packed = self.private_key.decrypt(aggregate)
+        mask = (1 << SLOT_BITS) - 1
+        counts = [(packed >> (SLOT_BITS * code)) & mask for code in range(len(self.option_names))]
+        if packed >> (SLOT_BITS * len(self.option_names)):
+            raise ValueError("Aggregate does not decode to vote counts")
+        order = COUNT_ORDER + list(range(len(BASE_OPTIONS), len(self.option_names)))
+        return {self.option_names[code]: counts[code] for code in order}
+
+    def tally(self, ciphertexts: Iterable[Any], workers: Optional[int] = None) -> Dict[Any, int]:
+        return self.decrypt_counts(self.aggregate(ciphertexts, workers))
+
+
+def load_or_generate_key(path: Optional[str] = None, bits=DEFAULT_KEY_BITS) -> PaillierPrivateKey:
+    """
+    Private key stored at `path` (JSON), generated and saved there on first use.
+    Without a path the key only lives as long as the process.
+    """
+    if path and os.path.exists(path):
+        with open(path) as f:
+            return PaillierPrivateKey.from_dict(json.load(f))
+    private_key = PaillierPrivateKey.generate(bits)
+    if path:
+        with open(path, "w") as f:
+            json.dump(private_key.to_dict(), f)
+        os.chmod(path, 0o600)
+    return private_key
+
+
+_default_tally: Optional[HomomorphicTally] = None
+_default_lock = threading.Lock()
+
+
+def default_tally(require_persistent_key=False) -> HomomorphicTally:
+    """
+    Process-wide tally context. The key is read from (or saved to)
+    HOMOMORPHIC_KEY_PATH, with HOMOMORPHIC_KEY_BITS bits, and work is spread
+    over HOMOMORPHIC_WORKERS processes (default: all cores).
+
+    Without HOMOMORPHIC_KEY_PATH the key is thrown away with the process, so
+    votes encrypted under it could never be tallied after a restart; callers
+    about to hand out the public key pass `require_persistent_key`, which
+    raises RuntimeError in that case.
+    """
+    global _default_tally
+    key_path = os.getenv("HOMOMORPHIC_KEY_PATH")
+    if require_persistent_key and not key_path:
+        raise RuntimeError("HOMOMORPHIC_KEY_PATH is not set; refusing to publish a key that dies with the process")
+    with _default_lock:
+        if _default_tally is None:
+            private_key = load_or_generate_key(
+                key_path, int(os.getenv("HOMOMORPHIC_KEY_BITS", str(DEFAULT_KEY_BITS)))
+            )
+            workers = int(os.getenv("HOMOMORPHIC_WORKERS", "0")) or None
+            _default_tally = HomomorphicTally(private_key, workers=workers)
+        return _default_tally
+
+
+def encrypt_votes_fast(tally: HomomorphicTally, options: List[Any], pool_size=16) -> List[int]:
+    """
+    Encrypt many votes for tests and benchmarks. Ballots are drawn from a
+    precomputed table of ciphertexts per option (randomness r**n from products
+    of a small pool), so there are only a few hundred distinct ballots: fast,
+    but never to be used for real votes.
+    """
+    public_key = tally.public_key
+    n, n_sq = public_key.n, public_key.n_sq
+    pool = [_powmod(secrets.randbelow(n - 1) + 1, n, n_sq) for _ in range(pool_size)]
+    noises = [int(a * b % n_sq) for a in pool for b in pool]
+    table = {option: [(1 + tally.encode(option) * n) * noise % n_sq for noise in noises]
+             for option in set(options)}
+    return [table[option][(i * 7 + 3) % len(noises)] for i, option in enumerate(options)]
@@ -1,163 +1,257 @@
 # tee/marlin_tee_integration/marlin_tee.py
 
-from ai.nillion_integration.secret_llm import NillionSecretLLM
+from ai.nillion_integration.secret_llm import NillionSecretLLM, FakeSecretLLM
+from ai.nillion_integration.insight_jobs import InsightJobQueue, InsightJob
+import os
+import threading
 import time
 import json
 import hashlib
-from typing import List, Dict, Union, Any
+from typing import List, Dict, Union, Any, Optional
 # Correct the import path (0g not og)
 from integrations.og_storage.storage_utils import store_voting_results, store_auction_results
+from tee.marlin_tee_integration.vote_batch import VoteBatch, TallyAccumulator
+from tee.marlin_tee_integration.homomorphic import HomomorphicTally, default_tally
+from tee.marlin_tee_integration.auction import SECOND_PRICE, resolve_auction
+from tee.marlin_tee_integration.auction import DEFAULT_CHUNK_SIZE as DEFAULT_AUCTION_CHUNK_SIZE
+from metrics import span
 
-# Initialize Nillion SecretLLM client
-secret_llm = NillionSecretLLM()
+# Nillion SecretLLM client and the background AI insights queue. Both are created
+# on first use (or injected with `configure`) so importing this module is cheap.
+secret_llm = None
+insight_queue = None
+_components_lock = threading.RLock()
 
-def setup_seal_context():
+def get_secret_llm():
+    """SecretLLM backend; SECRET_LLM_BACKEND=fake selects a local stand-in"""
+    global secret_llm
+    with _components_lock:
+        if secret_llm is None:
+            secret_llm = FakeSecretLLM() if os.getenv('SECRET_LLM_BACKEND') == 'fake' else NillionSecretLLM()
+        return secret_llm
+
+def get_insight_queue() -> InsightJobQueue:
+    """AI insights are generated in the background so they never hold up a tally"""
+    global insight_queue
+    with _components_lock:
+        if insight_queue is None:
+            insight_queue = InsightJobQueue(get_secret_llm(), max_workers=int(os.getenv('INSIGHT_WORKERS', '2')))
+        return insight_queue
+
+def configure(llm=None, queue: Optional[InsightJobQueue] = None):
+    """Inject the SecretLLM backend and/or insights queue instead of the defaults"""
+    global secret_llm, insight_queue
+    with _components_lock:
+        if llm is not None:
+            secret_llm = llm
+        if queue is not None:
+            insight_queue = queue
+
+def shutdown(wait=False):
+    """Stop the insights queue; components are recreated on next use"""
+    global insight_queue
+    with _components_lock:
+        queue, insight_queue = insight_queue, None
+    if queue is not None:
+        queue.shutdown(wait=wait)
+
+def setup_seal_context(require_persistent_key=False) -> HomomorphicTally:
     """
-    Mock function to set up homomorphic encryption context
-    In a real implementation, this would initialize the SEAL library
+    Additively homomorphic (Paillier) context of the TEE, used by
+    `tally_encrypted_votes`. Its key pair is created on first use (see
+    homomorphic.default_tally); voters encrypt with `public_key`, which must
+    only be published with `require_persistent_key`.
     """
-    # For demo purposes, just return a dictionary with mock parameters
-    return {
-        "scheme": "BFV",
-        "poly_modulus_degree": 4096,
-        "bit_sizes": [36, 36, 37],
-        "plain_modulus": 65537
-    }
+    return default_tally(require_persistent_key)
 
-def generate_attestation_proof(results: Dict, proposal_id) -> str:
-    """Generate cryptographic proof that computations were done in TEE"""
+def generate_attestation_proof(results: Dict, proposal_id, votes_root: Optional[str] = None) -> str:
+    """
+    Generate cryptographic proof that computations were done in TEE.
+    `votes_root` (the Merkle root of the tallied votes) binds the counts to the
+    exact vote set; it is the `resultHash` submitted to
+    ResultVerification.verifyTeeResult along with this proof. The proof is
+    the full 32-byte SHA-256 digest ("0x" + 64 hex characters).
+    """
     # In production: Create actual TEE attestation
     # For demo: Create a deterministic hash based on results and proposal ID
     result_str = f"{proposal_id}:{results['inFavor']}:{results['against']}:{results['abstain']}"
-    return f"0x{hashlib.sha256(result_str.encode()).hexdigest()[:16]}"
+    if votes_root is not None:
+        result_str += f":{votes_root}"
+    return f"0x{hashlib.sha256(result_str.encode()).hexdigest()}"
+
+def _snapshot_from_stored(proposal_id, stored) -> Optional[TallyAccumulator]:
+    if not stored or "accumulator" not in stored:
+        return None
+    try:
+        return TallyAccumulator.from_dict(stored["accumulator"])
+    except (KeyError, TypeError, ValueError) as e:
+        print(f"Ignoring invalid tally snapshot for proposal {proposal_id}: {e}")
+        return None
+
+def load_tally_snapshot(proposal_id, storage_manager=None) -> Optional[TallyAccumulator]:
+    """Restore the tally accumulator stored with the last results of a proposal, if any"""
+    if storage_manager is None:
+        from integrations.og_storage.storage_manager import StorageManager
+        storage_manager = StorageManager()
+    try:
+        stored = storage_manager.retrieve_metadata(f"vote_results_{proposal_id}")
+    except Exception as e:
+        print(f"No tally snapshot for proposal {proposal_id}: {e}")
+        return None
+    return _snapshot_from_stored(proposal_id, stored)
 
-def process_votes_in_tee(encrypted_votes: List[Union[str, Dict, bytes]], proposal_id) -> Dict[str, Any]:
+def load_tally_snapshots(proposal_ids, storage_manager=None) -> Dict[Any, Optional[TallyAccumulator]]:
+    """`load_tally_snapshot` for many proposals, read with batched storage requests"""
+    if storage_manager is None:
+        from integrations.og_storage.storage_manager import StorageManager
+        storage_manager = StorageManager()
+    proposal_ids = list(proposal_ids)
+    try:
+        stored = storage_manager.retrieve_many([f"vote_results_{pid}" for pid in proposal_ids])
+    except Exception as e:
+        print(f"No tally snapshots for {len(proposal_ids)} proposals: {e}")
+        return {pid: None for pid in proposal_ids}
+    return {pid: _snapshot_from_stored(pid, stored.get(f"vote_results_{pid}")) for pid in proposal_ids}
+
+def process_votes_in_tee(encrypted_votes: Union[List[Union[str, Dict, bytes]], VoteBatch], proposal_id,
+                         accumulator: Optional[TallyAccumulator] = None,
+                         wait_for_insights: Union[bool, float] = False,
+                         storage_manager=None, attest=True) -> Dict[str, Any]:
     """
     Process votes inside TEE environment.
-    Handles both JSON-formatted votes and hex-encoded bytes32 votes.
-    """
-    # Set up encryption context for homomorphic votes
-    encryption_context = setup_seal_context()
-    
-    # Detect vote format and process accordingly
-    vote_counts = {'inFavor': 0, 'against': 0, 'abstain': 0}
-    parsed_votes = []
-    timeline_data = {}
+    Handles both JSON-formatted votes and hex-encoded bytes32 votes, or a prebuilt VoteBatch.
+    When resuming from an `accumulator` snapshot, `encrypted_votes` are only the
+    votes past its checkpoint (`accumulator.total`).
     
-    for vote in encrypted_votes:
-        # Handle bytes32 votes from blockchain
-        if isinstance(vote, (bytes, bytearray)) or (isinstance(vote, str) and vote.startswith('0x')):
-            try:
-                # For hackathon demo - extract vote from first bytes of the hash
-                # In a real implementation, this would use proper homomorphic decryption
-                
-                # If it's a hex string, convert first 2 bytes to an integer
-                if isinstance(vote, str):
-                    if vote.startswith('0x'):
-                        vote_hex = vote[2:6]  # Take first 2 bytes after 0x
-                    else:
-                        vote_hex = vote[0:4]  # Take first 2 bytes
-                    
-                    vote_value = int(vote_hex, 16) % 3  # Get value modulo 3
-                else:
-                    # If it's bytes, take first byte
-                    vote_value = vote[0] % 3
-                
-                # Map to vote options (0=against, 1=inFavor, 2=abstain)
-                vote_mapping = {0: 'against', 1: 'inFavor', 2: 'abstain'}
-                vote_option = vote_mapping[vote_value]
-                
-                vote_counts[vote_option] += 1
-                
-                # Create a timestamp for this vote for timeline
-                timestamp = int(time.time() * 1000)
-                hour = timestamp // 3600000 * 3600000
-                if hour not in timeline_data:
-                    timeline_data[hour] = 0
-                timeline_data[hour] += 1
-                
-                # Create a parsed vote object for consistency
-                parsed_votes.append({
-                    'option': vote_option,
-                    'timestamp': timestamp
-                })
-                
-            except Exception as e:
-                print(f"Error processing encrypted vote: {e}")
-                # Default for demo - distribute votes evenly
-                vote_counts['inFavor'] += 1
-        else:
-            # Handle existing JSON vote format
-            try:
-                parsed_vote = vote if isinstance(vote, dict) else json.loads(vote)
-                parsed_votes.append(parsed_vote)
-                option = parsed_vote.get('option', 'inFavor')
-                vote_counts[option] = vote_counts.get(option, 0) + 1
-                
-                # Update timeline data
-                timestamp = parsed_vote.get('timestamp', int(time.time() * 1000))
-                hour = timestamp // 3600000 * 3600000
-                if hour not in timeline_data:
-                    timeline_data[hour] = 0
-                timeline_data[hour] += 1
-            except Exception as e:
-                print(f"Error parsing vote: {e}")
+    The tally and attestation are returned right away; AI insights are produced by
+    a background job whose id is returned as `insights_job`. Pass `wait_for_insights`
+    (True or a timeout in seconds) to block until they are available.
+
+    With `attest` (the default) the votes are committed to a Merkle root
+    (`votesRoot`), which the TEE proof binds to the counts; that hashes every
+    new vote. Without it only the counts are attested, `votesRoot` is None and
+    the stored snapshot carries no commitment.
+    """
+    # Pack votes into columnar form and fold them into the running tally
+    with span("decode"):
+        batch = encrypted_votes if isinstance(encrypted_votes, VoteBatch) else VoteBatch.from_votes(encrypted_votes)
+    with span("tally"):
+        accumulator = accumulator.copy() if accumulator else TallyAccumulator()
+        accumulator.add(batch)
+        vote_counts = accumulator.counts_dict()
+        timeline_data = accumulator.timeline_dict()
     
     # Generate TEE attestation proof
-    tee_proof = generate_attestation_proof(vote_counts, proposal_id)
+    with span("attestation"):
+        votes_root = accumulator.merkle.root() if attest else None
+        tee_proof = generate_attestation_proof(vote_counts, proposal_id, votes_root)
     
     # Prepare vote results
     vote_results = {
         "proposalId": proposal_id,
         "counts": vote_counts,
-        "total": len(encrypted_votes),
+        "total": accumulator.total,
+        "votesRoot": votes_root,
         "tee_proof": tee_proof
     }
     
-    # Get AI insights
-    insights = secret_llm.analyze_voting_patterns({
-        "proposal_id": proposal_id,
-        "total_votes": len(encrypted_votes),
-        "vote_distribution": vote_counts,
-        "voting_timeline": timeline_data
-    })
-    
     # Store metadata using key-value storage
-    from integrations.og_storage.storage_manager import StorageManager
-    storage_manager = StorageManager()
+    if storage_manager is None:
+        from integrations.og_storage.storage_manager import StorageManager
+        storage_manager = StorageManager()
     
     # Store vote results as metadata
     metadata_key = f"vote_results_{proposal_id}"
-    storage_manager.store_metadata(metadata_key, {
+    metadata = {
         "results": vote_results,
         "timestamp": int(time.time() * 1000),
-        "ai_insights": insights,
-        "tee_proof": tee_proof
-    })
+        "ai_insights": None,
+        "tee_proof": tee_proof,
+        "accumulator": accumulator.to_dict(commit=attest)
+    }
+    with span("storage_write"):
+        storage_manager.store_metadata(metadata_key, metadata)
+    
+    def store_insights(job: InsightJob):
+        # Add the insights to the stored results once they are ready, unless a
+        # newer tally has replaced them meanwhile (its own job brings fresher ones)
+        try:
+            stored = storage_manager.retrieve_metadata(metadata_key)
+        except Exception as e:
+            print(f"Could not re-read results of proposal {proposal_id} to add insights: {e}")
+            return
+        if not isinstance(stored, dict) or (stored.get("results") or {}).get("total") != accumulator.total:
+            print(f"Dropping stale insights for proposal {proposal_id} (tally of {accumulator.total} votes)")
+            return
+        storage_manager.store_metadata(metadata_key, dict(stored, ai_insights=job.result))
+    
+    # Queue AI insights (deduplicated per proposal snapshot)
+    with span("insights_submit"):
+        job = get_insight_queue().submit(proposal_id, {
+            "proposal_id": proposal_id,
+            "total_votes": accumulator.total,
+            "vote_distribution": vote_counts,
+            "voting_timeline": timeline_data
+        }, on_done=store_insights)
+    
+    if wait_for_insights is not False:
+        job.wait(None if wait_for_insights is True else wait_for_insights)
     
     return {
         "results": vote_results,
-        "ai_insights": insights,
+        "ai_insights": job.result,
+        "insights_job": job.job_id,
+        "insights_status": job.status,
         "storage_key": metadata_key,
+        "tee_proof": tee_proof,
+        "timelines": accumulator.timelines_dict()
+    }
+
+def tally_encrypted_votes(ciphertexts, proposal_id, context: Optional[HomomorphicTally] = None,
+                          workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Tally votes encrypted under the TEE's Paillier key without decrypting any
+    ballot: the ciphertexts are multiplied together, fanned out over `workers`
+    processes, and only the aggregate is decrypted.
+    """
+    context = context or setup_seal_context()
+    with span("homomorphic_aggregate"):
+        aggregate = context.aggregate(ciphertexts, workers)
+    with span("homomorphic_decrypt"):
+        vote_counts = context.decrypt_counts(aggregate)
+    with span("attestation"):
+        tee_proof = generate_attestation_proof(vote_counts, proposal_id)
+    return {
+        "proposalId": proposal_id,
+        "counts": vote_counts,
+        "total": sum(vote_counts.values()),
+        "encrypted_total": hex(aggregate),
         "tee_proof": tee_proof
     }
 
-def process_auction_bids(encrypted_bids, project_id):
-    """Process encrypted auction bids in the TEE"""
-    # Similar structure to process_votes_in_tee but for bid processing
-    # For hackathon demo, we'll just return a mock result
-    
-    bid_count = len(encrypted_bids)
-    winning_bid = 100 * (bid_count + 1)  # Mock calculation
+def process_auction_bids(encrypted_bids, project_id, pricing=SECOND_PRICE, reserve_price=0,
+                         chunk_size=DEFAULT_AUCTION_CHUNK_SIZE):
+    """
+    Resolve a sealed-bid auction in the TEE.
+
+    `encrypted_bids` is any iterable of bids (`{"bidder", "amount"}` dicts, JSON
+    strings or `(bidder, sealed bid)` pairs from SealedBidFetcher.iter_bids) and
+    is consumed in chunks, so it can be a generator over millions of bids.
+    The result can be passed to `store_auction_results` as is.
+    """
+    with span("auction_resolve"):
+        result = resolve_auction(encrypted_bids, pricing=pricing, reserve_price=reserve_price,
+                                 chunk_size=chunk_size)
+    winner, winning_bid = result["winner"], result["winningAmount"]
     
-    # Generate attestation proof
-    tee_proof = f"0x{hashlib.sha256(f'auction:{project_id}:{winning_bid}'.encode()).hexdigest()[:16]}"
+    # Generate attestation proof over the outcome
+    tee_proof = f"0x{hashlib.sha256(f'auction:{project_id}:{winner}:{winning_bid}'.encode()).hexdigest()[:16]}"
     
-    result = {
+    result.update({
         "project_id": project_id,
-        "bid_count": bid_count,
         "winning_bid": winning_bid,
+        "timestamp": int(time.time() * 1000),
         "tee_proof": tee_proof
-    }
+    })
     
     return result
@@ -0,0 +1,320 @@
+# tee/marlin_tee_integration/merkle.py
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+# Domain separation between leaves and inner nodes, so a node can never pass for a leaf
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+MAX_DEPTH = 64
+DEFAULT_MAX_TREES = 64
+
+
+def hash_leaf(data: bytes) -> bytes:
+    return hashlib.sha256(LEAF_PREFIX + data).digest()
+
+
+def hash_node(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+# ZERO_HASHES[h]: root of an empty subtree of height h, used to pad the right edge of the tree
+ZERO_HASHES = [bytes(32)]
+for _ in range(MAX_DEPTH):
+    ZERO_HASHES.append(hash_node(ZERO_HASHES[-1], ZERO_HASHES[-1]))
+
+
+def tree_depth(size) -> int:
+    """Height of the smallest power-of-two tree holding `size` leaves"""
+    return (size - 1).bit_length() if size > 1 else 0
+
+
+def mix_in_size(node: bytes, size) -> bytes:
+    """Final root: the tree root bound to the number of leaves, so padding cannot be passed off as votes"""
+    return hashlib.sha256(node + int(size).to_bytes(32, "big")).digest()
+
+
+def to_hex(value: bytes) -> str:
+    return "0x" + value.hex()
+
+
+def from_hex(value: str) -> bytes:
+    return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+
+
+class MerkleAccumulator:
+    """
+    Append-only Merkle root over a growing list of leaves.
+
+    Only the frontier is kept: `branch[h]` is the last complete subtree of
+    2**h leaves, as in the Ethereum deposit contract. An append costs one hash
+    amortized and O(log n) at worst, the root O(log n), and the state is a
+    handful of hashes that can be stored with a tally snapshot to extend the
+    commitment later without the earlier votes.
+
+    The root commits to the leaves in order and to their number (`mix_in_size`);
+    inclusion proofs against it are served by a MerkleTree over the same leaves.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self.branch: List[bytes] = []
+
+    def _push(self, node: bytes, height: int):
+        """Append a complete subtree of 2**height leaves; `size` must be a multiple of 2**height"""
+        count = 1 << height
+        position = self.size >> height
+        while position & 1:
+            node = hash_node(self.branch[height], node)
+            position >>= 1
+            height += 1
+        if height >= len(self.branch):
+            self.branch.extend(ZERO_HASHES[len(self.branch):height + 1])
+        self.branch[height] = node
+        self.size += count
+
+    def append(self, leaf: bytes) -> "MerkleAccumulator":
+        self._push(leaf, 0)
+        return self
+
+    def extend(self, leaves: Iterable[bytes]) -> "MerkleAccumulator":
+        """
+        Append many leaves, hashing them level by level: the complete pairs of
+        each level are folded in one pass and only the ragged edges go through
+        `_push`, so n leaves cost about n hashes.
+        """
+        nodes = list(leaves)
+        height = 0
+        tails = []
+        while nodes:
+            if self.size >> height & 1:
+                # Completes the pending subtree on the left
+                self._push(nodes[0], height)
+                nodes = nodes[1:]
+            if len(nodes) & 1:
+                tails.append((height, nodes.pop()))
+            nodes = [hash_node(left, right) for left, right in zip(nodes[::2], nodes[1::2])]
+            height += 1
+        # Unpaired nodes go after everything to their left, highest first
+        for height, node in reversed(tails):
+            self._push(node, height)
+        return self
+
+    def merge(self, other: "MerkleAccumulator") -> "MerkleAccumulator":
+        """
+        Append the leaves summarized by `other`. Only its complete subtrees are
+        known, so this requires the boundary to be aligned: the current size must
+        be a multiple of the largest power of two not above `other.size`.
+        """
+        if not other.size:
+            return self
+        top = other.size.bit_length() - 1
+        if self.size % (1 << top):
+            raise ValueError(f"Cannot merge {other.size} leaves after {self.size}: shard boundary is not aligned")
+        for height in range(top, -1, -1):
+            if other.size >> height & 1:
+                self._push(other.branch[height], height)
+        return self
+
+    def tree_root(self) -> bytes:
+        if not self.size:
+            return ZERO_HASHES[0]
+        depth = tree_depth(self.size)
+        if self.size == 1 << depth:
+            return self.branch[depth]
+        node = ZERO_HASHES[0]
+        size = self.size
+        for height in range(depth):
+            if size & 1:
+                node = hash_node(self.branch[height], node)
+            else:
+                node = hash_node(node, ZERO_HASHES[height])
+            size >>= 1
+        return node
+
+    def root(self) -> str:
+        """bytes32 root (hex) committing to every appended leaf"""
+        return to_hex(mix_in_size(self.tree_root(), self.size))
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Only the subtrees selected by the bits of `size` are live; the other slots are left over
+        branch = [self.branch[h].hex() if self.size >> h & 1 else None for h in range(self.size.bit_length())]
+        return {"size": self.size, "branch": branch}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "MerkleAccumulator":
+        accumulator = cls()
+        accumulator.size = int(state["size"])
+        accumulator.branch = [bytes.fromhex(value) if value else ZERO_HASHES[0] for value in state["branch"]]
+        if len(accumulator.branch) != accumulator.size.bit_length():
+            raise ValueError("Merkle frontier does not match its size")
+        return accumulator
+
+
+class MerkleTree:
+    """
+    Every level of the Merkle tree over a list of leaves, for inclusion proofs.
+
+    Same tree and root as MerkleAccumulator. `extend` only rehashes the right
+    edge touched by the new leaves, so keeping a tree up to date costs O(new
+    leaves + log n), and a proof is O(log n). Proofs can also be produced
+    against an earlier size of the tree, i.e. against a root attested before
+    the latest votes came in.
+    """
+
+    def __init__(self, leaves: Iterable[bytes] = ()):
+        self.levels: List[List[bytes]] = [[]]
+        self._lock = threading.Lock()
+        self.extend(list(leaves))
+
+    @property
+    def size(self) -> int:
+        return len(self.levels[0])
+
+    def extend(self, leaves: List[bytes], start: Optional[int] = None) -> int:
+        """
+        Append `leaves`; when they are the leaves from index `start` onwards,
+        those already in the tree are skipped. Returns the new size.
+        """
+        with self._lock:
+            if start is not None:
+                if start > self.size:
+                    raise ValueError(f"Leaves start at {start} but the tree only holds {self.size}")
+                leaves = leaves[self.size - start:]
+            if not leaves:
+                return self.size
+            first = self.size
+            self.levels[0].extend(leaves)
+            height = 0
+            while len(self.levels[height]) > 1:
+                level = self.levels[height]
+                if height + 1 == len(self.levels):
+                    self.levels.append([])
+                parents = self.levels[height + 1]
+                first >>= 1
+                # Parents from `first` on are new or covered a partial right edge
+                del parents[first:]
+                zero = ZERO_HASHES[height]
+                for index in range(2 * first, len(level), 2):
+                    right = level[index + 1] if index + 1 < len(level) else zero
+                    parents.append(hash_node(level[index], right))
+                height += 1
+            return self.size
+
+    def _node(self, height, index, size) -> bytes:
+        """Node of the tree as it was with `size` leaves"""
+        if index << height >= size:
+            return ZERO_HASHES[height]
+        if (index + 1) << height <= size:
+            # Complete subtrees never change once all their leaves are in
+            return self.levels[height][index]
+        return hash_node(self._node(height - 1, 2 * index, size), self._node(height - 1, 2 * index + 1, size))
+
+    def _check_size(self, size) -> int:
+        if size is None:
+            return self.size
+        if not 0 <= size <= self.size:
+            raise ValueError(f"Tree holds {self.size} leaves, not {size}")
+        return size
+
+    def root(self, size: Optional[int] = None) -> str:
+        """bytes32 root (hex) of the first `size` leaves (default: all)"""
+        with self._lock:
+            size = self._check_size(size)
+            return to_hex(mix_in_size(self._node(tree_depth(size), 0, size) if size else ZERO_HASHES[0], size))
+
+    def proof(self, index, size: Optional[int] = None) -> Dict[str, Any]:
+        """Inclusion proof of leaf `index` in the tree of the first `size` leaves (default: all)"""
+        with self._lock:
+            size = self._check_size(size)
+            if not 0 <= index < size:
+                raise IndexError(f"Leaf {index} is out of range for a tree of {size} leaves")
+            depth = tree_depth(size)
+            siblings = [self._node(height, (index >> height) ^ 1, size) for height in range(depth)]
+            root = mix_in_size(self._node(depth, 0, size), size)
+            return {
+                "index": index,
+                "size": size,
+                "leaf": to_hex(self.levels[0][index]),
+                "siblings": [to_hex(sibling) for sibling in siblings],
+                "root": to_hex(root)
+            }
+
+    def proofs(self, indices: Iterable[int], size: Optional[int] = None) -> List[Dict[str, Any]]:
+        return [self.proof(index, size) for index in indices]
+
+
+def verify_proofs(proofs: List[Dict[str, Any]]) -> List[bool]:
+    """
+    Check many inclusion proofs (as returned by MerkleTree.proof) at once.
+
+    Nodes reached by a valid proof are remembered per root, so proofs sharing a
+    path stop hashing as soon as they reach a node already known to lead to
+    that root: verifying k proofs from the same tree costs about
+    k + k * log(n / k) hashes instead of k * log n.
+    """
+    known: Dict[tuple, bytes] = {}
+    results = []
+    for proof in proofs:
+        try:
+            index, size, root = int(proof["index"]), int(proof["size"]), from_hex(proof["root"])
+            node = from_hex(proof["leaf"])
+            siblings = [from_hex(sibling) for sibling in proof["siblings"]]
+        except (KeyError, TypeError, ValueError):
+            results.append(False)
+            continue
+        if not 0 <= index < size or len(siblings) != tree_depth(size):
+            results.append(False)
+            continue
+
+        path = []
+        valid = None
+        for height, sibling in enumerate(siblings):
+            key = (root, size, height, index >> height)
+            shared = known.get(key)
+            if shared is not None:
+                valid = shared == node
+                break
+            path.append((key, node))
+            node = hash_node(sibling, node) if index >> height & 1 else hash_node(node, sibling)
+        if valid is None:
+            valid = mix_in_size(node, size) == root
+        if valid:
+            known.update(path)
+        results.append(valid)
+    return results
+
+
+def verify_proof(proof: Dict[str, Any], root: Optional[str] = None) -> bool:
+    """Check an inclusion proof, optionally against an expected root"""
+    if root is not None and proof.get("root", "").lower() != root.lower():
+        return False
+    return verify_proofs([proof])[0]
+
+
+class MerkleTreeCache:
+    """Least recently used MerkleTrees, one per proposal"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_TREES):
+        self.max_entries = max_entries
+        self._trees: "OrderedDict[Any, MerkleTree]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> MerkleTree:
+        """Tree of `key`, created empty on first use"""
+        with self._lock:
+            tree = self._trees.get(key)
+            if tree is None:
+                tree = self._trees[key] = MerkleTree()
+                while len(self._trees) > self.max_entries:
+                    self._trees.popitem(last=False)
+            else:
+                self._trees.move_to_end(key)
+            return tree
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"trees": len(self._trees), "leaves": sum(tree.size for tree in self._trees.values())}
@@ -0,0 +1,465 @@
+# tee/marlin_tee_integration/vote_batch.py
+
+import hashlib
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from tee.marlin_tee_integration.merkle import MerkleAccumulator, hash_leaf
+
+MINUTE_MS = 60000
+HOUR_MS = 3600000
+DAY_MS = 24 * HOUR_MS
+# Bucket sizes of the multi-resolution timeline
+RESOLUTIONS = {"minute": MINUTE_MS, "hour": HOUR_MS, "day": DAY_MS}
+
+# Option codes; encrypted votes decode to `value % 3` which maps 1:1 onto the first three
+AGAINST, IN_FAVOR, ABSTAIN = 0, 1, 2
+BASE_OPTIONS = ['against', 'inFavor', 'abstain']
+# Order in which the counts are reported
+COUNT_ORDER = [IN_FAVOR, AGAINST, ABSTAIN]
+
+# Row kinds
+KIND_BYTES = 0      # raw bytes32, vote = byte[0] % 3
+KIND_HEX = 1        # '0x..' string, vote = int(first 2 bytes) % 3
+KIND_OPTION = 2     # already decoded option code (JSON votes)
+KIND_SKIP = 3       # unparseable vote, not counted
+
+# ASCII -> nibble lookup table, 255 marks non-hex characters
+_HEX_LUT = np.full(256, 255, dtype=np.uint8)
+for _i, _c in enumerate(b"0123456789abcdef"):
+    _HEX_LUT[_c] = _i
+for _i, _c in enumerate(b"ABCDEF"):
+    _HEX_LUT[_c] = 10 + _i
+
+
+class VoteBatch:
+    """
+    Columnar representation of a list of votes.
+
+    Encrypted votes are packed into one contiguous (n, 32) uint8 buffer, while
+    option codes, timestamps and row kinds are kept as typed arrays so that
+    decoding, tallying and timeline bucketing run as vectorized kernels.
+    """
+
+    def __init__(self, payload: np.ndarray, kind: np.ndarray, options: np.ndarray,
+                 timestamps: np.ndarray, in_timeline: np.ndarray,
+                 option_names: Optional[List[Any]] = None,
+                 odd_hours: Optional[List[Tuple[int, Any]]] = None):
+        self.payload = payload
+        self.kind = kind
+        self.options = options
+        self.timestamps = timestamps
+        self.in_timeline = in_timeline
+        self.option_names = option_names if option_names is not None else list(BASE_OPTIONS)
+        # (row, hour key) for timestamps that do not fit in int64, bucketed in Python
+        self.odd_hours = odd_hours or []
+
+    def __len__(self):
+        return len(self.kind)
+
+    @staticmethod
+    def _timestamps(n, now_ms, timestamps) -> np.ndarray:
+        if timestamps is None:
+            return np.full(n, now_ms, dtype=np.int64)
+        timestamps = np.array(timestamps, dtype=np.int64)
+        if len(timestamps) != n:
+            raise ValueError(f"Got {len(timestamps)} timestamps for {n} votes")
+        return timestamps
+
+    @classmethod
+    def from_bytes32(cls, buffer, now_ms: Optional[int] = None, timestamps=None) -> "VoteBatch":
+        """
+        Build a batch from an already packed buffer of bytes32 votes.
+        `timestamps` (ms, e.g. of the blocks the votes were cast in) default to `now_ms`.
+        """
+        if now_ms is None:
+            now_ms = int(time.time() * 1000)
+        payload = np.frombuffer(buffer, dtype=np.uint8).reshape(-1, 32)
+        n = len(payload)
+        return cls(
+            payload,
+            np.full(n, KIND_BYTES, dtype=np.int8),
+            np.zeros(n, dtype=np.int32),
+            cls._timestamps(n, now_ms, timestamps),
+            np.ones(n, dtype=bool)
+        )
+
+    @classmethod
+    def from_votes(cls, votes: List[Any], now_ms: Optional[int] = None, timestamps=None) -> "VoteBatch":
+        """
+        Build a batch from a mixed list of bytes32 votes, '0x' hex strings and
+        JSON votes (dicts or JSON strings). `timestamps` (ms) apply to the
+        encrypted votes; JSON votes carry their own.
+        """
+        if now_ms is None:
+            now_ms = int(time.time() * 1000)
+
+        # Fast path: homogeneous bytes32 input, as returned by the chain fetchers
+        if votes and all(isinstance(v, bytes) for v in votes) and set(map(len, votes)) == {32}:
+            return cls.from_bytes32(b"".join(votes), now_ms, timestamps)
+
+        n = len(votes)
+        payload = np.zeros((n, 32), dtype=np.uint8)
+        kind = np.full(n, KIND_SKIP, dtype=np.int8)
+        options = np.zeros(n, dtype=np.int32)
+        timestamps = cls._timestamps(n, now_ms, timestamps)
+        in_timeline = np.zeros(n, dtype=bool)
+        option_names = list(BASE_OPTIONS)
+        option_codes = {name: code for code, name in enumerate(BASE_OPTIONS)}
+        odd_hours = []
+
+        byte_rows, byte_values = [], []
+        hex_rows, hex_prefixes = [], []
+
+        for row, vote in enumerate(votes):
+            if isinstance(vote, (bytes, bytearray)):
+                if len(vote) == 0:
+                    print("Error processing encrypted vote: index out of range")
+                    kind[row], options[row] = KIND_OPTION, IN_FAVOR
+                    continue
+                byte_rows.append(row)
+                byte_values.append(bytes(vote[:32]).ljust(32, b"\0"))
+            elif isinstance(vote, str) and vote.startswith('0x'):
+                prefix = vote[2:6]
+                if len(prefix) == 4:
+                    hex_rows.append(row)
+                    hex_prefixes.append(prefix)
+                else:
+                    cls._decode_hex_scalar(row, prefix, kind, options, in_timeline)
+            else:
+                try:
+                    parsed_vote = vote if isinstance(vote, dict) else json.loads(vote)
+                    option = parsed_vote.get('option', 'inFavor')
+                    code = option_codes.get(option)
+                    if code is None:
+                        code = option_codes[option] = len(option_names)
+                        option_names.append(option)
+                    kind[row], options[row] = KIND_OPTION, code
+
+                    timestamp = parsed_vote.get('timestamp', now_ms)
+                    if type(timestamp) is int and -2**63 <= timestamp < 2**63:
+                        timestamps[row] = timestamp
+                        in_timeline[row] = True
+                    else:
+                        odd_hours.append((row, timestamp // HOUR_MS * HOUR_MS))
+                except Exception as e:
+                    print(f"Error parsing vote: {e}")
+
+        if byte_rows:
+            rows = np.asarray(byte_rows)
+            payload[rows] = np.frombuffer(b"".join(byte_values), dtype=np.uint8).reshape(-1, 32)
+            kind[rows] = KIND_BYTES
+            in_timeline[rows] = True
+
+        if hex_rows:
+            rows = np.asarray(hex_rows)
+            try:
+                ascii_prefixes = "".join(hex_prefixes).encode('ascii')
+            except UnicodeEncodeError:
+                ascii_prefixes = None
+            nibbles = None
+            if ascii_prefixes is not None and len(ascii_prefixes) == 4 * len(hex_rows):
+                nibbles = _HEX_LUT[np.frombuffer(ascii_prefixes, dtype=np.uint8)].reshape(-1, 4)
+            if nibbles is None:
+                valid = np.zeros(len(hex_rows), dtype=bool)
+            else:
+                valid = (nibbles != 255).all(axis=1)
+                good = rows[valid]
+                payload[good, 0] = (nibbles[valid, 0] << 4) | nibbles[valid, 1]
+                payload[good, 1] = (nibbles[valid, 2] << 4) | nibbles[valid, 3]
+                kind[good] = KIND_HEX
+                in_timeline[good] = True
+            # Anything int() might still accept (whitespace, '_', signs) goes through the scalar path
+            for index in np.flatnonzero(~valid):
+                cls._decode_hex_scalar(int(rows[index]), hex_prefixes[index], kind, options, in_timeline)
+
+        return cls(payload, kind, options, timestamps, in_timeline, option_names, odd_hours)
+
+    @staticmethod
+    def _decode_hex_scalar(row, prefix, kind, options, in_timeline):
+        """Reference decoding for hex prefixes the vectorized path does not cover"""
+        try:
+            options[row] = int(prefix, 16) % 3
+            in_timeline[row] = True
+        except Exception as e:
+            print(f"Error processing encrypted vote: {e}")
+            # Default for demo - count undecodable votes in favor
+            options[row] = IN_FAVOR
+        kind[row] = KIND_OPTION
+
+
+def decode_options(batch: VoteBatch) -> np.ndarray:
+    """Decode every row to an option code; -1 marks rows that are not counted"""
+    first = batch.payload[:, 0].astype(np.int32)
+    hex_value = (first << 8) | batch.payload[:, 1]
+    codes = np.where(batch.kind == KIND_HEX, hex_value, first) % 3
+    codes = np.where(batch.kind == KIND_OPTION, batch.options, codes)
+    return np.where(batch.kind == KIND_SKIP, -1, codes)
+
+
+def tally(batch: VoteBatch, codes: Optional[np.ndarray] = None) -> np.ndarray:
+    """Vote count per option code"""
+    if codes is None:
+        codes = decode_options(batch)
+    return np.bincount(codes[codes >= 0], minlength=len(batch.option_names))
+
+
+def _bucket_rows(batch: VoteBatch, resolutions=tuple(RESOLUTIONS)) -> Dict[str, Tuple[np.ndarray, ...]]:
+    """
+    (bucket start ms, first row, count) arrays per resolution, in time order.
+    Timestamps are sorted into minute buckets once and every coarser
+    resolution is reduced from those, so all resolutions cost a single pass.
+    """
+    rows = np.flatnonzero(batch.in_timeline)
+    keys = batch.timestamps[rows] // MINUTE_MS
+    # An unstable argsort is enough: the first row of a bucket is the minimum of its rows
+    order = np.argsort(keys)
+    keys, rows = keys[order], rows[order]
+    edges = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else rows
+    starts_ms = keys[edges] * MINUTE_MS
+    first_rows = np.minimum.reduceat(rows, edges) if len(edges) else rows
+    counts = np.diff(np.r_[edges, len(keys)])
+    buckets = {}
+    for name in resolutions:
+        size = RESOLUTIONS[name]
+        if size == MINUTE_MS or not len(starts_ms):
+            buckets[name] = (starts_ms, first_rows, counts)
+            continue
+        keys = starts_ms // size
+        edges = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        buckets[name] = (keys[edges] * size, np.minimum.reduceat(first_rows, edges), np.add.reduceat(counts, edges))
+    return buckets
+
+
+def hourly_timeline(batch: VoteBatch, hours: Optional[Tuple[np.ndarray, ...]] = None) -> List[Tuple[int, Any, int]]:
+    """
+    Votes per hour bucket as (first row, hour, count), ordered by the first
+    row that falls into each bucket. `hours` are the batch's hour buckets if
+    already computed by `_bucket_rows`.
+    """
+    starts, first_rows, counts = hours if hours is not None else _bucket_rows(batch, ("hour",))["hour"]
+    buckets: Dict[Any, List] = {}
+    for hour, first_row, count in zip(starts.tolist(), first_rows.tolist(), counts.tolist()):
+        buckets[hour] = [first_row, hour, count]
+
+    # Merge buckets of timestamps outside int64, keeping Python's dict-key semantics
+    for row, hour in batch.odd_hours:
+        bucket = buckets.get(hour)
+        if bucket is None:
+            buckets[hour] = [row, hour, 1]
+            continue
+        if row < bucket[0]:
+            bucket[0], bucket[1] = row, hour
+        bucket[2] += 1
+
+    return sorted((tuple(b) for b in buckets.values()), key=lambda b: b[0])
+
+
+def bucket_timeline(batch: VoteBatch, resolutions=tuple(RESOLUTIONS)) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Votes per minute, hour and day bucket as (bucket start ms, count) arrays in
+    time order, all from a single bucketing pass (see `_bucket_rows`).
+    JSON timestamps that do not fit in int64 are left out (see `hourly_timeline`).
+    """
+    return {name: (starts, counts) for name, (starts, _, counts) in _bucket_rows(batch, resolutions).items()}
+
+
+def vote_leaves(batch: VoteBatch) -> List[bytes]:
+    """
+    Merkle leaf of every row, in order. An encrypted vote commits to its raw
+    bytes32 (`hash_leaf(vote)`); other rows commit to their kind and decoded
+    value, the option name for JSON votes, so that leaves do not depend on the
+    batch-local option codes.
+    """
+    payload = batch.payload.tobytes()
+    if np.all(batch.kind == KIND_BYTES):
+        return [hash_leaf(payload[offset:offset + 32]) for offset in range(0, len(payload), 32)]
+    option_words = [bytes([KIND_OPTION]) + hashlib.sha256(json.dumps(name, default=str).encode()).digest()
+                    for name in batch.option_names]
+    options = batch.options.tolist()
+    leaves = []
+    for row, kind in enumerate(batch.kind.tolist()):
+        if kind == KIND_BYTES:
+            leaves.append(hash_leaf(payload[32 * row:32 * row + 32]))
+        elif kind == KIND_OPTION:
+            leaves.append(hash_leaf(option_words[options[row]]))
+        else:
+            leaves.append(hash_leaf(bytes([kind]) + payload[32 * row:32 * row + 32]))
+    return leaves
+
+
+def vote_counts_dict(batch: VoteBatch, counts: np.ndarray) -> Dict[Any, int]:
+    """Counts keyed by option name, base options first then extras in first-seen order"""
+    result = {BASE_OPTIONS[code]: int(counts[code]) for code in COUNT_ORDER}
+    for code in range(len(BASE_OPTIONS), len(batch.option_names)):
+        result[batch.option_names[code]] = int(counts[code])
+    return result
+
+
+def timeline_dict(batch: VoteBatch) -> Dict[Any, int]:
+    return {hour: count for _, hour, count in hourly_timeline(batch)}
+
+
+class TallyAccumulator:
+    """
+    Running tally over vote batches appended in on-chain order.
+
+    `total` doubles as the checkpoint: a refresh only needs to feed the votes
+    past index `total`. The state is JSON-serializable and shards covering
+    consecutive vote ranges can be merged.
+
+    `merkle` commits to the votes themselves in order (see `vote_leaves`); its
+    `root()` is attested along with the counts. The commitment is built
+    lazily: `add` only queues the batch, and its leaves are hashed the first
+    time `merkle` is read (or a snapshot is taken), so tallying never pays for
+    hashing every vote. A snapshot taken with `to_dict(commit=False)` while
+    votes are queued carries no commitment (`committed` is False once restored).
+    """
+
+    VERSION = 3
+
+    def __init__(self):
+        self.total = 0
+        self.option_names: List[Any] = list(BASE_OPTIONS)
+        self.counts: List[int] = [0] * len(BASE_OPTIONS)
+        # hour -> votes, in order of first appearance
+        self.timeline: Dict[Any, int] = {}
+        # minute / day bucket start -> votes
+        self.minutes: Dict[int, int] = {}
+        self.days: Dict[int, int] = {}
+        # Commitment to the votes before the queued batches; None once it was dropped from a snapshot
+        self._merkle: Optional[MerkleAccumulator] = MerkleAccumulator()
+        self._pending: List[VoteBatch] = []
+        self._codes = {name: code for code, name in enumerate(BASE_OPTIONS)}
+
+    @staticmethod
+    def _add_buckets(target: Dict, buckets):
+        for start, count in buckets:
+            target[start] = target.get(start, 0) + count
+
+    def _code(self, option) -> int:
+        code = self._codes.get(option)
+        if code is None:
+            code = self._codes[option] = len(self.option_names)
+            self.option_names.append(option)
+            self.counts.append(0)
+        return code
+
+    @property
+    def committed(self) -> bool:
+        """Whether the Merkle commitment covers every tallied vote (or can be brought up to date)"""
+        return self._merkle is not None
+
+    @property
+    def merkle(self) -> MerkleAccumulator:
+        return self.commit()
+
+    def commit(self) -> MerkleAccumulator:
+        """Merkle commitment to every tallied vote, hashing the queued batches first"""
+        if self._merkle is None:
+            raise ValueError("Tally snapshot does not carry a Merkle commitment")
+        for batch in self._pending:
+            self._merkle.extend(vote_leaves(batch))
+        self._pending = []
+        return self._merkle
+
+    def add(self, votes) -> "TallyAccumulator":
+        """Append a VoteBatch (or a raw vote list) to the tally"""
+        batch = votes if isinstance(votes, VoteBatch) else VoteBatch.from_votes(votes)
+        batch_counts = tally(batch)
+        for code, name in enumerate(batch.option_names):
+            if code < len(BASE_OPTIONS) or batch_counts[code]:
+                self.counts[self._code(name)] += int(batch_counts[code])
+        # One bucketing pass feeds the minute, hour and day timelines
+        buckets = _bucket_rows(batch)
+        for _, hour, count in hourly_timeline(batch, buckets["hour"]):
+            self.timeline[hour] = self.timeline.get(hour, 0) + count
+        for name, target in (("minute", self.minutes), ("day", self.days)):
+            starts, _, counts = buckets[name]
+            self._add_buckets(target, zip(starts.tolist(), counts.tolist()))
+        if self._merkle is not None:
+            self._pending.append(batch)
+        self.total += len(batch)
+        return self
+
+    def merge(self, other: "TallyAccumulator") -> "TallyAccumulator":
+        """
+        Fold in a shard covering the votes right after this one's. The shard
+        boundary must be aligned for the Merkle commitments to combine (see
+        MerkleAccumulator.merge), e.g. shards of a power-of-two size.
+        """
+        if self.committed and other.committed:
+            self.merkle.merge(other.merkle)
+        else:
+            self._merkle, self._pending = None, []
+        for name, count in zip(other.option_names, other.counts):
+            self.counts[self._code(name)] += count
+        for hour, count in other.timeline.items():
+            self.timeline[hour] = self.timeline.get(hour, 0) + count
+        self._add_buckets(self.minutes, other.minutes.items())
+        self._add_buckets(self.days, other.days.items())
+        self.total += other.total
+        return self
+
+    def copy(self) -> "TallyAccumulator":
+        accumulator = TallyAccumulator.from_dict(dict(self.to_dict(commit=False), merkle=None))
+        if self._merkle is not None:
+            accumulator._merkle = MerkleAccumulator.from_dict(self._merkle.to_dict())
+            accumulator._pending = list(self._pending)
+        return accumulator
+
+    def counts_dict(self) -> Dict[Any, int]:
+        """Counts keyed by option name, in the same order as a single-pass tally"""
+        result = {BASE_OPTIONS[code]: self.counts[code] for code in COUNT_ORDER}
+        for code in range(len(BASE_OPTIONS), len(self.option_names)):
+            result[self.option_names[code]] = self.counts[code]
+        return result
+
+    def timeline_dict(self) -> Dict[Any, int]:
+        return dict(self.timeline)
+
+    def timelines_dict(self) -> Dict[str, Dict[Any, int]]:
+        """Minute, hour and day timelines, each in time order"""
+        return {
+            "minute": dict(sorted(self.minutes.items())),
+            "hour": dict(sorted(self.timeline.items())),
+            "day": dict(sorted(self.days.items()))
+        }
+
+    def to_dict(self, commit=True) -> Dict[str, Any]:
+        """JSON-serializable state; with `commit` False, queued batches are not hashed and the commitment is left out"""
+        if commit and self.committed:
+            self.commit()
+        # Pairs rather than objects so that non-string keys and ordering survive JSON
+        return {
+            "version": self.VERSION,
+            "total": self.total,
+            "counts": [[name, count] for name, count in zip(self.option_names, self.counts)],
+            "timeline": [[hour, count] for hour, count in self.timeline.items()],
+            "minutes": sorted([start, count] for start, count in self.minutes.items()),
+            "days": sorted([start, count] for start, count in self.days.items()),
+            "merkle": self._merkle.to_dict() if self._merkle is not None and not self._pending else None
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "TallyAccumulator":
+        if state.get("version") != cls.VERSION:
+            raise ValueError(f"Unsupported tally snapshot version: {state.get('version')}")
+        accumulator = cls()
+        accumulator.total = int(state["total"])
+        for name, count in state["counts"]:
+            accumulator.counts[accumulator._code(name)] += int(count)
+        for hour, count in state["timeline"]:
+            accumulator.timeline[hour] = accumulator.timeline.get(hour, 0) + int(count)
+        accumulator._add_buckets(accumulator.minutes, ((int(start), int(count)) for start, count in state["minutes"]))
+        accumulator._add_buckets(accumulator.days, ((int(start), int(count)) for start, count in state["days"]))
+        if state["merkle"] is None:
+            accumulator._merkle = None
+        else:
+            accumulator._merkle = MerkleAccumulator.from_dict(state["merkle"])
+            if accumulator._merkle.size != accumulator.total:
+                raise ValueError("Merkle commitment does not cover the tallied votes")
+        return accumulator
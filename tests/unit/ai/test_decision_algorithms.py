@@ -0,0 +1,73 @@
+# tests/unit/ai/test_decision_algorithms.py
+
+import unittest
+from unittest.mock import patch
+
+from ai.nillion_integration.insight_jobs import InsightJobQueue
+from ai.nillion_integration.secret_llm import FakeSecretLLM
+from ai.optimization.decision_algorithms import EnhancedDecisionAlgorithm
+from ai.optimization.stage_graph import DONE, SKIPPED
+from benchmarks.fakes import CONTRACT, FakeChainRPC, InMemoryStorageManager
+from integrations.chain.tx_queue import MINED
+from integrations.nethermind.agentic_ai import AgenticAI
+from integrations.nethermind.eth_executor import NethermindExecutor
+from tee.marlin_tee_integration import marlin_tee
+
+PRIVATE_KEY = "0x" + "4c" * 32
+
+
+class TestEnhancedDecisionAlgorithm(unittest.TestCase):
+    def setUp(self):
+        self.chain = FakeChainRPC({}).start()
+        self.addCleanup(self.chain.stop)
+        self.storage = InMemoryStorageManager()
+        executor = NethermindExecutor(self.chain.url, private_key=PRIVATE_KEY, voting_address=CONTRACT,
+                                      storage_manager=self.storage)
+        self.algorithm = EnhancedDecisionAlgorithm(agent=AgenticAI(), executor=executor, storage=self.storage)
+        queue = InsightJobQueue(FakeSecretLLM())
+        self.addCleanup(queue.shutdown)
+        patcher = patch.object(marlin_tee, "insight_queue", queue)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_decision_runs_through_the_graph(self):
+        proposal = {"id": 3, "title": "Security audit", "description": "Fund an audit of the treasury contracts"}
+        votes = [{"option": "inFavor"}] * 4 + [{"option": "against"}]
+
+        execution = self.algorithm.process_voting_decision(proposal, votes)
+
+        self.assertTrue(execution["approved"])
+        self.assertTrue(execution["success"])
+        self.assertIn("risks", self.storage.kv["proposal_3_analysis"])
+        self.assertEqual(self.storage.kv["vote_results_3"]["results"]["total"], 5)
+
+    def test_batch_reports_failures_per_proposal(self):
+        decisions = [
+            ({"id": 1, "title": "Grant A"}, [{"option": "against"}] * 2),
+            ({"title": "No id"}, [{"option": "inFavor"}]),
+            ({"id": 2, "title": "Grant B"}, [{"option": "inFavor"}])
+        ]
+
+        report = self.algorithm.process_voting_decisions(decisions, max_concurrency=2)
+
+        first, broken, last = report.runs
+        self.assertTrue(first.ok and last.ok)
+        self.assertEqual([first.results["execute"]["approved"], last.results["execute"]["approved"]], [False, True])
+        self.assertFalse(broken.ok)
+        self.assertEqual(broken.status["execute"], SKIPPED)
+        self.assertEqual(first.status["tee_tally"], DONE)
+
+    def test_concurrent_decisions_share_one_executor(self):
+        decisions = [({"id": pid, "title": f"Grant {pid}"}, [{"option": "inFavor"}] * (pid + 1)) for pid in range(8)]
+
+        report = self.algorithm.process_voting_decisions(decisions, max_concurrency=8)
+
+        self.assertTrue(all(run.ok for run in report.runs))
+        transactions = [tx for run in report.runs for tx in run.results["execute"]["transactions"]]
+        self.assertEqual({tx["status"] for tx in transactions}, {MINED})
+        self.assertEqual(sorted(tx["nonce"] for tx in transactions), list(range(8)))
+        self.assertEqual(len(self.chain.transactions), 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
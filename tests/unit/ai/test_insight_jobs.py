@@ -0,0 +1,97 @@
+# tests/unit/ai/test_insight_jobs.py
+
+import threading
+import unittest
+
+from ai.nillion_integration.insight_jobs import DONE, FAILED, InsightJobQueue
+from ai.nillion_integration.secret_llm import FakeSecretLLM
+
+SNAPSHOT = {
+    "proposal_id": 7,
+    "total_votes": 3,
+    "vote_distribution": {"inFavor": 2, "against": 1, "abstain": 0},
+    "voting_timeline": {1742446800000: 3}
+}
+
+
+class BlockingLLM(FakeSecretLLM):
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def analyze_voting_patterns(self, aggregated_results):
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        self.release.wait(5)
+        with self._lock:
+            self.running -= 1
+        return super().analyze_voting_patterns(aggregated_results)
+
+
+class FlakyLLM(FakeSecretLLM):
+    def analyze_voting_patterns(self, aggregated_results):
+        self.calls += 1
+        if self.calls == 1:
+            raise RuntimeError("nilAI unavailable")
+        return "insights"
+
+
+class TestInsightJobQueue(unittest.TestCase):
+    def test_same_snapshot_is_deduplicated(self):
+        llm = BlockingLLM()
+        queue = InsightJobQueue(llm, max_workers=2)
+        self.addCleanup(queue.shutdown)
+
+        first = queue.submit(7, SNAPSHOT)
+        second = queue.submit(7, dict(SNAPSHOT))
+        llm.release.set()
+
+        self.assertIs(first, second)
+        self.assertTrue(first.wait(5))
+        self.assertEqual(first.status, DONE)
+        self.assertEqual(llm.calls, 1)
+        self.assertIs(queue.latest_for(7), first)
+        self.assertEqual(queue.get(first.job_id).to_dict()["result"], first.result)
+
+    def test_worker_pool_is_bounded(self):
+        llm = BlockingLLM()
+        queue = InsightJobQueue(llm, max_workers=2)
+        self.addCleanup(queue.shutdown)
+
+        jobs = [queue.submit(pid, dict(SNAPSHOT, proposal_id=pid)) for pid in range(6)]
+        llm.release.set()
+        for job in jobs:
+            self.assertTrue(job.wait(5))
+        self.assertEqual(llm.max_running, 2)
+
+    def test_failed_jobs_can_be_resubmitted(self):
+        queue = InsightJobQueue(FlakyLLM())
+        self.addCleanup(queue.shutdown)
+
+        failed = queue.submit(7, SNAPSHOT)
+        failed.wait(5)
+        self.assertEqual(failed.status, FAILED)
+        self.assertIn("nilAI unavailable", failed.error)
+
+        retried = queue.submit(7, SNAPSHOT)
+        retried.wait(5)
+        self.assertEqual(retried.status, DONE)
+        self.assertEqual(retried.result, "insights")
+
+    def test_only_recent_jobs_are_retained(self):
+        queue = InsightJobQueue(FakeSecretLLM(), max_jobs=3)
+        self.addCleanup(queue.shutdown)
+        jobs = [queue.submit(pid, dict(SNAPSHOT, proposal_id=pid)) for pid in range(5)]
+        for job in jobs:
+            job.wait(5)
+        self.assertIsNone(queue.get(jobs[0].job_id))
+        self.assertIsNone(queue.latest_for(0))
+        self.assertIs(queue.latest_for(4), jobs[4])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+# tests/unit/ai/test_llm_cache.py
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+from ai.nillion_integration.llm_cache import LLMResponseCache, request_key
+from ai.nillion_integration.secret_llm import NillionSecretLLM
+
+RESULTS = {"proposal_id": 7, "vote_distribution": {"inFavor": 2, "against": 1}, "voting_timeline": {1: 3}}
+
+
+class StubCompletions:
+    """Stands in for `OpenAI().chat.completions`"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.requests = []
+
+    def create(self, model, messages):
+        self.requests.append(messages)
+        time.sleep(self.delay)
+        message = SimpleNamespace(content=f"analysis #{len(self.requests)}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def make_llm(cache, delay=0.0):
+    llm = NillionSecretLLM(cache=cache)
+    completions = StubCompletions(delay)
+    llm.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return llm, completions
+
+
+class TestLLMResponseCache(unittest.TestCase):
+    def test_key_ignores_payload_key_order(self):
+        reordered = {"voting_timeline": {1: 3}, "vote_distribution": {"against": 1, "inFavor": 2}, "proposal_id": 7}
+        self.assertEqual(request_key("m", "s", "t", RESULTS), request_key("m", "s", "t", reordered))
+        self.assertNotEqual(request_key("m", "s", "t", RESULTS), request_key("m", "other", "t", RESULTS))
+
+    def test_identical_requests_hit_the_cache(self):
+        llm, completions = make_llm(LLMResponseCache())
+        first = llm.analyze_voting_patterns(RESULTS)
+        second = llm.analyze_voting_patterns(dict(RESULTS))
+        llm.suggest_auction_strategies({"project_id": 1})
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(completions.requests), 2)
+        stats = llm.cache_stats()
+        self.assertEqual((stats["memory_hits"], stats["misses"]), (1, 2))
+
+    def test_memory_tier_is_lru_bounded(self):
+        cache = LLMResponseCache(max_memory_entries=2)
+        for key in "abc":
+            cache.put(key, key.upper())
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("c"), "C")
+
+    def test_disk_tier_survives_restart_and_evicts(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = LLMResponseCache(max_memory_entries=1, disk_dir=tmp, max_disk_entries=2)
+            cache.put("a", "A")
+            cache.put("b", "B")
+            self.assertEqual(cache.get("a"), "A")
+            cache.put("c", "C")
+
+            self.assertEqual(sorted(os.listdir(tmp)), ["a.json", "c.json"])
+            self.assertEqual(cache.stats()["evictions"], 1)
+
+            restarted = LLMResponseCache(disk_dir=tmp)
+            self.assertEqual(restarted.get("c"), "C")
+            self.assertEqual(restarted.stats()["disk_hits"], 1)
+
+    def test_concurrent_identical_requests_are_coalesced(self):
+        llm, completions = make_llm(LLMResponseCache(), delay=0.2)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(llm.analyze_voting_patterns(RESULTS)))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(completions.requests), 1)
+        self.assertEqual(set(results), {"analysis #1"})
+
+    def test_failures_are_not_cached(self):
+        cache = LLMResponseCache()
+        with self.assertRaises(RuntimeError):
+            cache.get_or_compute("k", lambda: (_ for _ in ()).throw(RuntimeError("down")))
+        self.assertEqual(cache.get_or_compute("k", lambda: "ok"), "ok")
+
+
+if __name__ == "__main__":
+    unittest.main()
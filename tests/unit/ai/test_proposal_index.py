@@ -0,0 +1,92 @@
+# tests/unit/ai/test_proposal_index.py
+
+import json
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from ai.nillion_integration.llm_cache import LLMResponseCache
+from ai.nillion_integration.proposal_index import ProposalIndex, hashed_features
+from ai.nillion_integration.secret_llm import FakeSecretLLM
+from integrations.nethermind.agentic_ai import AgenticAI
+from tests.unit.ai.test_llm_cache import make_llm
+
+
+def make_corpus(n, words=60, seed=3):
+    rng = np.random.default_rng(seed)
+    vocabulary = [f"term{i}" for i in range(3000)]
+    return [" ".join(rng.choice(vocabulary, words)) for _ in range(n)]
+
+
+class TestProposalIndex(unittest.TestCase):
+    def test_finds_near_duplicates(self):
+        corpus = make_corpus(600)
+        index = ProposalIndex(capacity=16)
+        for i, text in enumerate(corpus):
+            index.add(i, text)
+        for i in range(0, 600, 20):
+            edited = corpus[i] + " with a small amendment"
+            best = index.nearest(edited, k=3)
+            self.assertEqual(best[0].key, i)
+            self.assertGreater(best[0].similarity, 0.8)
+            self.assertLess(best[1].similarity, 0.3)
+            self.assertNotEqual(index.nearest(edited, exclude=i)[0].key, i)
+        self.assertGreater(index.stats()["reweights"], 1)
+
+    def test_reindexing_replaces_the_text(self):
+        first, second = make_corpus(2)
+        index = ProposalIndex()
+        index.add("a", first, "analysis of first")
+        index.add("a", second)
+        self.assertEqual(len(index), 1)
+        self.assertAlmostEqual(index.nearest(second)[0].similarity, 1.0, places=5)
+        self.assertEqual(index.analysis("a"), "analysis of first")
+        np.testing.assert_array_equal(index._df[hashed_features(first)[0]] > 0,
+                                      np.isin(hashed_features(first)[0], hashed_features(second)[0]))
+
+
+class TestAnalysisReuse(unittest.TestCase):
+    def test_secret_llm_reuses_or_extends_earlier_analyses(self):
+        llm, completions = make_llm(LLMResponseCache())
+        text, other = make_corpus(2, words=80)
+        self.assertEqual(llm.analyze_proposal(text, proposal_id=1), "analysis #1")
+        # A resubmission with a typo fix is not sent again, and says whose analysis it got
+        with patch("builtins.print") as log:
+            analysis, reused = llm.analyze_proposal(text + " amended", proposal_id=2, with_match=True)
+        self.assertEqual((analysis, reused.key), ("analysis #1", 1))
+        self.assertIn("Reusing analysis of proposal 1 for 2", log.call_args.args[0])
+        self.assertEqual(len(completions.requests), 1)
+
+        # A substantially revised one is, with the earlier analysis as context
+        revised = " ".join(text.split()[:60] + other.split()[:20])
+        llm.analyze_proposal(revised, proposal_id=3)
+        payload = json.loads(completions.requests[-1][1]["content"].split(": ", 1)[1])
+        self.assertEqual(payload["similar_proposal"]["analysis"], "analysis #1")
+        llm.analyze_proposal(other, proposal_id=4)
+        self.assertNotIn("similar_proposal", completions.requests[-1][1]["content"])
+        self.assertEqual(llm.cache_stats()["proposal_index"]["reused"], 1)
+
+    def test_fake_llm_reports_reuse(self):
+        llm = FakeSecretLLM()
+        proposal = "Proposal: fund a security audit of the treasury contracts for 50000 USDC"
+        first, reused = llm.analyze_proposal(proposal, proposal_id=1, with_match=True)
+        self.assertIsNone(reused)
+        with patch("builtins.print"):
+            analysis, reused = llm.analyze_proposal(proposal + ".", proposal_id=2, with_match=True)
+        self.assertEqual((analysis, reused.key), (first, 1))
+        self.assertEqual(llm.calls, 1)
+
+    def test_agent_routes_and_reuses(self):
+        agent = AgenticAI()
+        self.assertIn("strategy", agent.run("Which voting strategy raises turnout?"))
+        proposal = "Proposal: fund a security audit of the treasury contracts for 50000 USDC"
+        first = agent.run(proposal)
+        again = agent.run(proposal + ".")
+        self.assertNotIn("reused_from", first)
+        self.assertEqual(again["reused_from"]["key"], agent.proposal_index._keys[0])
+        self.assertEqual(again["risks"], first["risks"])
+
+
+if __name__ == "__main__":
+    unittest.main()
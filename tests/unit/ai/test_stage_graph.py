@@ -0,0 +1,109 @@
+# tests/unit/ai/test_stage_graph.py
+
+import asyncio
+import threading
+import time
+import unittest
+
+from ai.optimization.stage_graph import (
+    DONE,
+    SKIPPED,
+    TIMED_OUT,
+    StageFailed,
+    StageGraph,
+    StageTimeout,
+)
+
+
+def sleeper(seconds, value=None):
+    def stage(context):
+        time.sleep(seconds)
+        return value
+    return stage
+
+
+class TestStageGraph(unittest.TestCase):
+    def test_independent_stages_overlap(self):
+        graph = StageGraph()
+        graph.add("analysis", sleeper(0.2, "insights"))
+        graph.add("tally", sleeper(0.2, {"inFavor": 2}))
+        graph.add("store", lambda context: f"stored {context['analysis']}", deps=["analysis"])
+        graph.add("execute", lambda context: (context["store"], context["tally"], context["proposal"]),
+                  deps=["store", "tally"])
+
+        run = asyncio.run(graph.run({"proposal": 7}))
+
+        self.assertTrue(run.ok)
+        self.assertEqual(run.results["execute"], ("stored insights", {"inFavor": 2}, 7))
+        self.assertLess(run.elapsed, 0.35)
+        self.assertEqual(set(run.timings), {"analysis", "tally", "store", "execute"})
+        self.assertGreaterEqual(run.timings["tally"], 0.2)
+
+    def test_timeout_skips_dependents_only(self):
+        graph = StageGraph()
+        graph.add("slow", sleeper(0.5), timeout=0.05)
+        graph.add("fast", sleeper(0, "ok"))
+        graph.add("after_slow", sleeper(0), deps=["slow"])
+
+        run = asyncio.run(graph.run({}))
+
+        self.assertEqual(run.status, {"slow": TIMED_OUT, "fast": DONE, "after_slow": SKIPPED})
+        self.assertIsInstance(run.errors["slow"], StageTimeout)
+        self.assertEqual(run.results, {"fast": "ok"})
+        with self.assertRaises(StageFailed) as raised:
+            run.raise_for_errors()
+        self.assertEqual(raised.exception.stage, "slow")
+
+    def test_async_stages_and_validation(self):
+        graph = StageGraph()
+
+        @graph.stage("fetch")
+        async def fetch(context):
+            await asyncio.sleep(0)
+            return context["n"] * 2
+
+        graph.add("fail", lambda context: 1 / 0, deps=["fetch"])
+        run = asyncio.run(graph.run({"n": 21}))
+        self.assertEqual(run.results["fetch"], 42)
+        self.assertIsInstance(run.errors["fail"], ZeroDivisionError)
+
+        with self.assertRaises(ValueError):
+            graph.add("orphan", fetch, deps=["missing"])
+        with self.assertRaises(ValueError):
+            graph.add("fetch", fetch)
+
+    def test_batch_is_bounded_and_reports_stage_timings(self):
+        running = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def work(context):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+            if context["id"] == 3:
+                raise RuntimeError("boom")
+            return context["id"]
+
+        graph = StageGraph()
+        graph.add("work", work)
+        graph.add("report", lambda context: context["work"] * 10, deps=["work"])
+
+        report = asyncio.run(graph.run_batch([{"id": i} for i in range(12)], max_concurrency=3))
+
+        self.assertLessEqual(peak, 3)
+        self.assertEqual([run.results.get("report") for run in report.runs][:4], [0, 10, 20, None])
+        stages = report.stage_timings()
+        self.assertEqual(stages["work"]["count"], 12)
+        self.assertEqual(stages["work"]["errors"], 1)
+        self.assertEqual(stages["report"]["count"], 11)
+        self.assertGreaterEqual(stages["work"]["mean_s"], 0.02)
+        self.assertEqual(report.to_dict()["failed"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+# tests/unit/integrations/test_bid_fetcher.py
+
+import unittest
+
+from integrations.chain.bid_fetcher import BID_PLACED_TOPIC, SEALED_BIDS_SELECTOR, SealedBidFetcher
+from integrations.chain.vote_fetcher import RPCError
+
+CONTRACT = "0x0000000000000000000000000000000000000abc"
+
+
+class FakeRPC:
+    """SealedBidAuction logs and sealedBids served like BatchRPCClient, capping eth_getLogs at 3 logs"""
+
+    def __init__(self, bids):
+        # (block, bidder, amount) in chain order; a later bid overwrites the stored value
+        self.bids = bids
+        self.stored = {bidder.lower(): amount for _, bidder, amount in bids}
+        self.batches = []
+
+    def call(self, method, params):
+        if method == "eth_blockNumber":
+            return "0x64"
+        assert method == "eth_getLogs" and params[0]["topics"][0] == BID_PLACED_TOPIC
+        first, last = int(params[0]["fromBlock"], 16), int(params[0]["toBlock"], 16)
+        logs = [{"blockNumber": hex(block), "logIndex": "0x0", "topics": [BID_PLACED_TOPIC, params[0]["topics"][1],
+                                                                           "0x" + bidder[2:].rjust(64, "0")]}
+                for block, bidder, _ in self.bids if first <= block <= last]
+        if len(logs) > 3:
+            raise RPCError(-32005, "query returned more than 3 results")
+        return logs
+
+    def batch_call(self, calls):
+        self.batches.append(len(calls))
+        results = []
+        for _, (call, _) in calls:
+            assert call["data"][2:10] == SEALED_BIDS_SELECTOR
+            results.append("0x" + format(self.stored["0x" + call["data"][-40:]], "064x"))
+        return results
+
+
+class TestSealedBidFetcher(unittest.TestCase):
+    def test_streams_current_bids_in_chunks(self):
+        bids = [(block, f"0x{block % 5:040x}", block * 10) for block in range(1, 13)]
+        rpc = FakeRPC(bids)
+        fetcher = SealedBidFetcher(rpc, CONTRACT, chunk_size=4, max_block_range=8)
+
+        fetched = list(fetcher.iter_bids(7))
+        self.assertEqual(len(fetched), 12)
+        self.assertEqual(rpc.batches, [4, 4, 4])
+        # Every log of a bidder resolves to their latest stored bid
+        self.assertEqual(fetched[0], ("0x" + "0" * 39 + "1", (110).to_bytes(32, "big")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+# tests/unit/integrations/test_metadata_cache.py
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from integrations.og_storage.local_service import LocalStorageService
+from integrations.og_storage.metadata_cache import AppendOnlyLog, MetadataCache
+from integrations.og_storage.storage_manager import StorageManager
+from integrations.og_storage.transport import StorageTransport
+from integrations.og_storage.typescript_client import ZeroGStorageClient
+
+
+class TempDirTestCase(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "cache", "metadata.log")
+
+
+class TestAppendOnlyLog(TempDirTestCase):
+    def test_survives_reopen(self):
+        log = AppendOnlyLog(self.path)
+        log.put_many([("a", b"1"), ("b", b"2"), ("a", b"3")])
+        log.delete("b")
+        log.close()
+
+        log = AppendOnlyLog(self.path)
+        self.addCleanup(log.close)
+        self.assertEqual(log.get("a"), b"3")
+        self.assertIsNone(log.get("b"))
+        self.assertEqual(log.keys(), ["a"])
+
+    def test_torn_tail_is_truncated(self):
+        log = AppendOnlyLog(self.path)
+        log.put("a", b"first")
+        log.put("b", b"second")
+        log.close()
+        with open(self.path, "r+b") as f:
+            f.truncate(os.path.getsize(self.path) - 3)
+
+        with patch("builtins.print"):
+            log = AppendOnlyLog(self.path)
+        self.addCleanup(log.close)
+        self.assertEqual(log.get("a"), b"first")
+        self.assertNotIn("b", log)
+        log.put("c", b"third")
+        self.assertEqual(log.get("c"), b"third")
+
+    def test_compaction_drops_superseded_records(self):
+        log = AppendOnlyLog(self.path, compact_min_bytes=4096)
+        self.addCleanup(log.close)
+        for i in range(500):
+            log.put(f"key_{i % 5}", str(i).encode() * 10)
+
+        self.assertGreater(log.compactions, 0)
+        self.assertLess(log.size, 4096 * 2)
+        self.assertEqual(log.get("key_4"), b"499" * 10)
+        log.compact()
+        self.assertEqual(log.size, sum(12 + 5 + 30 for _ in range(5)))
+        self.assertEqual(log.get("key_0"), b"495" * 10)
+
+    def test_logs_shared_between_processes(self):
+        # Two handles on one path stand in for two processes
+        first = AppendOnlyLog(self.path)
+        self.addCleanup(first.close)
+        second = AppendOnlyLog(self.path)
+        self.addCleanup(second.close)
+
+        first.put("a", b"1")
+        second.put("b", b"2")
+        self.assertEqual(second.get("a"), b"1")
+        first.put("a", b"3")
+        first.compact()
+        second.put("c", b"4")
+        self.assertEqual(second.get("a"), b"3")
+
+        reopened = AppendOnlyLog(self.path)
+        self.addCleanup(reopened.close)
+        self.assertEqual({key: reopened.get(key) for key in reopened.keys()}, {"a": b"3", "b": b"2", "c": b"4"})
+
+
+class TestMetadataCache(TempDirTestCase):
+    def test_lru_in_front_of_log(self):
+        cache = MetadataCache(self.path, max_memory_entries=2)
+        cache.put_many([(f"auction_{i}", {"total": i}) for i in range(5)])
+        self.assertEqual(cache.stats()["memory_entries"], 2)
+        self.assertEqual(cache.get("auction_0"), {"total": 0})
+        self.assertEqual(cache.stats()["disk_hits"], 1)
+
+        value = cache.get("auction_0")
+        value["total"] = 99
+        self.assertEqual(cache.get("auction_0"), {"total": 0})
+        cache.close()
+
+        cache = MetadataCache(self.path, max_memory_entries=3)
+        self.addCleanup(cache.close)
+        self.assertEqual(cache.warm(), 3)
+        self.assertEqual(cache.get("auction_4"), {"total": 4})
+        self.assertEqual(cache.stats()["memory_hits"], 1)
+
+    def test_only_immutable_prefixes_are_cacheable(self):
+        cache = MetadataCache()
+        self.assertTrue(cache.cacheable("auction_7"))
+        # Rewritten on every tally and when insights land
+        self.assertFalse(cache.cacheable("vote_results_7"))
+        self.assertFalse(cache.cacheable("proposal_7_analysis"))
+
+
+class TestStorageManagerCache(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.service = LocalStorageService().start()
+        self.addCleanup(self.service.stop)
+        transport = StorageTransport(retries=0)
+        self.addCleanup(transport.close)
+        self.client = ZeroGStorageClient(self.service.url, transport=transport)
+
+    def manager(self):
+        cache = MetadataCache(self.path)
+        self.addCleanup(cache.close)
+        return StorageManager(self.service.url, client=self.client, cache=cache)
+
+    def test_read_through_and_write_through(self):
+        self.service.kv.update({"auction_1": {"total": 1}, "proposal_1_analysis": "text"})
+        manager = self.manager()
+
+        for _ in range(3):
+            self.assertEqual(manager.retrieve_metadata("auction_1"), {"total": 1})
+            self.assertEqual(manager.retrieve_metadata("proposal_1_analysis"), "text")
+        # One fetch for the immutable key, every read for the mutable one
+        self.assertEqual(self.service.requests, 4)
+
+        manager.store_metadata("auction_1", {"total": 2})
+        self.assertEqual(manager.retrieve_metadata("auction_1"), {"total": 2})
+        self.assertEqual(self.service.requests, 5)
+
+    def test_warm_up_and_restart(self):
+        self.service.kv.update({f"auction_{i}": {"winner": i} for i in range(50)})
+        manager = self.manager()
+        self.assertEqual(manager.warm_up([f"auction_{i}" for i in range(50)] + ["auction_missing"]), 50)
+        self.assertEqual(self.service.requests, 1)
+        self.assertEqual(manager.warm_up(["auction_3"]), 0)
+        manager.cache.close()
+
+        # A fresh process serves the warmed keys from disk
+        manager = self.manager()
+        self.service.requests = 0
+        values = manager.retrieve_many([f"auction_{i}" for i in range(50)])
+        self.assertEqual(values["auction_49"], {"winner": 49})
+        self.assertEqual(self.service.requests, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+# tests/unit/integrations/test_og_storage_batch.py
+
+import asyncio
+import time
+import unittest
+
+from integrations.og_storage.async_client import AsyncZeroGStorageClient
+from integrations.og_storage.local_service import LocalStorageService
+from integrations.og_storage.storage_manager import StorageManager
+from integrations.og_storage.transport import StorageTransport
+from integrations.og_storage.typescript_client import ZeroGStorageClient
+from integrations.og_storage.write_buffer import WriteBehindBuffer
+
+
+class BatchTestCase(unittest.TestCase):
+    def setUp(self):
+        self.service = LocalStorageService().start()
+        self.addCleanup(self.service.stop)
+        transport = StorageTransport(retries=0)
+        self.addCleanup(transport.close)
+        self.client = ZeroGStorageClient(self.service.url, transport=transport, batch_size=100)
+
+
+class TestBulkKeyValue(BatchTestCase):
+    def test_store_and_retrieve_many_in_batches(self):
+        manager = StorageManager(self.service.url, client=self.client)
+        items = {f"vote_results_{i}": {"total": i} for i in range(250)}
+
+        self.assertEqual(manager.store_many(items)["stored"], 250)
+        self.assertEqual(self.service.requests, 3)
+
+        values = manager.retrieve_many(list(items) + ["missing"])
+        self.assertEqual(self.service.requests, 6)
+        self.assertEqual(values["vote_results_249"], {"total": 249})
+        self.assertIsNone(values["missing"])
+        self.assertEqual(manager.retrieve_metadata("vote_results_7"), {"total": 7})
+
+    def test_failed_batch_raises(self):
+        self.service.fail_next = 1
+        with self.assertRaises(Exception):
+            self.client.store_many([("a", 1)])
+
+    def test_async_client(self):
+        async def run():
+            async with AsyncZeroGStorageClient(self.service.url, backoff_factor=0) as client:
+                await client.store_many({f"k{i}": i for i in range(30)}, batch_size=10)
+                return await client.retrieve_many(["k0", "k29", "nope"])
+
+        self.assertEqual(asyncio.run(run()), {"k0": 0, "k29": 29, "nope": None})
+        self.assertEqual(self.service.requests, 4)
+
+
+class TestWriteBehindBuffer(BatchTestCase):
+    def test_repeated_writes_are_coalesced(self):
+        buffer = WriteBehindBuffer(self.client, flush_interval=60)
+        manager = StorageManager(self.service.url, client=self.client, write_buffer=buffer)
+        for i in range(100):
+            manager.store_metadata(f"key_{i % 10}", i)
+
+        # Pending writes are readable before they reach the service
+        self.assertEqual(manager.retrieve_metadata("key_3"), 93)
+        self.assertEqual(self.service.requests, 0)
+
+        buffer.close()
+        self.assertEqual(self.service.requests, 1)
+        self.assertEqual(self.service.kv["key_3"], 93)
+        self.assertEqual(buffer.stats()["coalesced"], 90)
+
+    def test_flushes_on_interval(self):
+        buffer = WriteBehindBuffer(self.client, flush_interval=0.05)
+        self.addCleanup(buffer.close)
+        buffer.put("a", 1)
+        deadline = time.time() + 2
+        while "a" not in self.service.kv and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.service.kv, {"a": 1})
+
+    def test_failed_flush_keeps_entries(self):
+        buffer = WriteBehindBuffer(self.client, flush_interval=60)
+        buffer.put("a", 1)
+        self.service.fail_next = 1
+        with self.assertRaises(Exception):
+            buffer.flush()
+        buffer.put("b", 2)
+        self.assertEqual(buffer.pending(), 2)
+        buffer.close()
+        self.assertEqual(self.service.kv, {"a": 1, "b": 2})
+        self.assertEqual(buffer.stats()["failures"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+# tests/unit/integrations/test_og_storage_streaming.py
+
+import hashlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from integrations.og_storage.local_service import LocalStorageService
+from integrations.og_storage.storage_manager import StorageManager
+from integrations.og_storage.storage_utils import store_auction_results, store_voting_results
+from integrations.og_storage.transport import StorageTransport
+from integrations.og_storage.typescript_client import ZeroGStorageClient
+
+CONTENT = os.urandom(300_000)
+
+
+class StreamingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.service = LocalStorageService().start()
+        self.addCleanup(self.service.stop)
+        transport = StorageTransport(retries=0)
+        self.addCleanup(transport.close)
+        self.client = ZeroGStorageClient(self.service.url, transport=transport, chunk_size=64 * 1024)
+
+
+class TestStreamingUpload(StreamingTestCase):
+    def assertUploaded(self, result, content):
+        digest = f"0x{hashlib.sha256(content).hexdigest()}"
+        self.assertEqual(result["contentHash"], digest)
+        self.assertEqual(result["size"], len(content))
+        self.assertEqual(self.service.blobs[result["rootHash"]], content)
+
+    def test_upload_bytes(self):
+        self.assertUploaded(self.client.upload(CONTENT), CONTENT)
+
+    def test_upload_file_like(self):
+        self.assertUploaded(self.client.upload(io.BytesIO(CONTENT)), CONTENT)
+
+    def test_upload_iterator_of_small_pieces(self):
+        pieces = (CONTENT[i:i + 100] for i in range(0, len(CONTENT), 100))
+        self.assertUploaded(self.client.upload(pieces), CONTENT)
+
+    def test_upload_empty(self):
+        self.assertUploaded(self.client.upload(b""), b"")
+
+
+class TestResumableDownload(StreamingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root_hash = self.client.upload(CONTENT)["rootHash"]
+        self.service.requests = 0
+
+    def test_download_bytes(self):
+        self.assertEqual(self.client.download_bytes(self.root_hash), CONTENT)
+        self.assertEqual(self.service.requests, 1)
+
+    def test_resumes_after_dropped_connection(self):
+        self.service.drop_download_after = 100_000
+        self.assertEqual(self.client.download_bytes(self.root_hash), CONTENT)
+        self.assertEqual(self.service.requests, 2)
+
+    def test_download_file_continues_partial_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = os.path.join(tmp, "blob.bin")
+            with open(f"{output_path}.part", "wb") as f:
+                f.write(CONTENT[:123_456])
+
+            self.client.download_file(self.root_hash, output_path)
+
+            with open(output_path, "rb") as f:
+                self.assertEqual(f.read(), CONTENT)
+            self.assertFalse(os.path.exists(f"{output_path}.part"))
+
+    def test_offset_past_end(self):
+        self.assertEqual(list(self.client.iter_download(self.root_hash, offset=len(CONTENT))), [])
+
+
+class TestStorageUtils(StreamingTestCase):
+    def test_results_are_streamed_without_temp_files(self):
+        manager = StorageManager(self.service.url, client=self.client)
+        results = {"timestamp": 1742461234567, "totalVotes": 3, "counts": {"inFavor": 2, "against": 1}}
+        auction = {"winner": "0xabc", "winningAmount": 5, "timestamp": 1742461234567}
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cwd = os.getcwd()
+            os.chdir(tmp)
+            try:
+                vote_hash = store_voting_results(7, results, storage_manager=manager)
+                auction_hash = store_auction_results(7, auction, storage_manager=manager)
+                self.assertEqual(os.listdir(tmp), [])
+            finally:
+                os.chdir(cwd)
+
+        self.assertEqual(json.loads(self.service.blobs[vote_hash]), results)
+        self.assertEqual(json.loads(self.service.blobs[auction_hash]), auction)
+        self.assertEqual(self.service.kv["vote_7"]["root_hash"], vote_hash)
+        self.assertEqual(self.service.kv["auction_7"]["winner"], "0xabc")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+# tests/unit/integrations/test_og_storage_transport.py
+
+import asyncio
+import unittest
+from unittest.mock import patch
+
+import aiohttp
+import requests
+
+from integrations.og_storage.async_client import AsyncZeroGStorageClient
+from integrations.og_storage.local_service import LocalStorageService
+from integrations.og_storage.storage_manager import StorageManager
+from integrations.og_storage.transport import StorageTransport
+from integrations.og_storage.typescript_client import ZeroGStorageClient
+
+
+class TransportTestCase(unittest.TestCase):
+    def setUp(self):
+        self.service = LocalStorageService().start()
+        self.addCleanup(self.service.stop)
+        self.url = self.service.url
+
+
+class TestStorageTransport(TransportTestCase):
+    def client(self, **kwargs):
+        kwargs.setdefault("backoff_factor", 0)
+        transport = StorageTransport(**kwargs)
+        self.addCleanup(transport.close)
+        return ZeroGStorageClient(self.url, transport=transport)
+
+    def test_connections_are_reused(self):
+        manager = StorageManager(self.url, client=self.client())
+        for i in range(50):
+            manager.store_metadata(f"key_{i}", {"i": i})
+        self.assertEqual(manager.retrieve_metadata("key_49"), {"i": 49})
+        self.assertEqual(self.service.requests, 51)
+        self.assertEqual(self.service.connections, 1)
+
+    def test_transient_errors_are_retried(self):
+        client = self.client(retries=3)
+        self.service.fail_next = 2
+        self.assertEqual(client.store_key_value("k", 1), {"success": True})
+        self.assertEqual(self.service.requests, 3)
+        self.assertEqual(self.service.kv, {"k": 1})
+
+    def test_retries_are_bounded(self):
+        client = self.client(retries=1)
+        self.service.fail_next = 5
+        with self.assertRaises(Exception):
+            client.store_key_value("k", 1)
+        self.assertEqual(self.service.requests, 2)
+
+    def test_missing_key_is_not_retried(self):
+        client = self.client()
+        with self.assertRaises(Exception):
+            client.retrieve_key_value("missing")
+        self.assertEqual(self.service.requests, 1)
+
+    def test_read_timeout(self):
+        client = self.client(timeout=0.05, retries=0)
+        self.service.delay = 0.3
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            client.retrieve_key_value("k")
+
+
+class TestAsyncZeroGStorageClient(TransportTestCase):
+    def test_concurrent_requests_share_the_pool(self):
+        async def run():
+            async with AsyncZeroGStorageClient(self.url, pool_size=4, backoff_factor=0) as client:
+                await asyncio.gather(*(client.store_key_value(f"key_{i}", i) for i in range(40)))
+                return await client.retrieve_key_value("key_39")
+
+        self.assertEqual(asyncio.run(run()), {"key": "key_39", "value": 39})
+        self.assertEqual(len(self.service.kv), 40)
+        self.assertLessEqual(self.service.connections, 4)
+
+    def test_transient_errors_are_retried(self):
+        async def run():
+            async with AsyncZeroGStorageClient(self.url, retries=3, backoff_factor=0) as client:
+                return await client.store_key_value("k", "v")
+
+        self.service.fail_next = 2
+        self.assertEqual(asyncio.run(run()), {"success": True})
+        self.assertEqual(self.service.requests, 3)
+
+    def test_upload_is_retried_with_a_fresh_form(self):
+        async def run():
+            async with AsyncZeroGStorageClient(self.url, retries=2, backoff_factor=0) as client:
+                uploaded = await client.upload_bytes(b"blob", filename="a.bin")
+                return uploaded, await client.download_bytes(uploaded["rootHash"])
+
+        self.service.fail_next = 1
+        # A FormData body can only be sent once, so each attempt needs its own
+        with patch("aiohttp.FormData", wraps=aiohttp.FormData) as form:
+            uploaded, content = asyncio.run(run())
+        self.assertEqual(content, b"blob")
+        self.assertEqual(self.service.requests, 3)
+        self.assertEqual(form.call_count, 2)
+
+    def test_timeout(self):
+        async def run():
+            async with AsyncZeroGStorageClient(self.url, timeout=0.05, retries=0) as client:
+                await client.retrieve_key_value("k")
+
+        self.service.delay = 0.3
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(run())
+
+
+if __name__ == "__main__":
+    unittest.main()
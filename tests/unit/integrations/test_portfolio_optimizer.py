@@ -0,0 +1,102 @@
+# tests/unit/integrations/test_portfolio_optimizer.py
+
+import time
+import unittest
+
+import numpy as np
+
+from integrations.nethermind.autonomous_strategies.portfolio_optimizer import (
+    PERIODS_PER_YEAR,
+    CovarianceEstimator,
+    project_capped_simplex,
+    solve_mean_variance,
+)
+from integrations.nethermind.autonomous_strategies.proposal_generator import ProposalGenerator
+
+
+def make_prices(n_assets, n_rows, seed=3):
+    rng = np.random.default_rng(seed)
+    drift = rng.normal(0.0004, 0.001, n_assets)
+    volatility = rng.uniform(0.01, 0.05, n_assets)
+    market = rng.normal(0, 0.01, (n_rows, 1))
+    returns = drift + volatility * rng.standard_normal((n_rows, n_assets)) + market
+    return 100 * np.exp(np.cumsum(returns, axis=0))
+
+
+class TestCovarianceEstimator(unittest.TestCase):
+    def test_incremental_updates_match_full_history(self):
+        prices = make_prices(6, 120)
+        returns = np.diff(np.log(prices), axis=0)
+        for halflife in (None, 20):
+            estimator = CovarianceEstimator(range(6), halflife=halflife, shrinkage=0.0, fold_rows=8)
+            for start in range(0, 120, 13):
+                estimator.update(prices[start:start + 13])
+
+            weights = estimator._weights(estimator.decay, len(returns))
+            weights /= weights.sum()
+            mean = weights @ returns
+            cov = (returns * weights[:, None]).T @ returns - np.outer(mean, mean)
+            np.testing.assert_allclose(estimator.moments()[0], mean * PERIODS_PER_YEAR)
+            # A block mixes folded and pending rows
+            np.testing.assert_allclose(estimator.covariance([4, 1]), cov[np.ix_([4, 1], [4, 1])] * PERIODS_PER_YEAR)
+            np.testing.assert_allclose(estimator.covariance(), cov * PERIODS_PER_YEAR)
+        self.assertEqual(estimator.observations, 119)
+
+    def test_shrinkage_keeps_wide_covariance_invertible(self):
+        estimator = CovarianceEstimator(range(50))
+        estimator.update(make_prices(50, 10))
+        self.assertGreater(np.linalg.eigvalsh(estimator.covariance())[0], 0)
+
+
+class TestSolver(unittest.TestCase):
+    def test_projection_respects_budget_and_cap(self):
+        v = np.random.default_rng(0).normal(size=(5, 12))
+        w = project_capped_simplex(v, cap=0.2)
+        np.testing.assert_allclose(w.sum(axis=1), 1.0)
+        self.assertTrue(((w >= 0) & (w <= 0.2 + 1e-12)).all())
+
+    def test_batched_profiles_trade_return_for_risk(self):
+        mean = np.array([0.05, 0.10, 0.20])
+        cov = np.diag([0.01, 0.04, 0.16])
+        weights = solve_mean_variance(mean, cov, [100.0, 10.0, 0.1])
+        np.testing.assert_allclose(weights.sum(axis=1), 1.0)
+        returns = weights @ mean
+        self.assertTrue((np.diff(returns) > 0).all())
+        # With little risk aversion everything goes to the best asset
+        np.testing.assert_allclose(weights[2], [0, 0, 1], atol=1e-6)
+
+
+class TestProposalGenerator(unittest.TestCase):
+    def test_proposals_from_thousands_of_assets(self):
+        assets = [f"TOKEN{i}" for i in range(3000)]
+        prices = make_prices(len(assets), 200)
+        generator = ProposalGenerator()
+        generator.observe_market({"assets": assets, "prices": prices[:-1]})
+
+        start = time.perf_counter()
+        proposals = generator.generate_investment_proposals(
+            {"holdings": {"TOKEN1": 60, "TOKEN2": 40}}, {"assets": assets, "prices": prices}
+        )
+        self.assertLess(time.perf_counter() - start, 0.25)
+
+        self.assertEqual(generator.estimator.observations, 199)
+        self.assertTrue(proposals)
+        self.assertAlmostEqual(sum(p["allocation"] for p in proposals), 1.0, places=3)
+        self.assertEqual(set(proposals[0]),
+                         {"title", "description", "allocation", "expected_return", "risk_level", "timeframe"})
+        self.assertTrue(all(1 <= p["risk_level"] <= 10 for p in proposals))
+
+        profiles = generator.allocate_risk_profiles({"assets": assets, "prices": prices}, levels=[1, 5, 10])
+        self.assertLess(profiles[1]["volatility"], profiles[10]["volatility"])
+        self.assertEqual(generator.estimator.updates, 2)
+
+    def test_treasury_risk(self):
+        generator = ProposalGenerator()
+        self.assertEqual(generator._analyze_treasury_risk({}), 5)
+        self.assertEqual(generator._analyze_treasury_risk({"risk_tolerance": 12}), 10)
+        generator.observe_market({"assets": ["A", "B"], "prices": make_prices(2, 60)})
+        self.assertIn(generator._analyze_treasury_risk({"holdings": {"A": 1, "B": 1}}), range(1, 11))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+# tests/unit/integrations/test_risk_assessment.py
+
+import unittest
+
+import numpy as np
+
+from integrations.nethermind.autonomous_strategies.market_analysis import MarketAnalyzer, RollingWindow
+from integrations.nethermind.autonomous_strategies.proposal_generator import ProposalGenerator
+from integrations.nethermind.autonomous_strategies.risk_assessment import TreasuryRiskMonitor
+
+
+def make_ticks(n_ticks, n_assets, seed=9):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.002, (n_ticks, n_assets)), axis=0))
+
+
+class TestRollingWindow(unittest.TestCase):
+    def test_push_and_extend_match_recomputation(self):
+        data = np.random.default_rng(0).normal(size=(333, 4))
+        pushed = RollingWindow(50, 4, cross=True)
+        for row in data:
+            pushed.push(row)
+        extended = RollingWindow(50, 4, cross=True)
+        start = 0
+        for size in (7, 60, 1, 49, 200, 16):
+            extended.extend(data[start:start + size])
+            start += size
+
+        window = data[-50:]
+        for rolling in (pushed, extended):
+            np.testing.assert_allclose(rolling.values(), window)
+            np.testing.assert_allclose(rolling.variance(), window.var(axis=0, ddof=1))
+            np.testing.assert_allclose(rolling.correlation(), np.corrcoef(window.T))
+
+
+class TestMarketAnalyzer(unittest.TestCase):
+    def test_partial_ticks_carry_prices_forward(self):
+        market = MarketAnalyzer(["ETH", "USDC"], window=10, ticks_per_year=1)
+        self.assertIsNone(market.ingest({"ETH": 100.0}))
+        market.ingest({"USDC": 1.0})
+        returns = market.ingest({"ETH": 110.0})
+        np.testing.assert_allclose(returns, [np.log(1.1), 0.0])
+        with self.assertRaises(ValueError):
+            market.ingest({"ETH": -1.0})
+
+
+class TestTreasuryRiskMonitor(unittest.TestCase):
+    def test_streaming_matches_batch_and_ignores_flows(self):
+        prices = make_ticks(3000, 5)
+        balances = np.ones_like(prices)
+        # A large deposit is not a gain
+        balances[1500:, 0] = 50
+
+        streamed = TreasuryRiskMonitor(range(5), window=400)
+        for tick, holding in zip(prices, balances):
+            streamed.ingest(tick, holding)
+        batched = TreasuryRiskMonitor(range(5), window=400)
+        batched.ingest_many(prices[:1000], balances[:1000])
+        batched.ingest_many(prices[1000:], balances[1000:])
+
+        values_before = (balances[:-1] * prices[:-1]).sum(axis=1)
+        values_after = (balances[:-1] * prices[1:]).sum(axis=1)
+        returns = np.log(values_after / values_before)[-400:]
+        index = np.exp(np.cumsum(np.log(values_after / values_before)))
+        for monitor in (streamed, batched):
+            self.assertEqual(monitor.ticks, 2999)
+            self.assertAlmostEqual(monitor.volatility(), returns.std(ddof=1) * np.sqrt(monitor.market.ticks_per_year))
+            self.assertAlmostEqual(monitor.drawdown(), 1 - index[-1] / index[-400:].max())
+            self.assertAlmostEqual(monitor.historical_var(), -np.expm1(np.quantile(returns, 0.05)))
+            self.assertGreater(monitor.value_at_risk(), 0)
+            self.assertLess(monitor.max_drawdown, 0.2)
+
+    def test_feeds_treasury_risk(self):
+        monitor = TreasuryRiskMonitor(["ETH", "BTC"], window=100)
+        generator = ProposalGenerator(risk_monitor=monitor)
+        self.assertEqual(generator._analyze_treasury_risk({}), 5)
+
+        # Calm market, then a crash while holding everything in ETH
+        monitor.ingest({"ETH": 100.0, "BTC": 100.0}, {"ETH": 10})
+        for i in range(50):
+            monitor.ingest({"ETH": 100.0 * (1 + 1e-5 * (i % 2)), "BTC": 100.0})
+        calm = generator._analyze_treasury_risk({})
+        for _ in range(10):
+            monitor.ingest({"ETH": monitor.market.prices[0] * 0.95})
+        self.assertEqual(calm, 1)
+        self.assertAlmostEqual(monitor.drawdown(), 1 - 0.95 ** 10)
+        # Volatile enough for level 10, minus one level per 10% of drawdown
+        self.assertEqual(generator._analyze_treasury_risk({}), 10 - 4)
+        self.assertEqual(generator._analyze_treasury_risk({"risk_tolerance": 4}), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+# tests/unit/integrations/test_tx_queue.py
+
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from eth_abi import decode
+
+from ai.nillion_integration.insight_jobs import InsightJobQueue
+from ai.nillion_integration.secret_llm import FakeSecretLLM
+from benchmarks.fakes import CONTRACT, FakeChainRPC, InMemoryStorageManager
+from integrations.chain.tx_queue import (
+    FAILED,
+    FINALIZE_PROPOSAL_SELECTOR,
+    MINED,
+    VERIFY_TEE_RESULT_SELECTOR,
+    TransactionQueue,
+    finalize_proposal_data,
+)
+from integrations.chain.vote_fetcher import BatchRPCClient
+from integrations.nethermind.eth_executor import NethermindExecutor
+from tee.marlin_tee_integration import marlin_tee
+
+PRIVATE_KEY = "0x" + "4c" * 32
+VERIFIER = "0x000000000000000000000000000000000000bEEF"
+
+
+class TestTransactionQueue(unittest.TestCase):
+    def setUp(self):
+        self.chain = FakeChainRPC({}).start()
+        self.addCleanup(self.chain.stop)
+        self.rpc = BatchRPCClient(self.chain.url)
+        self.queue = TransactionQueue(self.rpc, PRIVATE_KEY)
+
+    def test_pipelined_submission_and_bulk_receipts(self):
+        calls = [(CONTRACT, finalize_proposal_data(pid, True, b"\x01" * 32, b"proof")) for pid in range(6)]
+        txs = self.queue.submit(calls, wait=False)
+
+        self.assertEqual([tx.nonce for tx in txs], list(range(6)))
+        self.assertEqual(len(self.chain.mempool), 6)
+        self.assertEqual(self.chain.receipts, {})
+
+        before = self.rpc.stats()["batches"]
+        self.queue.wait(txs, timeout=5, poll_interval=0)
+        # The first poll sees nothing mined yet, the second gets every receipt
+        self.assertEqual(self.rpc.stats()["batches"] - before, 2)
+        self.assertEqual({tx.status for tx in txs}, {MINED})
+        self.assertEqual(len({tx.receipt["blockNumber"] for tx in txs}), 1)
+
+        # One estimate per (contract, function), then the cache
+        self.queue.submit(calls[:2], timeout=5, poll_interval=0)
+        self.assertEqual(self.queue.fees.stats(), {"gas_hits": 7, "gas_estimates": 1, "fee_fetches": 1})
+        self.assertEqual(self.chain.nonces[self.queue.address.lower()], 8)
+
+    def test_resyncs_nonce_after_rejection(self):
+        self.queue.submit([(CONTRACT, b"\x00" * 4)], timeout=5, poll_interval=0)
+        # Transactions sent from the same key elsewhere
+        self.chain.nonces[self.queue.address.lower()] = 3
+
+        [rejected] = self.queue.submit([(CONTRACT, b"\x00" * 4)], timeout=5, poll_interval=0)
+        self.assertEqual((rejected.status, rejected.error), (FAILED, "nonce too low"))
+
+        [tx] = self.queue.submit([(CONTRACT, b"\x00" * 4)], timeout=5, poll_interval=0)
+        self.assertEqual((tx.nonce, tx.status), (3, MINED))
+
+    def test_estimate_failure_only_fails_that_transaction(self):
+        calls = [(CONTRACT, finalize_proposal_data(pid, True, b"\x01" * 32, b"proof")) for pid in range(4)]
+        self.chain.reverts.add(calls[0][1])
+        self.chain.reverts.add(calls[2][1])
+
+        txs = self.queue.submit(calls, timeout=5, poll_interval=0)
+
+        self.assertEqual([tx.status for tx in txs], [FAILED, MINED, FAILED, MINED])
+        self.assertEqual([tx.nonce for tx in txs], [None, 0, None, 1])
+        self.assertEqual(txs[0].error, "gas estimation failed: execution reverted")
+
+    def test_send_failure_releases_nonces(self):
+        batch_call = self.rpc.batch_call
+
+        def flaky(calls):
+            if calls[0][0] == "eth_sendRawTransaction":
+                raise ConnectionError("connection reset")
+            return batch_call(calls)
+
+        with patch.object(self.rpc, "batch_call", side_effect=flaky):
+            lost = self.queue.submit([(CONTRACT, b"\x00" * 4)] * 2, timeout=5, poll_interval=0)
+        self.assertEqual([(tx.status, tx.error) for tx in lost], [(FAILED, "connection reset")] * 2)
+
+        txs = self.queue.submit([(CONTRACT, b"\x00" * 4)] * 2, timeout=5, poll_interval=0)
+        self.assertEqual([(tx.nonce, tx.status) for tx in txs], [(0, MINED), (1, MINED)])
+
+
+class TestExecutorBatch(unittest.TestCase):
+    def test_finalize_and_verify_in_one_batch(self):
+        chain = FakeChainRPC({}).start()
+        self.addCleanup(chain.stop)
+        executor = NethermindExecutor(chain.url, private_key=PRIVATE_KEY, voting_address=CONTRACT,
+                                      verification_address=VERIFIER)
+        decisions = [
+            ({"proposal_id": 1, "ai_insights": {"risk": "low"}},
+             {"counts": {"inFavor": 5, "against": 2, "abstain": 0}, "votesRoot": "0x" + "ab" * 32,
+              "tee_proof": "0x0102030405060708"}),
+            ({"proposal_id": 2, "approved": False}, None)
+        ]
+
+        executions = executor.execute_dao_decisions(decisions, timeout=5, poll_interval=0)
+
+        self.assertEqual([e["approved"] for e in executions], [True, False])
+        self.assertTrue(all(e["success"] for e in executions))
+        self.assertEqual([len(e["transactions"]) for e in executions], [2, 1])
+        self.assertEqual(executor.provider.stats()["batches"], 7)
+
+        sent = sorted(chain.transactions.values(), key=lambda tx: tx["nonce"])
+        self.assertEqual([tx["data"][:4] for tx in sent],
+                         [FINALIZE_PROPOSAL_SELECTOR, VERIFY_TEE_RESULT_SELECTOR, FINALIZE_PROPOSAL_SELECTOR])
+        project_id, approved, _, proof = decode(["uint256", "bool", "bytes32", "bytes"], sent[0]["data"][4:])
+        self.assertEqual((project_id, approved, proof), (1, True, bytes(range(1, 9))))
+        self.assertEqual(decode(["bytes32", "bytes"], sent[1]["data"][4:])[0], b"\xab" * 32)
+
+    def test_concurrent_executions_wait_for_their_own_transactions(self):
+        chain = FakeChainRPC({}).start()
+        self.addCleanup(chain.stop)
+        executor = NethermindExecutor(chain.url, private_key=PRIVATE_KEY, voting_address=CONTRACT)
+        decisions = [{"proposal_id": pid, "approved": True} for pid in range(8)]
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            executions = list(pool.map(
+                lambda decision: executor.execute_dao_decisions([(decision, None)], timeout=5, poll_interval=0)[0],
+                decisions
+            ))
+
+        self.assertTrue(all(e["success"] for e in executions))
+        self.assertEqual(sorted(e["transactions"][0]["nonce"] for e in executions), list(range(8)))
+
+    def test_queue_is_created_once_across_threads(self):
+        executor = NethermindExecutor("http://127.0.0.1:1", private_key=PRIVATE_KEY, voting_address=CONTRACT)
+
+        def slow_queue(*args):
+            time.sleep(0.01)
+            return TransactionQueue(*args)
+
+        with patch("integrations.nethermind.eth_executor.TransactionQueue", side_effect=slow_queue) as created, \
+                ThreadPoolExecutor(max_workers=8) as pool:
+            queues = list(pool.map(lambda _: executor.queue, range(8)))
+
+        self.assertEqual(created.call_count, 1)
+        self.assertEqual({id(queue) for queue in queues}, {id(executor.queue)})
+
+    def test_executes_tee_verified_decision(self):
+        chain = FakeChainRPC({}).start()
+        self.addCleanup(chain.stop)
+        storage = InMemoryStorageManager()
+        executor = NethermindExecutor(chain.url, private_key=PRIVATE_KEY, voting_address=CONTRACT,
+                                      verification_address=VERIFIER, storage_manager=storage)
+        votes = [{"option": "inFavor"}] * 3 + [{"option": "against"}] * 2
+        queue = InsightJobQueue(FakeSecretLLM())
+        self.addCleanup(queue.shutdown)
+
+        with patch.object(marlin_tee, "insight_queue", queue):
+            execution = executor.execute_dao_decision({"proposal_id": 4, "votes": votes})
+
+        results = storage.kv["vote_results_4"]["results"]
+        self.assertEqual(results["counts"]["inFavor"], 3)
+        self.assertTrue(execution["approved"])
+        self.assertTrue(execution["success"])
+        sent = sorted(chain.transactions.values(), key=lambda tx: tx["nonce"])
+        self.assertEqual([tx["data"][:4] for tx in sent], [FINALIZE_PROPOSAL_SELECTOR, VERIFY_TEE_RESULT_SELECTOR])
+        _, _, _, proof = decode(["uint256", "bool", "bytes32", "bytes"], sent[0]["data"][4:])
+        self.assertEqual("0x" + proof.hex(), results["tee_proof"])
+        self.assertEqual("0x" + decode(["bytes32", "bytes"], sent[1]["data"][4:])[0].hex(), results["votesRoot"])
+
+
+if __name__ == "__main__":
+    unittest.main()
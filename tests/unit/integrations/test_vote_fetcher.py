@@ -0,0 +1,110 @@
+# tests/unit/integrations/test_vote_fetcher.py
+
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from integrations.chain.vote_fetcher import (
+    BatchRPCClient,
+    EncryptedVoteFetcher,
+    ENCRYPTED_VOTES_SELECTOR,
+    VoteFetchError,
+)
+
+CONTRACT = "0x32cB351C8562cB896FfbE7cc3bBc7cCEbbcb2aFb"
+
+
+def make_vote(project_id, index):
+    return bytes([index % 256]) + project_id.to_bytes(4, "big") + index.to_bytes(27, "big")
+
+
+class FakeChain:
+    """In-memory PrivateVoting state served over JSON-RPC"""
+
+    def __init__(self, votes_per_project, failing_indices=()):
+        self.votes = {
+            pid: [make_vote(pid, i) for i in range(n)] for pid, n in votes_per_project.items()
+        }
+        self.failing_indices = set(failing_indices)
+        self.batches = []
+        self.fetcher = EncryptedVoteFetcher(None, CONTRACT)
+
+    def handle(self, request):
+        method, params = request["method"], request["params"]
+        if method == "eth_blockNumber":
+            return {"result": "0x10"}
+        if method == "eth_getStorageAt":
+            for pid, votes in self.votes.items():
+                if int(params[1], 16) == self.fetcher._array_slot(pid):
+                    return {"result": "0x" + format(len(votes), "064x")}
+            return {"result": "0x" + "0" * 64}
+        if method == "eth_call":
+            data = params[0]["data"][2:]
+            assert data[:8] == ENCRYPTED_VOTES_SELECTOR
+            pid, index = int(data[8:72], 16), int(data[72:136], 16)
+            if index in self.failing_indices:
+                return {"error": {"code": -32000, "message": "execution reverted"}}
+            return {"result": "0x" + self.votes[pid][index].hex()}
+        return {"error": {"code": -32601, "message": "Method not found"}}
+
+
+def serve(chain):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            requests = body if isinstance(body, list) else [body]
+            chain.batches.append(len(requests))
+            replies = [dict(jsonrpc="2.0", id=r["id"], **chain.handle(r)) for r in requests]
+            payload = json.dumps(replies if isinstance(body, list) else replies[0]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class TestEncryptedVoteFetcher(unittest.TestCase):
+    def start(self, chain):
+        server = serve(chain)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return BatchRPCClient(f"http://127.0.0.1:{server.server_address[1]}")
+
+    def test_fetches_all_votes_in_chunks(self):
+        chain = FakeChain({7: 1050, 8: 3})
+        fetcher = EncryptedVoteFetcher(self.start(chain), CONTRACT, chunk_size=250, max_workers=3)
+
+        votes = fetcher.fetch(7)
+
+        self.assertEqual(votes, chain.votes[7])
+        # blockNumber + storage length + ceil(1050 / 250) vote batches
+        self.assertEqual(sorted(chain.batches), [1, 1, 50, 250, 250, 250, 250])
+
+    def test_empty_proposal(self):
+        chain = FakeChain({7: 0})
+        fetcher = EncryptedVoteFetcher(self.start(chain), CONTRACT)
+        self.assertEqual(fetcher.fetch(7), [])
+
+    def test_partial_failure_is_reported(self):
+        chain = FakeChain({7: 20}, failing_indices={3, 17})
+        fetcher = EncryptedVoteFetcher(self.start(chain), CONTRACT, chunk_size=8)
+
+        with self.assertRaises(VoteFetchError) as ctx:
+            fetcher.fetch(7)
+
+        error = ctx.exception
+        self.assertEqual(sorted(error.failures), [3, 17])
+        self.assertIsNone(error.votes[3])
+        self.assertEqual(error.votes[4], chain.votes[7][4])
+
+
+if __name__ == "__main__":
+    unittest.main()
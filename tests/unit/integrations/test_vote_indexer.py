@@ -0,0 +1,199 @@
+# tests/unit/integrations/test_vote_indexer.py
+
+import unittest
+
+from integrations.chain.vote_fetcher import ENCRYPTED_VOTES_SELECTOR, EncryptedVoteFetcher, RPCError
+from integrations.chain.vote_indexer import (
+    PROPOSAL_FINALIZED_TOPIC,
+    VOTE_CAST_TOPIC,
+    VoteIndexer,
+    VoteIndexStore,
+)
+
+CONTRACT = "0x32cB351C8562cB896FfbE7cc3bBc7cCEbbcb2aFb"
+VOTER = "0x" + "ab" * 20
+GENESIS_TIME = 1742428800
+
+
+class FakeRPC:
+    """In-process chain exposing the JSON-RPC methods used by the indexer"""
+
+    def __init__(self):
+        self.head = 0
+        self.fork = 0
+        # block number -> list of (project_id, vote or None, approved)
+        self.blocks = {}
+        self.hashes = {}
+        self.calls = []
+
+    def mine(self, *events):
+        self.head += 1
+        self.blocks[self.head] = list(events)
+        self.hashes[self.head] = "0x%032x%032x" % (self.fork, self.head)
+
+    def reorg(self, from_block, *events):
+        """Replace all blocks from `from_block` with a single block of new events"""
+        for number in list(self.blocks):
+            if number >= from_block:
+                del self.blocks[number]
+        self.fork += 1
+        self.head = from_block - 1
+        self.mine(*events)
+
+    def votes_at(self, project_id, block):
+        votes = []
+        for number in sorted(self.blocks):
+            if number <= block:
+                votes += [v for pid, v, _ in self.blocks[number] if pid == project_id and v is not None]
+        return votes
+
+    def handle(self, method, params):
+        self.calls.append(method)
+        if method == "eth_blockNumber":
+            return hex(self.head)
+        if method == "eth_getBlockByNumber":
+            number = int(params[0], 16)
+            return {"hash": self.hashes.get(number), "timestamp": hex(GENESIS_TIME + number * 12)}
+        if method == "eth_getStorageAt":
+            fetcher = EncryptedVoteFetcher(None, CONTRACT)
+            block = self.head if params[2] == "latest" else int(params[2], 16)
+            for pid in {pid for events in self.blocks.values() for pid, _, _ in events}:
+                if int(params[1], 16) == fetcher._array_slot(pid):
+                    return "0x%064x" % len(self.votes_at(pid, block))
+            return "0x" + "0" * 64
+        if method == "eth_call":
+            data = params[0]["data"][2:]
+            assert data[:8] == ENCRYPTED_VOTES_SELECTOR
+            pid, index = int(data[8:72], 16), int(data[72:136], 16)
+            block = self.head if params[1] == "latest" else int(params[1], 16)
+            return "0x" + self.votes_at(pid, block)[index].hex()
+        if method == "eth_getLogs":
+            query = params[0]
+            from_block, to_block = int(query["fromBlock"], 16), int(query["toBlock"], 16)
+            if to_block - from_block > 50:
+                raise RPCError(-32005, "query returned more than 10000 results")
+            logs = []
+            for number in range(from_block, to_block + 1):
+                for log_index, (pid, vote, approved) in enumerate(self.blocks.get(number, [])):
+                    if vote is not None:
+                        topics = [VOTE_CAST_TOPIC, "0x%064x" % pid, "0x" + "0" * 24 + VOTER[2:]]
+                        data = "0x"
+                    else:
+                        topics = [PROPOSAL_FINALIZED_TOPIC, "0x%064x" % pid]
+                        data = "0x%064x%s" % (int(approved), "cd" * 32)
+                    logs.append({"blockNumber": hex(number), "logIndex": hex(log_index),
+                                 "transactionHash": "0x%064x" % number, "topics": topics, "data": data})
+            return logs
+        raise RPCError(-32601, "Method not found")
+
+    def call(self, method, params):
+        return self.handle(method, params)
+
+    def batch_call(self, calls):
+        results = []
+        for method, params in calls:
+            try:
+                results.append(self.handle(method, params))
+            except RPCError as e:
+                results.append(e)
+        return results
+
+
+def vote(n):
+    return bytes([n]) * 32
+
+
+class TestVoteIndexer(unittest.TestCase):
+    def setUp(self):
+        self.rpc = FakeRPC()
+        self.store = VoteIndexStore(":memory:")
+        self.addCleanup(self.store.close)
+        self.indexer = VoteIndexer(self.rpc, CONTRACT, self.store, start_block=1,
+                                   confirmations=2, max_block_range=200)
+
+    def test_indexes_confirmed_votes_incrementally(self):
+        for i in range(120):
+            self.rpc.mine((7, vote(i % 256), None))
+        self.rpc.mine((8, vote(1), None), (7, None, True))
+
+        self.assertEqual(self.indexer.sync(), 119)
+        self.assertEqual(self.store.cursor_block(), 119)
+        self.assertEqual(self.store.votes(7), [vote(i) for i in range(119)])
+        self.assertIsNone(self.store.proposal(7))
+
+        # Only the new confirmed blocks are read on the next sync
+        self.rpc.mine()
+        self.rpc.mine()
+        self.rpc.calls.clear()
+        self.assertEqual(self.indexer.sync(), 2)
+        self.assertEqual(self.rpc.calls.count("eth_call"), 2)
+        self.assertEqual(self.store.votes(8), [vote(1)])
+        self.assertEqual(self.store.proposal(7)["approved"], True)
+
+    def test_listeners_receive_indexed_events(self):
+        events = []
+        self.indexer.add_listener(lambda event, project_id: events.append((event, project_id)))
+        self.rpc.mine((7, vote(1), None), (8, vote(2), None))
+        self.rpc.mine((7, None, False))
+        self.rpc.mine()
+        self.rpc.mine()
+        self.indexer.sync()
+
+        self.assertEqual(events, [("VoteCast", 7), ("VoteCast", 8), ("ProposalFinalized", 7)])
+
+    def test_votes_include_unconfirmed_tail(self):
+        for i in range(5):
+            self.rpc.mine((7, vote(i), None))
+        self.indexer.sync()
+
+        self.assertEqual(self.store.vote_count(7), 3)
+        self.assertEqual(self.indexer.votes(7), [vote(i) for i in range(5)])
+
+    def test_votes_are_stamped_with_block_timestamps(self):
+        for i in range(5):
+            self.rpc.mine((7, vote(i), None), (7, vote(i), None))
+        self.indexer.sync()
+
+        self.rpc.calls.clear()
+        votes, timestamps = self.indexer.votes_with_timestamps(7, start=1, block=hex(self.rpc.head))
+        self.assertEqual(len(votes), 9)
+        # Two votes per block; the unconfirmed tail gets the timestamp of the pinned block
+        expected = [(GENESIS_TIME + 12 * (i // 2 + 1)) * 1000 for i in range(1, 6)] + [(GENESIS_TIME + 60) * 1000] * 4
+        self.assertEqual(timestamps, expected)
+        # Indexed block headers come from the cache, only the head is read
+        self.assertEqual(self.rpc.calls.count("eth_getBlockByNumber"), 1)
+
+        # A fresh indexer on the same store does not fetch them again either
+        indexer = VoteIndexer(self.rpc, CONTRACT, self.store, start_block=1, confirmations=2)
+        self.rpc.calls.clear()
+        indexer.votes_with_timestamps(7, block=hex(3))
+        self.assertEqual(self.rpc.calls.count("eth_getBlockByNumber"), 0)
+
+    def test_vote_snapshot_reads_votes_blocks_and_count_together(self):
+        for i in range(5):
+            self.rpc.mine((7, vote(i), None), (8, vote(i), None))
+        self.indexer.sync()
+
+        votes, vote_blocks, count = self.store.vote_snapshot(7, start=1)
+        self.assertEqual(votes, [vote(1), vote(2)])
+        self.assertEqual(vote_blocks, [2, 3])
+        self.assertEqual(count, 3)
+        self.assertFalse(self.store._conn.in_transaction)
+
+    def test_reorg_rewinds_index(self):
+        for i in range(6):
+            self.rpc.mine((7, vote(i), None))
+        self.indexer.sync()
+        self.assertEqual(self.store.vote_count(7), 4)
+
+        # Blocks 4.. are replaced by a fork carrying a different vote
+        self.rpc.reorg(4, (7, vote(99), None))
+        self.rpc.mine()
+        self.rpc.mine()
+        self.indexer.sync()
+
+        self.assertEqual(self.store.votes(7), [vote(0), vote(1), vote(2), vote(99)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+# tests/unit/tee/test_auction.py
+
+import json
+import random
+import tracemalloc
+import unittest
+
+from tee.marlin_tee_integration import marlin_tee
+from tee.marlin_tee_integration.auction import FIRST_PRICE, TopBids, resolve_auction
+
+
+def make_bids(n, seed=3, high=10 ** 6):
+    rng = random.Random(seed)
+    return [{"bidder": f"0x{i:040x}", "amount": rng.randrange(1, high)} for i in range(n)]
+
+
+class FakeStorageManager:
+    def __init__(self):
+        self.kv = {}
+        self.uploads = {}
+
+    def upload_data(self, data, filename="upload.bin"):
+        self.uploads[filename] = b"".join(data)
+        return {"rootHash": "0xroot"}
+
+    def store_metadata(self, key, value):
+        self.kv[key] = value
+
+
+class TestTopBids(unittest.TestCase):
+    def test_matches_sorting(self):
+        for seed in range(20):
+            # A narrow amount range forces plenty of ties
+            bids = make_bids(500, seed=seed, high=50)
+            top = TopBids(k=3)
+            for sequence, bid in enumerate(bids):
+                top.add(bid["amount"], sequence, bid["bidder"])
+            expected = sorted(enumerate(bids), key=lambda b: (-b[1]["amount"], b[0]))[:3]
+            self.assertEqual(top.top(), [(b["amount"], b["bidder"]) for _, b in expected])
+
+    def test_one_entry_per_bidder(self):
+        top = TopBids(k=2)
+        for sequence, (amount, bidder) in enumerate([(10, "a"), (5, "b"), (10, "a"), (12, "a"), (7, "c")]):
+            top.add(amount, sequence, bidder)
+        self.assertEqual(top.top(), [(12, "a"), (7, "c")])
+
+
+class TestResolveAuction(unittest.TestCase):
+    def test_second_price(self):
+        bids = [{"bidder": "0xa", "amount": 30}, json.dumps({"bidder": "0xb", "amount": "0x32"}),
+                ("0xc", b"\0" * 31 + b"\x28"), "not json", {"bidder": "0xd", "amount": 0}]
+        result = resolve_auction(bids, chunk_size=2)
+        self.assertEqual((result["winner"], result["highestBid"]), ("0xb", 50))
+        self.assertEqual((result["runnerUp"], result["winningAmount"]), ("0xc", 40))
+        self.assertEqual((result["bid_count"], result["invalid_bids"]), (5, 2))
+
+    def test_first_price_and_reserve(self):
+        bids = [{"bidder": "0xa", "amount": 30}, {"bidder": "0xb", "amount": 10}]
+        self.assertEqual(resolve_auction(bids, pricing=FIRST_PRICE)["winningAmount"], 30)
+        result = resolve_auction(bids, reserve_price=20)
+        self.assertEqual((result["winner"], result["runnerUp"], result["winningAmount"]), ("0xa", None, 20))
+        self.assertIsNone(resolve_auction([])["winner"])
+
+    def test_streaming_memory_is_bounded(self):
+        def stream(n):
+            rng = random.Random(5)
+            for i in range(n):
+                yield {"bidder": f"0x{i:040x}", "amount": rng.randrange(1, 10 ** 9)}
+
+        tracemalloc.start()
+        try:
+            resolve_auction(stream(50000), chunk_size=1000)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, 1024 * 1024)
+
+    def test_results_can_be_stored(self):
+        from integrations.og_storage.storage_utils import store_auction_results
+
+        results = marlin_tee.process_auction_bids(make_bids(100), 7)
+        manager = FakeStorageManager()
+        self.assertEqual(store_auction_results(7, results, storage_manager=manager), "0xroot")
+        self.assertEqual(manager.kv["auction_7"]["winner"], results["winner"])
+        self.assertEqual(manager.kv["auction_7"]["winning_amount"], results["winning_bid"])
+        self.assertEqual(json.loads(manager.uploads["auction_results_7.json"])["tee_proof"], results["tee_proof"])
+
+
+if __name__ == "__main__":
+    unittest.main()
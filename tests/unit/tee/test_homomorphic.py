@@ -0,0 +1,95 @@
+# tests/unit/tee/test_homomorphic.py
+
+import json
+import os
+import random
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from tee.marlin_tee_integration import homomorphic, marlin_tee
+from tee.marlin_tee_integration.homomorphic import (
+    HomomorphicTally,
+    PaillierPrivateKey,
+    encrypt_votes_fast,
+)
+
+# Small keys keep the tests fast; the arithmetic is the same at 2048 bits
+KEY = PaillierPrivateKey.generate(512)
+
+
+class TestPaillier(unittest.TestCase):
+    def test_round_trip_and_addition(self):
+        public_key = KEY.public_key
+        a, b = public_key.encrypt(1234), public_key.encrypt(4321)
+        self.assertNotEqual(public_key.encrypt(1234), a)
+        self.assertEqual(KEY.decrypt(a), 1234)
+        self.assertEqual(KEY.decrypt(public_key.add(a, b, public_key.encrypt(0))), 5555)
+        with self.assertRaises(ValueError):
+            public_key.encrypt(public_key.n)
+
+    def test_key_serialization(self):
+        restored = PaillierPrivateKey.from_dict(json.loads(json.dumps(KEY.to_dict())))
+        self.assertEqual(restored.decrypt(KEY.public_key.encrypt(77)), 77)
+
+
+class TestHomomorphicTally(unittest.TestCase):
+    def setUp(self):
+        self.context = HomomorphicTally(KEY, extra_options=["veto"], chunk_size=50)
+        rng = random.Random(3)
+        self.options = [rng.choice(self.context.option_names) for _ in range(400)]
+        self.expected = {name: self.options.count(name) for name in ("inFavor", "against", "abstain", "veto")}
+
+    def test_tally_matches_plaintext_counts(self):
+        ciphertexts = [self.context.encrypt_vote(option) for option in self.options[:40]]
+        expected = {name: self.options[:40].count(name) for name in self.expected}
+        self.assertEqual(self.context.tally(ciphertexts, workers=1), expected)
+        # Hex strings and bytes are accepted too
+        mixed = [hex(c) if i % 2 else c.to_bytes(128, "big") for i, c in enumerate(ciphertexts)]
+        self.assertEqual(self.context.tally(mixed, workers=1), expected)
+
+    def test_process_pool_matches_single_process(self):
+        ciphertexts = encrypt_votes_fast(self.context, self.options)
+        self.assertEqual(self.context.tally(ciphertexts, workers=1), self.expected)
+        self.assertEqual(self.context.tally(ciphertexts, workers=3), self.expected)
+        self.assertEqual(list(self.context.tally(ciphertexts, workers=1)), ["inFavor", "against", "abstain", "veto"])
+
+    def test_rejects_invalid_ciphertexts(self):
+        with self.assertRaises(ValueError):
+            self.context.aggregate([0])
+        with self.assertRaises(ValueError):
+            self.context.aggregate([KEY.public_key.n_sq])
+
+    def test_tally_encrypted_votes(self):
+        ciphertexts = encrypt_votes_fast(self.context, self.options)
+        result = marlin_tee.tally_encrypted_votes(ciphertexts, "PROP-1", context=self.context, workers=1)
+        self.assertEqual(result["counts"], self.expected)
+        self.assertEqual(result["total"], 400)
+        self.assertRegex(result["tee_proof"], r"^0x[0-9a-f]{64}$")
+
+
+class TestDefaultTally(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(homomorphic, "_default_tally", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_ephemeral_key_is_not_published(self):
+        with patch.dict(os.environ, {"HOMOMORPHIC_KEY_BITS": "512"}):
+            os.environ.pop("HOMOMORPHIC_KEY_PATH", None)
+            with self.assertRaises(RuntimeError):
+                marlin_tee.setup_seal_context(require_persistent_key=True)
+            self.assertIsNone(homomorphic._default_tally)
+
+    def test_persistent_key_survives_restart(self):
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch.dict(os.environ, {"HOMOMORPHIC_KEY_PATH": os.path.join(tmp, "key.json"),
+                                        "HOMOMORPHIC_KEY_BITS": "512"}):
+            public_key = marlin_tee.setup_seal_context(require_persistent_key=True).public_key
+            homomorphic._default_tally = None
+            restarted = marlin_tee.setup_seal_context(require_persistent_key=True)
+        self.assertEqual(restarted.private_key.decrypt(public_key.encrypt(42)), 42)
+
+
+if __name__ == "__main__":
+    unittest.main()
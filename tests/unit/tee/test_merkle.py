@@ -0,0 +1,134 @@
+# tests/unit/tee/test_merkle.py
+
+import json
+import os
+import unittest
+from unittest.mock import patch
+
+from tee.marlin_tee_integration.merkle import (
+    MerkleAccumulator,
+    MerkleTree,
+    hash_leaf,
+    hash_node,
+    mix_in_size,
+    to_hex,
+    verify_proof,
+    verify_proofs,
+)
+from tee.marlin_tee_integration.vote_batch import TallyAccumulator, VoteBatch, vote_leaves
+
+
+def leaves(n, offset=0):
+    return [hash_leaf((offset + i).to_bytes(32, "big")) for i in range(n)]
+
+
+class TestMerkleAccumulator(unittest.TestCase):
+    def test_root_matches_tree_for_every_size(self):
+        accumulator = MerkleAccumulator()
+        tree = MerkleTree()
+        self.assertEqual(accumulator.root(), tree.root())
+        for leaf in leaves(70):
+            accumulator.append(leaf)
+            tree.extend([leaf])
+            self.assertEqual(accumulator.root(), tree.root(), accumulator.size)
+            self.assertEqual(tree.root(), MerkleTree(tree.levels[0]).root())
+
+    def test_known_small_root(self):
+        a, b, c = leaves(3)
+        expected = hash_node(hash_node(a, b), hash_node(c, bytes(32)))
+        self.assertEqual(MerkleAccumulator().extend([a, b, c]).root(), to_hex(mix_in_size(expected, 3)))
+
+    def test_merge_aligned_shards(self):
+        values = leaves(45)
+        single = MerkleAccumulator().extend(values)
+        merged = MerkleAccumulator().extend(values[:32]).merge(MerkleAccumulator().extend(values[32:]))
+        self.assertEqual(merged.root(), single.root())
+        self.assertEqual(MerkleAccumulator().merge(single).root(), single.root())
+        with self.assertRaises(ValueError):
+            MerkleAccumulator().extend(values[:5]).merge(MerkleAccumulator().extend(values[5:]))
+
+    def test_state_round_trip(self):
+        accumulator = MerkleAccumulator().extend(leaves(13))
+        restored = MerkleAccumulator.from_dict(json.loads(json.dumps(accumulator.to_dict())))
+        restored.extend(leaves(9, offset=13))
+        self.assertEqual(restored.root(), MerkleAccumulator().extend(leaves(22)).root())
+
+
+class TestMerkleTree(unittest.TestCase):
+    def test_every_proof_verifies(self):
+        for size in (1, 2, 3, 8, 13):
+            tree = MerkleTree(leaves(size))
+            for index in range(size):
+                proof = tree.proof(index)
+                self.assertEqual(len(proof["siblings"]), (size - 1).bit_length())
+                self.assertTrue(verify_proof(proof, tree.root()), (size, index))
+
+    def test_proofs_against_an_earlier_size(self):
+        tree = MerkleTree(leaves(20))
+        tree.extend(leaves(30, offset=20), start=20)
+        tree.extend(leaves(40)[-15:], start=25)  # overlap with leaves already in the tree is skipped
+        self.assertEqual(tree.size, 50)
+        earlier = MerkleAccumulator().extend(leaves(21)).root()
+        for index in (0, 7, 20):
+            proof = tree.proof(index, size=21)
+            self.assertEqual(proof["root"], earlier)
+            self.assertTrue(verify_proof(proof, earlier))
+        with self.assertRaises(IndexError):
+            tree.proof(21, size=21)
+        with self.assertRaises(ValueError):
+            tree.proof(0, size=51)
+
+    def test_tampered_proofs_fail(self):
+        tree = MerkleTree(leaves(11))
+        proof = tree.proof(6)
+        forged_leaf = dict(proof, leaf=to_hex(hash_leaf(os.urandom(32))))
+        wrong_index = dict(proof, index=7)
+        wrong_size = dict(proof, size=12)
+        short = dict(proof, siblings=proof["siblings"][:-1])
+        self.assertEqual(verify_proofs([forged_leaf, wrong_index, wrong_size, short, {"index": 1}, proof]),
+                         [False, False, False, False, False, True])
+        self.assertFalse(verify_proof(proof, MerkleTree(leaves(10)).root()))
+
+    def test_batch_verification_shares_paths(self):
+        tree = MerkleTree(leaves(300))
+        proofs = tree.proofs(range(0, 300, 3))
+        forged = dict(proofs[5], leaf=proofs[6]["leaf"])
+        results = verify_proofs(proofs + [forged, proofs[0]])
+        self.assertTrue(all(results[:-2]))
+        self.assertEqual(results[-2:], [False, True])
+
+
+class TestVoteCommitment(unittest.TestCase):
+    def test_accumulator_commits_to_votes(self):
+        votes = [os.urandom(32) for _ in range(50)]
+        tally = TallyAccumulator().add(VoteBatch.from_votes(votes[:20])).add(VoteBatch.from_votes(votes[20:]))
+        tree = MerkleTree(vote_leaves(VoteBatch.from_votes(votes)))
+        self.assertEqual(tally.merkle.root(), tree.root())
+        self.assertEqual(tree.proof(0)["leaf"], to_hex(hash_leaf(votes[0])))
+
+        swapped = votes[1:2] + votes[:1] + votes[2:]
+        self.assertNotEqual(TallyAccumulator().add(VoteBatch.from_votes(swapped)).merkle.root(), tally.merkle.root())
+
+    def test_commitment_is_built_lazily(self):
+        votes = [os.urandom(32) for _ in range(40)]
+        with patch("tee.marlin_tee_integration.vote_batch.vote_leaves") as hashed:
+            tally = TallyAccumulator().add(VoteBatch.from_votes(votes[:16])).add(VoteBatch.from_votes(votes[16:]))
+            resumed = TallyAccumulator.from_dict(json.loads(json.dumps(tally.to_dict(commit=False))))
+            hashed.assert_not_called()
+        self.assertEqual(tally.merkle.root(), MerkleTree(vote_leaves(VoteBatch.from_votes(votes))).root())
+
+        # A snapshot left uncommitted still tallies, but has nothing to attest
+        self.assertFalse(resumed.committed)
+        self.assertEqual(resumed.add(VoteBatch.from_votes(votes[:1])).total, 41)
+        with self.assertRaises(ValueError):
+            resumed.merkle
+
+    def test_json_votes_commit_to_option_names(self):
+        first = VoteBatch.from_votes([{"option": "veto", "timestamp": 1}, {"option": "rework", "timestamp": 1}])
+        second = VoteBatch.from_votes([{"option": "rework", "timestamp": 1}])
+        self.assertEqual(vote_leaves(first)[1], vote_leaves(second)[0])
+        self.assertNotEqual(vote_leaves(first)[0], vote_leaves(second)[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,280 @@
+# tests/unit/tee/test_vote_batch.py
+
+import json
+import os
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from ai.nillion_integration.insight_jobs import InsightJobQueue
+from ai.nillion_integration.secret_llm import FakeSecretLLM
+from benchmarks.fakes import InMemoryStorageManager
+from tee.marlin_tee_integration import marlin_tee
+from tee.marlin_tee_integration.vote_batch import (
+    DAY_MS,
+    HOUR_MS,
+    MINUTE_MS,
+    TallyAccumulator,
+    VoteBatch,
+    bucket_timeline,
+    decode_options,
+    tally,
+    timeline_dict,
+    vote_counts_dict,
+)
+
+NOW_MS = 1742461234567
+
+MIXED_VOTES = [
+    {"option": "inFavor", "timestamp": 1742450000000},
+    {"option": "against", "timestamp": 1742453600000},
+    {"option": "inFavor", "timestamp": 1742457200000},
+    {"option": "abstain", "timestamp": 1742457200000},
+    "0x1a7b2c3d4e5f6789",
+    "0x0d5f6a7b8c9d0e1f",
+    "0x2c3d4e5f6a7b8c9d",
+]
+
+EDGE_VOTES = MIXED_VOTES + [
+    bytes([5]) * 32,
+    bytearray([4, 1]),
+    b"",
+    "0x",
+    "0x1",
+    "0xzzzz",
+    "0x 1a ",
+    "0x1_2a",
+    '{"option": "veto", "timestamp": 1000}',
+    {"option": "veto"},
+    {"option": ["unhashable"]},
+    {"option": "against", "timestamp": 7200000.5},
+    {"option": "against", "timestamp": True},
+    {"timestamp": None},
+    {"option": 3, "timestamp": 2**70},
+    "not json",
+    None,
+    42,
+]
+
+
+def legacy_counts_and_timeline(encrypted_votes):
+    """The original per-vote loop of process_votes_in_tee, kept as a reference"""
+    vote_counts = {'inFavor': 0, 'against': 0, 'abstain': 0}
+    timeline_data = {}
+    for vote in encrypted_votes:
+        if isinstance(vote, (bytes, bytearray)) or (isinstance(vote, str) and vote.startswith('0x')):
+            try:
+                if isinstance(vote, str):
+                    vote_value = int(vote[2:6], 16) % 3
+                else:
+                    vote_value = vote[0] % 3
+                vote_option = {0: 'against', 1: 'inFavor', 2: 'abstain'}[vote_value]
+                vote_counts[vote_option] += 1
+                hour = int(time.time() * 1000) // 3600000 * 3600000
+                timeline_data[hour] = timeline_data.get(hour, 0) + 1
+            except Exception:
+                vote_counts['inFavor'] += 1
+        else:
+            try:
+                parsed_vote = vote if isinstance(vote, dict) else json.loads(vote)
+                option = parsed_vote.get('option', 'inFavor')
+                vote_counts[option] = vote_counts.get(option, 0) + 1
+                timestamp = parsed_vote.get('timestamp', int(time.time() * 1000))
+                hour = timestamp // 3600000 * 3600000
+                if hour not in timeline_data:
+                    timeline_data[hour] = 0
+                timeline_data[hour] += 1
+            except Exception:
+                pass
+    return vote_counts, timeline_data
+
+
+def columnar_counts_and_timeline(votes):
+    batch = VoteBatch.from_votes(votes, now_ms=NOW_MS)
+    return vote_counts_dict(batch, tally(batch, decode_options(batch))), timeline_dict(batch)
+
+
+class TestVoteBatch(unittest.TestCase):
+    def assertSameAsLegacy(self, votes):
+        with patch("time.time", return_value=NOW_MS / 1000):
+            expected = legacy_counts_and_timeline(votes)
+        with patch("builtins.print"):
+            actual = columnar_counts_and_timeline(votes)
+        # Same keys, values and ordering once serialized
+        self.assertEqual(json.dumps(actual), json.dumps(expected))
+        self.assertEqual([type(k) for k in actual[1]], [type(k) for k in expected[1]])
+
+    def test_mixed_votes_match_legacy_loop(self):
+        self.assertSameAsLegacy(MIXED_VOTES)
+
+    def test_edge_cases_match_legacy_loop(self):
+        self.assertSameAsLegacy(EDGE_VOTES)
+
+    def test_bytes32_fast_path(self):
+        votes = [bytes([i % 256]) + os.urandom(31) for i in range(3000)]
+        self.assertSameAsLegacy(votes)
+        batch = VoteBatch.from_votes(votes, now_ms=NOW_MS)
+        self.assertTrue(batch.payload.flags["C_CONTIGUOUS"])
+        self.assertEqual(batch.payload.shape, (3000, 32))
+
+    def test_million_bytes32_votes_tally_quickly(self):
+        votes = [bytes([i % 256]) * 32 for i in range(1_000_000)]
+        start = time.perf_counter()
+        batch = VoteBatch.from_votes(votes)
+        counts = tally(batch)
+        elapsed = time.perf_counter() - start
+        self.assertEqual(int(counts.sum()), 1_000_000)
+        self.assertLess(elapsed, 1.0)
+
+    def test_process_votes_in_tee_results(self):
+        llm = FakeSecretLLM()
+        with patch.object(marlin_tee, "insight_queue", InsightJobQueue(llm)) as queue, \
+                patch("integrations.og_storage.storage_manager.StorageManager") as storage, \
+                patch.object(llm, "analyze_voting_patterns", wraps=llm.analyze_voting_patterns) as analyze:
+            manager = storage.return_value
+            manager.retrieve_metadata.side_effect = lambda key: manager.store_metadata.call_args.args[1]
+            result = marlin_tee.process_votes_in_tee(MIXED_VOTES, "PROP-123", wait_for_insights=True)
+            queue.shutdown()
+
+        self.assertEqual(result["results"]["counts"], {"inFavor": 2, "against": 3, "abstain": 2})
+        self.assertEqual(result["results"]["total"], 7)
+        self.assertEqual(result["storage_key"], "vote_results_PROP-123")
+        self.assertRegex(result["tee_proof"], r"^0x[0-9a-f]{64}$")
+        self.assertEqual(result["insights_status"], "done")
+        self.assertIn("leading option against", result["ai_insights"])
+        # Results are stored right away, then again once the insights are ready
+        stored = [c.args[1] for c in storage.return_value.store_metadata.call_args_list]
+        self.assertEqual([s["ai_insights"] for s in stored], [None, result["ai_insights"]])
+        timeline = analyze.call_args[0][0]["voting_timeline"]
+        self.assertEqual(timeline[1742446800000], 1)
+
+
+class TestTimelines(unittest.TestCase):
+    def test_buckets_match_naive_count(self):
+        rng = np.random.default_rng(4)
+        timestamps = NOW_MS - rng.integers(0, 10 * DAY_MS, 5000)
+        batch = VoteBatch.from_bytes32(bytes(32 * 5000), timestamps=timestamps)
+
+        buckets = bucket_timeline(batch)
+        for name, size in (("minute", MINUTE_MS), ("hour", HOUR_MS), ("day", DAY_MS)):
+            naive = {}
+            for timestamp in sorted(timestamps.tolist()):
+                naive[timestamp // size * size] = naive.get(timestamp // size * size, 0) + 1
+            starts, counts = buckets[name]
+            self.assertEqual(dict(zip(starts.tolist(), counts.tolist())), naive)
+            self.assertEqual(list(naive), starts.tolist())
+
+        # The hour timeline comes from the same pass, in order of first appearance
+        first_seen = {}
+        for timestamp in timestamps.tolist():
+            first_seen[timestamp // HOUR_MS * HOUR_MS] = first_seen.get(timestamp // HOUR_MS * HOUR_MS, 0) + 1
+        self.assertEqual(list(timeline_dict(batch).items()), list(first_seen.items()))
+
+    def test_incremental_timelines(self):
+        votes = [bytes([i % 256]) * 32 for i in range(300)]
+        timestamps = [NOW_MS + i * 17 * MINUTE_MS for i in range(300)]
+        accumulator = TallyAccumulator()
+        for start in range(0, 300, 70):
+            accumulator.add(VoteBatch.from_votes(votes[start:start + 70], timestamps=timestamps[start:start + 70]))
+
+        single = TallyAccumulator().add(VoteBatch.from_votes(votes, timestamps=timestamps))
+        self.assertEqual(accumulator.timelines_dict(), single.timelines_dict())
+        timelines = single.timelines_dict()
+        self.assertEqual(sum(timelines["minute"].values()), 300)
+        self.assertEqual(len(timelines["day"]), 4)
+        self.assertEqual(timelines["hour"], dict(sorted(single.timeline_dict().items())))
+
+        restored = TallyAccumulator.from_dict(json.loads(json.dumps(single.to_dict())))
+        self.assertEqual(restored.timelines_dict(), timelines)
+
+
+class TestTallyAccumulator(unittest.TestCase):
+    def single_pass(self, votes):
+        with patch("builtins.print"):
+            return columnar_counts_and_timeline(votes)
+
+    def accumulate(self, *chunks):
+        accumulator = TallyAccumulator()
+        with patch("builtins.print"):
+            for chunk in chunks:
+                accumulator.add(VoteBatch.from_votes(chunk, now_ms=NOW_MS))
+        return accumulator
+
+    def test_incremental_adds_match_single_pass(self):
+        accumulator = self.accumulate(EDGE_VOTES[:5], EDGE_VOTES[5:12], EDGE_VOTES[12:])
+        counts, timeline = self.single_pass(EDGE_VOTES)
+        self.assertEqual(json.dumps(accumulator.counts_dict()), json.dumps(counts))
+        self.assertEqual(json.dumps(accumulator.timeline_dict()), json.dumps(timeline))
+        self.assertEqual(accumulator.total, len(EDGE_VOTES))
+
+    def test_merge_shards(self):
+        merged = self.accumulate(EDGE_VOTES[:16]).merge(self.accumulate(EDGE_VOTES[16:]))
+        expected = self.accumulate(EDGE_VOTES)
+        self.assertEqual(merged.to_dict(), expected.to_dict())
+        # The vote commitments only combine at aligned shard boundaries
+        with self.assertRaises(ValueError):
+            self.accumulate(EDGE_VOTES[:9]).merge(self.accumulate(EDGE_VOTES[9:]))
+
+    def test_snapshot_round_trip_through_json(self):
+        accumulator = self.accumulate(EDGE_VOTES)
+        restored = TallyAccumulator.from_dict(json.loads(json.dumps(accumulator.to_dict())))
+        self.assertEqual(restored.counts_dict(), accumulator.counts_dict())
+        self.assertEqual(list(restored.timeline_dict()), list(accumulator.timeline_dict()))
+        self.assertEqual(restored.total, accumulator.total)
+
+        with self.assertRaises(ValueError):
+            TallyAccumulator.from_dict({"version": 99})
+
+    def test_process_votes_in_tee_resumes_from_stored_snapshot(self):
+        stored = {}
+
+        class FakeStorageManager:
+            def store_metadata(self, key, value):
+                stored[key] = json.loads(json.dumps(value))
+
+            def retrieve_metadata(self, key):
+                return stored.get(key)
+
+        with patch.object(marlin_tee, "insight_queue", InsightJobQueue(FakeSecretLLM())), \
+                patch("integrations.og_storage.storage_manager.StorageManager", FakeStorageManager):
+            full = marlin_tee.process_votes_in_tee(MIXED_VOTES, 9)
+            marlin_tee.process_votes_in_tee(MIXED_VOTES[:4], 9)
+            snapshot = marlin_tee.load_tally_snapshot(9, FakeStorageManager())
+            self.assertEqual(snapshot.total, 4)
+            resumed = marlin_tee.process_votes_in_tee(MIXED_VOTES[4:], 9, accumulator=snapshot)
+
+        self.assertEqual(resumed["results"], full["results"])
+        self.assertEqual(resumed["results"]["votesRoot"], self.accumulate(MIXED_VOTES).merkle.root())
+        self.assertEqual(snapshot.total, 4)
+        self.assertIsNone(marlin_tee.load_tally_snapshot(10, FakeStorageManager()))
+
+    def test_late_insights_do_not_overwrite_a_newer_tally(self):
+        storage = InMemoryStorageManager()
+        queue = InsightJobQueue(FakeSecretLLM())
+        self.addCleanup(queue.shutdown)
+        release = threading.Event()
+        analyze = queue.llm.analyze_voting_patterns
+
+        def slow_analyze(payload):
+            if payload["total_votes"] == 4:
+                release.wait(5)
+            return analyze(payload)
+
+        with patch.object(marlin_tee, "insight_queue", queue), \
+                patch.object(queue.llm, "analyze_voting_patterns", side_effect=slow_analyze):
+            old = marlin_tee.process_votes_in_tee(MIXED_VOTES[:4], 9, storage_manager=storage)
+            new = marlin_tee.process_votes_in_tee(MIXED_VOTES, 9, storage_manager=storage, wait_for_insights=5)
+            release.set()
+            queue.shutdown()
+
+        stored = storage.kv["vote_results_9"]
+        self.assertEqual(stored["results"]["total"], 7)
+        self.assertEqual(stored["ai_insights"], new["ai_insights"])
+        self.assertEqual(queue.get(old["insights_job"]).status, "done")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+# tests/unit/test_benchmarks.py
+
+import unittest
+
+from benchmarks import harness
+
+
+def result(ops_per_s, peak):
+    return {"ops_per_s": ops_per_s, "peak_alloc_bytes": peak}
+
+
+class TestHarness(unittest.TestCase):
+    def test_measure_reports_throughput_and_allocations(self):
+        case = harness.Case("alloc", lambda n: ((lambda: bytearray(n)), 1, None), {"n": 1 << 20})
+        measured = harness.measure(case, repeat=2, warmup=0)
+        self.assertGreater(measured["ops_per_s"], 0)
+        self.assertGreaterEqual(measured["peak_alloc_bytes"], 1 << 20)
+        self.assertEqual(case.id, "alloc[n=1048576]")
+
+    def test_peak_allocation_is_the_median_of_traced_runs(self):
+        sizes = iter([0, 1 << 20, 8 << 20, 2 << 20])
+        case = harness.Case("noisy", lambda: ((lambda: bytearray(next(sizes))), 1, None))
+        measured = harness.measure(case, repeat=1, warmup=0, alloc_repeat=3)
+        self.assertGreaterEqual(measured["peak_alloc_bytes"], 2 << 20)
+        self.assertLess(measured["peak_alloc_bytes"], 4 << 20)
+
+    def test_compare_flags_slowdowns_and_allocation_growth(self):
+        baseline = {"results": {"a": result(1000, 10 << 20), "b": result(1000, 1000), "gone": result(1, 1)}}
+        current = {"results": {"a": result(600, 13 << 20), "b": result(800, 50_000), "new": result(1, 1)}}
+
+        regressions = harness.compare(current, baseline, time_tolerance=0.3, alloc_tolerance=0.2)
+
+        self.assertEqual(
+            [(r["case"], r["metric"]) for r in regressions],
+            [("a", "ops_per_s"), ("a", "peak_alloc_bytes")]
+        )
+        self.assertAlmostEqual(regressions[0]["change"], -0.4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,239 @@
+# tests/unit/test_fetch_proposals.py
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+os.environ.setdefault("VOTE_INDEX_PATH", ":memory:")
+os.environ.setdefault("VOTE_INDEXER_ENABLED", "false")
+
+import httpx
+from fastapi.testclient import TestClient
+
+import fetch_proposals
+from ai.nillion_integration.insight_jobs import InsightJobQueue
+from ai.nillion_integration.secret_llm import FakeSecretLLM
+from benchmarks.fakes import CONTRACT, FakeChainRPC, InMemoryStorageManager, make_vote
+from integrations.chain.vote_indexer import VoteIndexer, VoteIndexStore
+from tee.marlin_tee_integration import marlin_tee
+
+
+class TestResultsEndpoint(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        fetch_proposals.results_cache.clear()
+        self.calls = 0
+        self.release = threading.Event()
+
+    def slow_process(self, project_id, state=None):
+        self.calls += 1
+        self.release.wait(5)
+        return {"results": {"proposalId": project_id, "total": 3}}
+
+    def client(self):
+        transport = httpx.ASGITransport(app=fetch_proposals.app)
+        return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+    async def test_concurrent_requests_are_coalesced(self):
+        with patch.object(fetch_proposals, "process_chain_proposal", self.slow_process):
+            async with self.client() as client:
+                requests = [client.get("/api/proposal/7/results?refresh=true") for _ in range(20)]
+                pending = asyncio.gather(*requests)
+                await asyncio.sleep(0.1)
+                self.release.set()
+                responses = await pending
+
+        self.assertEqual({r.status_code for r in responses}, {200})
+        self.assertEqual(self.calls, 1)
+        self.assertIn(7, fetch_proposals.results_cache)
+
+    async def test_event_loop_stays_responsive(self):
+        with patch.object(fetch_proposals, "process_chain_proposal", self.slow_process):
+            async with self.client() as client:
+                slow = asyncio.ensure_future(client.get("/api/proposal/8/results"))
+                await asyncio.sleep(0.05)
+                start = time.perf_counter()
+                root = await client.get("/")
+                elapsed = time.perf_counter() - start
+                self.release.set()
+                await slow
+
+        self.assertEqual(root.status_code, 200)
+        self.assertLess(elapsed, 1.0)
+
+    async def test_missing_proposal_returns_404(self):
+        with patch.object(fetch_proposals, "process_chain_proposal", return_value=None):
+            async with self.client() as client:
+                response = await client.get("/api/proposal/9/results")
+        self.assertEqual(response.status_code, 404)
+
+    async def test_insights_job_endpoints(self):
+        queue = InsightJobQueue(FakeSecretLLM())
+        self.addCleanup(queue.shutdown)
+        job = queue.submit(7, {"proposal_id": 7, "total_votes": 1, "vote_distribution": {"inFavor": 1}})
+        job.wait(5)
+
+        with patch.object(marlin_tee, "insight_queue", queue):
+            async with self.client() as client:
+                by_id = await client.get(f"/api/insights/{job.job_id}")
+                by_proposal = await client.get("/api/proposal/7/insights")
+                missing = await client.get("/api/insights/unknown")
+
+        self.assertEqual(by_id.json()["status"], "done")
+        self.assertEqual(by_proposal.json()["job_id"], job.job_id)
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_public_key_requires_persistent_key(self):
+        with patch.dict(os.environ):
+            os.environ.pop("HOMOMORPHIC_KEY_PATH", None)
+            async with self.client() as client:
+                response = await client.get("/api/tee/public-key")
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("HOMOMORPHIC_KEY_PATH", response.json()["detail"])
+
+    async def test_metrics_endpoint(self):
+        with patch.object(fetch_proposals, "load_tally_snapshot", return_value=None), \
+                patch.object(fetch_proposals, "fetch_proposal_votes", return_value=[]):
+            async with self.client() as client:
+                await client.get("/api/proposal/10/results")
+                await client.get("/api/proposal/10/results")
+                response = await client.get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn('vote_stage_duration_seconds_count{stage="chain_fetch"}', response.text)
+        self.assertIn('vote_stage_duration_seconds_bucket{stage="total",le="+Inf"}', response.text)
+        self.assertIn("# TYPE results_cache_misses_total counter", response.text)
+
+
+class TestBulkProcessing(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        fetch_proposals.results_cache.clear()
+        self.chain = FakeChainRPC({1: 40, 2: 0, 3: 15}).start()
+        self.addCleanup(self.chain.stop)
+
+        components = fetch_proposals.Components(rpc_url=self.chain.url, contract_address=CONTRACT)
+        components.vote_indexer = VoteIndexer(
+            components.rpc_client, CONTRACT, VoteIndexStore(":memory:"), fetcher=components.vote_fetcher
+        )
+        components.vote_fetcher.chunk_size = 10
+        components.storage_manager = InMemoryStorageManager()
+        self.components = components
+        self.addCleanup(components.close)
+
+        queue = InsightJobQueue(FakeSecretLLM())
+        self.addCleanup(queue.shutdown)
+        for target, name, value in ((fetch_proposals, "components", components), (marlin_tee, "insight_queue", queue)):
+            patcher = patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_parse_proposal_ids(self):
+        self.assertEqual(fetch_proposals.parse_proposal_ids("3, 1-4,9"), [3, 1, 2, 4, 9])
+        for spec in ("", "a", "5-2", "1-100000000"):
+            with self.assertRaises(ValueError):
+                fetch_proposals.parse_proposal_ids(spec)
+
+    def test_process_range_shares_prefetched_state(self):
+        with patch("builtins.print"):
+            outcomes = {o["projectId"]: o for o in fetch_proposals.process_chain_proposals([1, 2, 3], max_concurrency=2)}
+
+        self.assertEqual(outcomes[1]["results"]["results"]["total"], 40)
+        self.assertEqual(outcomes[2]["status"], "empty")
+        self.assertEqual(outcomes[3]["results"]["results"]["total"], 15)
+        # eth_blockNumber, one batch of vote counts, the pinned block header, then 4 + 2 chunks of votes
+        self.assertEqual(self.components.rpc_client.stats()["batches"], 9)
+
+        # A second run resumes from the stored tallies
+        self.chain.votes[3].append(make_vote(3, 15))
+        with patch("builtins.print"):
+            outcomes = {o["projectId"]: o for o in fetch_proposals.process_chain_proposals([1, 3])}
+        self.assertEqual(outcomes[3]["results"]["results"]["total"], 16)
+        self.assertEqual(self.components.rpc_client.stats()["batches"], 12)
+
+    async def test_results_are_streamed_as_ndjson(self):
+        fetch_proposals.results_cache.set(3, {"results": {"proposalId": 3, "total": 1}})
+        transport = httpx.ASGITransport(app=fetch_proposals.app)
+        with patch("builtins.print"):
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.get("/api/proposals/results?ids=1-3")
+                invalid = await client.get("/api/proposals/results?ids=4-1")
+
+        self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual(lines[0], {"projectId": 3, "status": "ok", "results": {"results": {"proposalId": 3, "total": 1}}})
+        self.assertEqual({line["projectId"]: line["status"] for line in lines}, {1: "ok", 2: "empty", 3: "ok"})
+        self.assertIn(1, fetch_proposals.results_cache)
+        self.assertEqual(invalid.status_code, 400)
+
+    async def test_vote_inclusion_proofs(self):
+        transport = httpx.ASGITransport(app=fetch_proposals.app)
+        with patch("builtins.print"):
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                results = (await client.get("/api/proposal/1/results")).json()
+                # Proofs stay against the attested root after new votes come in
+                self.chain.votes[1].append(make_vote(1, 40))
+                batch = (await client.get("/api/proposal/1/proofs?indices=0-9,39")).json()
+                single = (await client.get("/api/proposal/1/votes/40/proof?size=41")).json()
+                verified = (await client.post("/api/proofs/verify", json=batch["proofs"] + [single])).json()
+                tampered = dict(single, leaf=batch["proofs"][0]["leaf"])
+                rejected = (await client.post("/api/proofs/verify", json=[tampered])).json()
+                missing = await client.get("/api/proposal/1/votes/41/proof")
+
+        self.assertEqual(batch["root"], results["results"]["votesRoot"])
+        self.assertEqual([proof["index"] for proof in batch["proofs"]], list(range(10)) + [39])
+        self.assertEqual(len(batch["proofs"][0]["siblings"]), 6)
+        self.assertEqual(single["size"], 41)
+        self.assertEqual(verified, {"valid": [True] * 12, "all_valid": True})
+        self.assertEqual(rejected["valid"], [False])
+        self.assertEqual(missing.status_code, 404)
+        self.assertEqual(self.components.merkle_trees.stats(), {"trees": 1, "leaves": 41})
+
+
+class TestLifecycle(unittest.TestCase):
+    def test_import_is_lazy(self):
+        code = (
+            "import sys, fetch_proposals; "
+            "print('web3' in sys.modules, 'openai' in sys.modules, "
+            "fetch_proposals.components.created('vote_indexer'), "
+            "fetch_proposals.marlin_tee.secret_llm is None)"
+        )
+        cwd = os.path.dirname(os.path.abspath(fetch_proposals.__file__))
+        output = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.split(), ["False", "False", "False", "True"])
+
+    def test_startup_and_shutdown_hooks(self):
+        queue = InsightJobQueue(FakeSecretLLM())
+        with patch.object(marlin_tee, "insight_queue", queue):
+            with TestClient(fetch_proposals.app) as client:
+                self.assertEqual(client.get("/").status_code, 200)
+                self.assertTrue(fetch_proposals.components.created("vote_indexer"))
+                self.assertTrue(fetch_proposals.components.created("blocking_executor"))
+            self.assertFalse(fetch_proposals.components.created("vote_indexer"))
+            self.assertIsNone(marlin_tee.insight_queue)
+
+    def test_indexer_requires_a_start_block(self):
+        with patch.dict(os.environ, {"VOTE_INDEXER_ENABLED": "true"}):
+            os.environ.pop("PRIVATE_VOTING_START_BLOCK", None)
+            with self.assertRaises(RuntimeError):
+                fetch_proposals.startup()
+            os.environ["PRIVATE_VOTING_START_BLOCK"] = "120000000"
+            components = fetch_proposals.Components()
+            self.addCleanup(components.close)
+            self.assertEqual(components.vote_indexer.start_block, 120000000)
+
+    def test_components_can_be_injected(self):
+        components = fetch_proposals.Components()
+        fetcher = object()
+        components.vote_fetcher = fetcher
+        self.assertIs(components.vote_fetcher, fetcher)
+        self.assertFalse(components.created("rpc_client"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+# tests/unit/test_metrics.py
+
+import unittest
+from unittest.mock import patch
+
+import metrics
+
+
+class TestRegistry(unittest.TestCase):
+    def test_histogram_renders_cumulative_buckets(self):
+        registry = metrics.Registry()
+        histogram = registry.histogram("stage_seconds", "Stage time", ("stage",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value, "tally")
+
+        lines = registry.render().splitlines()
+        self.assertIn("# TYPE stage_seconds histogram", lines)
+        self.assertIn('stage_seconds_bucket{stage="tally",le="0.1"} 1', lines)
+        self.assertIn('stage_seconds_bucket{stage="tally",le="1.0"} 3', lines)
+        self.assertIn('stage_seconds_bucket{stage="tally",le="+Inf"} 4', lines)
+        self.assertIn('stage_seconds_sum{stage="tally"} 6.05', lines)
+        self.assertIn('stage_seconds_count{stage="tally"} 4', lines)
+
+    def test_stats_collector(self):
+        registry = metrics.Registry()
+        stats = {"hits": 3, "hit_rate": 0.75, "path": "/tmp/x"}
+        registry.add_collector(metrics.stats_collector("cache", lambda: stats, counters=("hits",)))
+        registry.add_collector(metrics.stats_collector("rpc", lambda: None))
+
+        text = registry.render()
+        self.assertIn("# TYPE cache_hits_total counter\ncache_hits_total 3\n", text)
+        self.assertIn("cache_hit_rate 0.75\n", text)
+        self.assertNotIn("path", text)
+        self.assertNotIn("rpc", text)
+
+
+class TestSpan(unittest.TestCase):
+    def test_records_duration_and_errors(self):
+        before = metrics.stage_seconds.count("test_stage")
+        errors = metrics.stage_errors.value("test_stage")
+        with metrics.span("test_stage"):
+            pass
+        with self.assertRaises(ValueError), metrics.span("test_stage"):
+            raise ValueError()
+
+        self.assertEqual(metrics.stage_seconds.count("test_stage"), before + 2)
+        self.assertEqual(metrics.stage_errors.value("test_stage"), errors + 1)
+
+    def test_disabled_is_a_shared_noop(self):
+        with patch.object(metrics.registry, "enabled", False):
+            self.assertIs(metrics.span("a"), metrics.span("b"))
+            with metrics.span("disabled_stage"):
+                pass
+        self.assertEqual(metrics.stage_seconds.count("disabled_stage"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+# tests/unit/test_results_cache.py
+
+import os
+import tempfile
+import unittest
+
+from results_cache import ResultsCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResultsCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ResultsCache(max_entries=3, ttl=10, clock=self.clock)
+
+    def test_open_proposals_expire_and_finalized_are_pinned(self):
+        self.cache.set(1, {"total": 1})
+        self.cache.set(2, {"total": 2}, finalized=True)
+
+        self.clock.now += 11
+        self.assertIsNone(self.cache.get(1))
+        self.assertEqual(self.cache.get(2), {"total": 2})
+        self.assertEqual(self.cache.stats()["expirations"], 1)
+
+    def test_lru_eviction_prefers_unpinned_entries(self):
+        self.cache.set(1, "a", finalized=True)
+        self.cache.set(2, "b")
+        self.cache.set(3, "c")
+        self.cache.get(2)
+        self.cache.set(4, "d")
+
+        self.assertIsNone(self.cache.get(3))
+        self.assertEqual(self.cache.get(1), "a")
+        self.assertEqual(self.cache.get(2), "b")
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_chain_events_invalidate_entries(self):
+        self.cache.set(7, "results", finalized=True)
+        self.cache.on_chain_event("VoteCast", 8)
+        self.assertEqual(self.cache.get(7), "results")
+
+        self.cache.on_chain_event("ProposalFinalized", 7)
+        self.assertIsNone(self.cache.get(7))
+
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["invalidations"]), (1, 1, 1))
+
+    def test_persistence_for_warm_restarts(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "results_cache.json")
+            cache = ResultsCache(ttl=10, persist_path=path, clock=self.clock)
+            cache.set(1, {"counts": {"inFavor": 1}}, finalized=True)
+            cache.set(2, {"counts": {"against": 2}})
+            cache.set(3, {"counts": {}})
+            self.clock.now += 5
+            cache.set(3, {"counts": {"abstain": 3}})
+            self.clock.now += 6
+            cache.save()
+
+            restored = ResultsCache(ttl=10, persist_path=path, clock=self.clock)
+            self.assertEqual(restored.load(), 2)
+            self.assertEqual(restored.get(1), {"counts": {"inFavor": 1}})
+            self.assertIsNone(restored.get(2))
+            self.assertEqual(restored.get(3), {"counts": {"abstain": 3}})
+
+
+if __name__ == "__main__":
+    unittest.main()